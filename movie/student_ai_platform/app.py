@@ -2,14 +2,18 @@ from flask import Flask, render_template
 from flask_login import LoginManager
 from flask_jwt_extended import JWTManager
 from config import Config
-from models.database import db, User
+from models.database import db, User, upgrade_schema
+from utils.http_cache import public_page, PublicSessionInterface
 import os
 
-def create_app():
+def create_app(config_object=Config):
     app = Flask(__name__)
-    app.config.from_object(Config)
+    app.config.from_object(config_object)
+    app.session_interface = PublicSessionInterface()
 
     # Initialize Extensions
+    from utils.db_routing import configure_routing
+    configure_routing(app)
     db.init_app(app)
     
     login_manager = LoginManager()
@@ -17,41 +21,64 @@ def create_app():
     login_manager.login_view = 'auth.login'
 
     jwt = JWTManager(app)
+    from utils.token_auth import init_token_auth
+    init_token_auth(app, jwt)
 
     @login_manager.user_loader
     def load_user(user_id):
-        return User.query.get(int(user_id))
+        # Always the primary, so a new account or role change applies at once
+        return db.session.get(User, int(user_id), bind_arguments={'primary': True})
 
     # Register Blueprints
     from routes.auth_routes import auth_bp
     from routes.student_routes import student_bp
     from routes.admin_routes import admin_bp
     from routes.api_routes import api_bp
+    from routes.legacy_routes import legacy_bp
+    from routes.api_v1_routes import api_v1_bp
     
     app.register_blueprint(auth_bp, url_prefix='/auth')
     app.register_blueprint(student_bp, url_prefix='/student')
     app.register_blueprint(admin_bp, url_prefix='/admin')
     app.register_blueprint(api_bp, url_prefix='/api')
+    app.register_blueprint(api_v1_bp, url_prefix='/api/v1')
+    # Old student_ai_system URLs (/predict, /result, /export_pdf, /admin)
+    app.register_blueprint(legacy_bp)
+
+    # Fingerprinted, precompressed CSS/JS under /assets/
+    from utils.assets import init_assets
+    init_assets(app)
+
+    from utils.instrumentation import init_instrumentation
+    init_instrumentation(app)
 
     @app.route('/')
+    @public_page
     def index():
         return render_template('landing.html')
 
     # Create Database tables
     with app.app_context():
         db.create_all()
+        upgrade_schema()
         # Seed admin if needed
-        from werkzeug.security import generate_password_hash
+        from utils.passwords import hash_password
         if not User.query.filter_by(username='admin').first():
             admin = User(
                 username='admin', 
                 email='admin@careerai.com', 
-                password=generate_password_hash('adminpassword'),
+                password=hash_password('adminpassword'),
                 role='admin'
             )
             db.session.add(admin)
             db.session.commit()
 
+    # Started after create_all, since rows left in the spool are inserted right away
+    from utils.event_buffer import init_event_buffer
+    init_event_buffer(app)
+    # Likewise, the index's first refresh reads student_profile
+    app.extensions['similarity'].start(app)
+
     return app
 
 if __name__ == "__main__":
@@ -0,0 +1,292 @@
+"""
+ASGI entry point. Run with:
+
+    uvicorn --factory asgi:create_asgi_app
+
+The upload and inference endpoints below are served natively on the event
+loop (CPU work goes to a process pool, DB access to an async engine); every
+other route is handed to the regular Flask app on a2wsgi's thread pool.
+"""
+import io
+import os
+import json
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from http.cookies import SimpleCookie
+
+from a2wsgi import WSGIMiddleware
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from werkzeug.wrappers import Request
+
+from app import create_app
+from models.database import db, StudentProfile, ResumeData
+from services import offload
+from utils.admission import metrics, _get_store
+
+# Async drivers for the sync URLs accepted in SQLALCHEMY_DATABASE_URI
+ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'postgresql': 'postgresql+asyncpg',
+    'mysql': 'mysql+aiomysql',
+}
+
+class BodyTooLarge(Exception):
+    """Raised by read_body once the request body passes MAX_CONTENT_LENGTH"""
+
+class AsyncPlatform:
+    def __init__(self, flask_app):
+        self.flask_app = flask_app
+        self.wsgi = WSGIMiddleware(flask_app, workers=flask_app.config.get('ASGI_WSGI_THREADS', 10))
+        self.config = flask_app.config
+        self.pool = None
+        self.engine = None
+        self.pending = None
+        with flask_app.app_context():
+            self.database_url = db.engine.url
+            self.bucket_store = _get_store()
+        self.routes = {
+            ('POST', '/api/predict'): self.predict,
+            ('POST', '/api/resume-analysis'): self.resume_analysis,
+            ('POST', '/api/personality'): self.personality,
+        }
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self.lifespan(receive, send)
+        if scope['type'] == 'http':
+            handler = self.routes.get((scope['method'], scope['path']))
+            if handler:
+                self.startup()
+                try:
+                    return await handler(scope, receive, send)
+                except BodyTooLarge:
+                    return await self.send_json(send, 413, {"error": "Request body too large"})
+        return await self.wsgi(scope, receive, send)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                self.startup()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.shutdown()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    def startup(self):
+        if self.pool is not None:
+            return
+        workers = self.config.get('ASGI_POOL_WORKERS') or os.cpu_count()
+        self.pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=offload.init_worker
+        )
+        # Jobs allowed to wait for the pool; beyond this, requests are shed
+        self.pending = asyncio.Semaphore(workers * self.config.get('ASGI_QUEUE_PER_WORKER', 16))
+        url = self.database_url
+        self.engine = create_async_engine(url.set(drivername=ASYNC_DRIVERS.get(url.get_backend_name(), url.drivername)))
+
+    async def shutdown(self):
+        if self.pool is not None:
+            self.pool.shutdown(wait=True)
+            await self.engine.dispose()
+            self.pool = None
+
+    # Helpers
+
+    async def send_json(self, send, status, payload, headers=()):
+        body = json.dumps(payload).encode('utf-8')
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [(b'content-type', b'application/json'), (b'content-length', str(len(body)).encode())] + list(headers),
+        })
+        await send({'type': 'http.response.body', 'body': body})
+
+    async def read_body(self, receive):
+        # None means the client went away; an oversized body raises BodyTooLarge
+        limit = self.config.get('MAX_CONTENT_LENGTH')
+        chunks, size = [], 0
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return None
+            chunk = message.get('body', b'')
+            size += len(chunk)
+            if limit and size > limit:
+                raise BodyTooLarge()
+            chunks.append(chunk)
+            if not message.get('more_body'):
+                return b''.join(chunks)
+
+    def header(self, scope, name):
+        for key, value in scope['headers']:
+            if key == name:
+                return value.decode('latin-1')
+        return None
+
+    def session_user_id(self, scope):
+        """
+        Reads flask_login's user id from the signed Flask session cookie
+        """
+        cookie = SimpleCookie(self.header(scope, b'cookie') or '')
+        morsel = cookie.get(self.config['SESSION_COOKIE_NAME'])
+        if not morsel:
+            return None
+        serializer = self.flask_app.session_interface.get_signing_serializer(self.flask_app)
+        try:
+            session = serializer.loads(morsel.value, max_age=int(self.flask_app.permanent_session_lifetime.total_seconds()))
+        except Exception:
+            return None
+        user_id = session.get('_user_id')
+        return int(user_id) if user_id else None
+
+    def client_key(self, scope, user_id=None):
+        if user_id is not None:
+            return f"user:{user_id}"
+        client = scope.get('client')
+        return f"ip:{client[0] if client else None}"
+
+    async def admit(self, send, name, key, per_minute, burst):
+        allowed, retry_after = self.bucket_store.take(f"{name}:{key}", per_minute / 60.0, burst)
+        if not allowed:
+            metrics.record(name, 'rate_limited')
+            await self.send_json(send, 429, {"error": "Rate limit exceeded", "status": "rejected"},
+                                 [(b'retry-after', str(max(1, int(retry_after + 0.999))).encode())])
+            return False
+        return True
+
+    async def offload(self, send, name, func, *args):
+        """
+        Runs func in the process pool. Returns (True, result), or (False, None)
+        after answering 503 when the pool backlog is full.
+        """
+        loop = asyncio.get_running_loop()
+        timeout = self.config.get('ASGI_QUEUE_TIMEOUT', 2.0)
+        started = loop.time()
+        try:
+            await asyncio.wait_for(self.pending.acquire(), timeout)
+        except asyncio.TimeoutError:
+            metrics.record(name, 'shed', loop.time() - started)
+            await self.send_json(send, 503, {"error": "Server busy, please retry", "status": "rejected"},
+                                 [(b'retry-after', str(int(timeout + 0.999)).encode())])
+            return False, None
+        metrics.record(name, 'admitted', loop.time() - started)
+        try:
+            return True, await loop.run_in_executor(self.pool, func, *args)
+        finally:
+            self.pending.release()
+
+    # Routes
+
+    async def predict(self, scope, receive, send):
+        if not await self.admit(send, 'api.predict', self.client_key(scope), per_minute=60, burst=20):
+            return
+        body = await self.read_body(receive)
+        if body is None:
+            return
+        try:
+            data = json.loads(body) if body else None
+        except ValueError:
+            data = None
+        if not data or not isinstance(data, dict):
+            return await self.send_json(send, 400, {"error": "No input data provided"})
+
+        required = ['cgpa', 'aptitude', 'coding', 'comm', 'leadership', 'interest']
+        if not all(k in data for k in required):
+            return await self.send_json(send, 400, {"error": "Missing required fields"})
+
+        ok, result = await self.offload(send, 'api.predict', offload.predict, data)
+        if not ok:
+            return
+        career, confidence, salary = result
+        await self.send_json(send, 200, {
+            "predicted_career": career,
+            "confidence_score": confidence,
+            "estimated_salary": salary,
+            "status": "success"
+        })
+
+    async def resume_analysis(self, scope, receive, send):
+        user_id = self.session_user_id(scope)
+        if user_id is None:
+            return await self.send_json(send, 401, {"error": "Login required"})
+        if not await self.admit(send, 'student.resume_analysis', self.client_key(scope, user_id), per_minute=10, burst=3):
+            return
+
+        # Slow uploads only cost an await per chunk, not a thread
+        body = await self.read_body(receive)
+        if body is None:
+            return
+        environ = {
+            'REQUEST_METHOD': 'POST',
+            'CONTENT_TYPE': self.header(scope, b'content-type') or '',
+            'CONTENT_LENGTH': str(len(body)),
+            'wsgi.input': io.BytesIO(body),
+        }
+        file = (await asyncio.to_thread(lambda: Request(environ).files)).get('resume')
+        if not file or not file.filename.endswith('.pdf'):
+            return await self.send_json(send, 400, {"error": "A PDF file is required"})
+        pdf_bytes = file.read()
+
+        async with AsyncSession(self.engine) as session:
+            profile = (await session.execute(select(StudentProfile).filter_by(user_id=user_id))).scalars().first()
+            if not profile:
+                return await self.send_json(send, 404, {"error": "Profile not found"})
+            profile_id, career = profile.id, profile.predicted_career
+
+        # No DB connection is held while the pool works
+        ok, analysis_result = await self.offload(send, 'student.resume_analysis', offload.analyze_resume, pdf_bytes, career)
+        if not ok:
+            return
+
+        async with AsyncSession(self.engine) as session:
+            profile = await session.get(StudentProfile, profile_id)
+            res_data = (await session.execute(select(ResumeData).filter_by(student_id=profile_id))).scalars().first()
+            if not res_data:
+                res_data = ResumeData(student_id=profile_id)
+                session.add(res_data)
+            res_data.filename = file.filename
+            res_data.extracted_skills = json.dumps(analysis_result['known_skills'])
+            res_data.missing_skills = json.dumps(analysis_result['missing_skills'])
+            profile.ats_score = analysis_result['ats_score']
+            await session.commit()
+
+        await self.send_json(send, 200, dict(analysis_result, status="success"))
+
+    async def personality(self, scope, receive, send):
+        user_id = self.session_user_id(scope)
+        if user_id is None:
+            return await self.send_json(send, 401, {"error": "Login required"})
+        body = await self.read_body(receive)
+        if body is None:
+            return
+        try:
+            text = (json.loads(body) or {}).get('description') if body else None
+        except (ValueError, AttributeError):
+            text = None
+        if not text:
+            return await self.send_json(send, 400, {"error": "No description provided"})
+
+        ok, result = await self.offload(send, 'student.personality', offload.analyze_personality, text)
+        if not ok:
+            return
+
+        async with AsyncSession(self.engine) as session:
+            profile = (await session.execute(select(StudentProfile).filter_by(user_id=user_id))).scalars().first()
+            if profile:
+                profile.personality_type = result['dominant_trait']
+                await session.commit()
+
+        await self.send_json(send, 200, dict(result, status="success"))
+
+def create_asgi_app():
+    return AsyncPlatform(create_app())
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run("asgi:create_asgi_app", factory=True)
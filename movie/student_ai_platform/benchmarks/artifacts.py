@@ -0,0 +1,78 @@
+"""
+Load time and memory of the pickled models against the memory-mapped array
+artifacts. Every sample loads in a fresh interpreter so import caches and
+already-resident pages do not flatter either format.
+"""
+import os
+import sys
+import json
+import subprocess
+from benchmarks.common import PLATFORM_DIR, summarize
+
+CHILD = r'''
+import json, sys, time, warnings
+warnings.filterwarnings('ignore')
+import numpy as np, joblib
+sys.path.insert(0, '.')
+from utils import model_artifacts
+
+def rss_mb():
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1]) / 1024
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+fmt = sys.argv[1]
+before = rss_mb()
+started = time.perf_counter()
+if fmt == 'pickle':
+    model_data = joblib.load('models/career_model.pkl')
+    salary = joblib.load('models/salary_model.pkl')
+else:
+    model_data = model_artifacts.load_career_model(model_artifacts.current_version_dir('models/career_model'))
+    salary = model_artifacts.load_salary_model(model_artifacts.current_version_dir('models/salary_model'))
+load_seconds = time.perf_counter() - started
+loaded = rss_mb()
+
+X = model_data['scaler'].transform(np.array([[8.2, 84, 8, 6, 5, 0]]))
+model_data['model'].predict_proba(X)
+salary.predict(np.array([[8, 8.2, 0]]))
+print(json.dumps({'load_seconds': load_seconds, 'rss_load_mb': loaded - before, 'rss_predict_mb': rss_mb() - before}))
+'''
+
+def _dir_size_mb(path):
+    if os.path.isfile(path):
+        return os.path.getsize(path) / (1024 * 1024)
+    total = 0
+    for root, _, files in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(root, f)) for f in files)
+    return total / (1024 * 1024)
+
+def _sample(fmt):
+    out = subprocess.run([sys.executable, '-c', CHILD, fmt], cwd=PLATFORM_DIR, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+def run(samples=5):
+    from utils import model_artifacts
+
+    models_dir = os.path.join(PLATFORM_DIR, 'models')
+    formats = {}
+    if os.path.exists(os.path.join(models_dir, 'career_model.pkl')) and os.path.exists(os.path.join(models_dir, 'salary_model.pkl')):
+        formats['pickle'] = ['career_model.pkl', 'salary_model.pkl']
+    versions = [model_artifacts.current_version_dir(os.path.join(models_dir, name)) for name in ('career_model', 'salary_model')]
+    if all(versions):
+        formats['npy'] = versions
+    if not formats:
+        print("No model files found, skipping artifact benchmarks (run utils/train_models.py)")
+
+    results = {}
+    for fmt, paths in formats.items():
+        runs = [_sample(fmt) for _ in range(samples)]
+        summary = summarize([r['load_seconds'] for r in runs], sum(r['load_seconds'] for r in runs))
+        summary['peak_rss_mb'] = round(max(r['rss_predict_mb'] for r in runs), 1)
+        summary['rss_after_load_mb'] = round(max(r['rss_load_mb'] for r in runs), 1)
+        summary['disk_mb'] = round(sum(_dir_size_mb(os.path.join(models_dir, p)) for p in paths), 1)
+        results[f'artifacts.load.{fmt}'] = summary
+    return results
@@ -0,0 +1,38 @@
+"""
+Bytes and latency of a dashboard load with the asset pipeline. A first visit
+fetches the page and its fingerprinted CSS in the smallest accepted
+encoding; a repeat visit only fetches the page, since the CSS is cached as
+immutable. Also times the asset route itself per encoding.
+"""
+import re
+from benchmarks.common import measure
+from benchmarks.routes import bench_config, seed_database, BENCH_PASSWORD
+
+ENCODINGS = (('br', 'br, gzip'), ('gzip', 'gzip, deflate'), ('identity', ''))
+
+def _visit(client, accept_encoding, cached):
+    page = client.get('/student/dashboard', headers={'Accept-Encoding': accept_encoding})
+    total = len(page.data)
+    if not cached:
+        for url in re.findall(r'(/assets/[^"]+)"', page.get_data(as_text=True)):
+            total += len(client.get(url, headers={'Accept-Encoding': accept_encoding}).data)
+    return total
+
+def run(size=1000, iterations=200):
+    from app import create_app
+
+    app = create_app(bench_config(seed_database(size)))
+    client = app.test_client()
+    client.post('/auth/login', data={'username': 'student0', 'password': BENCH_PASSWORD})
+    page = client.get('/student/dashboard').get_data(as_text=True)
+    stylesheet = re.search(r'(/assets/[^"]+\.css)"', page).group(1)
+
+    results = {}
+    for name, accept_encoding in ENCODINGS:
+        headers = {'Accept-Encoding': accept_encoding}
+        results[f'assets.{name}'] = measure(lambda: client.get(stylesheet, headers=headers), iterations)
+        results[f'assets.{name}']['first_visit_bytes'] = _visit(client, accept_encoding, cached=False)
+        results[f'assets.{name}']['repeat_visit_bytes'] = _visit(client, accept_encoding, cached=True)
+        print(f"dashboard ({name}): {results[f'assets.{name}']['first_visit_bytes']} bytes first visit, "
+              f"{results[f'assets.{name}']['repeat_visit_bytes']} bytes repeat visit")
+    return results
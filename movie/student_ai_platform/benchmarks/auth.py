@@ -0,0 +1,49 @@
+"""
+Session (flask_login) against bearer-token auth on the same work. The
+session case adds a bench-only route running the same profile view under
+login_required, so the difference is the per-request user load versus
+verifying the token claims.
+"""
+from flask import jsonify
+from flask_login import login_required, current_user
+from benchmarks.common import measure
+from benchmarks.routes import bench_config, seed_database, BENCH_PASSWORD, PREDICT_FORM, PREDICT_JSON
+
+def _check(response, expected=(200, 302)):
+    if response.status_code not in expected:
+        raise RuntimeError(f"unexpected status {response.status_code}")
+
+def run(size, iterations=200):
+    from app import create_app
+    from models.database import StudentProfile
+    from routes.api_v1_routes import _profile_json
+
+    app = create_app(bench_config(seed_database(size)))
+
+    @app.route('/bench/session-profile')
+    @login_required
+    def session_profile():
+        return jsonify(_profile_json(StudentProfile.query.filter_by(user_id=current_user.id).first()))
+
+    session = app.test_client()
+    session.post('/auth/login', data={'username': 'student0', 'password': BENCH_PASSWORD})
+    bearer = app.test_client()
+    token = bearer.post('/api/v1/auth/token', json={'username': 'student0', 'password': BENCH_PASSWORD}).get_json()['access_token']
+    headers = {'Authorization': f'Bearer {token}'}
+
+    cases = [
+        ('session GET profile', lambda: session.get('/bench/session-profile')),
+        ('jwt GET profile', lambda: bearer.get('/api/v1/profile', headers=headers)),
+        ('session POST predict', lambda: session.post('/student/predict', data=PREDICT_FORM)),
+        ('jwt POST predict', lambda: bearer.post('/api/v1/predict', json=dict(PREDICT_JSON, name='Bench Student'), headers=headers)),
+    ]
+
+    results = {}
+    for name, call in cases:
+        results[f'auth.{size}.{name}'] = measure(lambda: _check(call()), iterations, warmup=3)
+
+    for kind in ('GET profile', 'POST predict'):
+        session_rps = results[f'auth.{size}.session {kind}']['throughput_per_s']
+        jwt_rps = results[f'auth.{size}.jwt {kind}']['throughput_per_s']
+        print(f"{kind}: session {session_rps:.0f} req/s, jwt {jwt_rps:.0f} req/s (x{jwt_rps / session_rps:.2f})")
+    return results
@@ -0,0 +1,93 @@
+import os
+import sys
+import json
+import time
+import resource
+import platform
+import numpy as np
+
+PLATFORM_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.join(PLATFORM_DIR, 'benchmarks')
+DATA_DIR = os.path.join(BENCH_DIR, '.data')
+RESULTS_DIR = os.path.join(BENCH_DIR, 'results')
+BASELINE_PATH = os.path.join(BENCH_DIR, 'baseline.json')
+
+def enter_platform_dir():
+    """
+    Services resolve models/ relative to the working directory, like the app does
+    """
+    os.chdir(PLATFORM_DIR)
+    if PLATFORM_DIR not in sys.path:
+        sys.path.insert(0, PLATFORM_DIR)
+
+def peak_rss_mb():
+    # ru_maxrss is in KB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024, 1)
+
+def summarize(samples, wall_time):
+    ms = np.asarray(samples) * 1000
+    return {
+        'iterations': len(samples),
+        'mean_ms': round(float(ms.mean()), 3),
+        'p50_ms': round(float(np.percentile(ms, 50)), 3),
+        'p95_ms': round(float(np.percentile(ms, 95)), 3),
+        'p99_ms': round(float(np.percentile(ms, 99)), 3),
+        'throughput_per_s': round(len(samples) / wall_time, 2) if wall_time else None,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+def measure(func, iterations, warmup=3):
+    """
+    Calls func() warmup + iterations times and returns latency percentiles
+    """
+    for _ in range(warmup):
+        func()
+    samples = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        t = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - t)
+    return summarize(samples, time.perf_counter() - started)
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'system': platform.system(),
+        'cpus': os.cpu_count(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+
+def write_json(path, payload):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(payload, f, indent=2, sort_keys=True)
+
+def load_json(path):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+def compare(results, baseline, tolerance=0.2, metric='p95_ms'):
+    """
+    Returns (name, baseline, current, ratio) for every benchmark whose metric
+    got worse than baseline by more than tolerance
+    """
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous or not previous.get(metric) or current.get(metric) is None:
+            continue
+        ratio = current[metric] / previous[metric]
+        if ratio > 1 + tolerance:
+            regressions.append((name, previous[metric], current[metric], round(ratio, 2)))
+    return regressions
+
+def print_table(results):
+    print(f"{'benchmark':<48}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'ops/s':>10}{'rss MB':>9}")
+    for name, r in sorted(results.items()):
+        print(f"{name:<48}{r['p50_ms']:>10.2f}{r['p95_ms']:>10.2f}{r['p99_ms']:>10.2f}"
+              f"{(r['throughput_per_s'] or 0):>10.1f}{r['peak_rss_mb']:>9.1f}")
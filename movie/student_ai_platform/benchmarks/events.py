@@ -0,0 +1,57 @@
+"""
+Activity rows committed one per request against the write-behind buffer.
+Times a single write each way, then rows/s with several threads writing at
+once, where per-row commits queue on SQLite's write lock.
+"""
+import time
+import threading
+from benchmarks.common import measure
+from benchmarks.routes import bench_config, seed_database
+
+THREADS = 8
+
+def _concurrent(write, rows_per_thread):
+    def worker():
+        for _ in range(rows_per_thread):
+            write()
+
+    threads = [threading.Thread(target=worker) for _ in range(THREADS)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return round(THREADS * rows_per_thread / (time.perf_counter() - started), 1)
+
+def run(size=1000, iterations=200):
+    from app import create_app
+    from models.database import db, ActivityEvent
+
+    app = create_app(bench_config(seed_database(size)))
+    buffer = app.extensions['event_buffer']
+
+    def commit_row():
+        with app.app_context():
+            db.session.add(ActivityEvent(user_id=1, kind='bench', detail=None))
+            db.session.commit()
+
+    def buffer_row():
+        buffer.record('activity_event', {'user_id': 1, 'kind': 'bench', 'detail': None})
+
+    results = {
+        'events.commit_per_row': measure(commit_row, iterations),
+        'events.buffered': measure(buffer_row, iterations),
+    }
+    results['events.commit_per_row']['concurrent_rows_per_s'] = _concurrent(commit_row, iterations // THREADS + 1)
+    results['events.buffered']['concurrent_rows_per_s'] = _concurrent(buffer_row, iterations // THREADS + 1)
+    started = time.perf_counter()
+    flushed = buffer.flush()
+    results['events.buffered']['final_flush_ms'] = round((time.perf_counter() - started) * 1000, 3)
+    print(f"events: {results['events.commit_per_row']['concurrent_rows_per_s']} rows/s committed per row, "
+          f"{results['events.buffered']['concurrent_rows_per_s']} rows/s buffered ({THREADS} threads); "
+          f"final flush of {flushed} rows {results['events.buffered']['final_flush_ms']}ms")
+
+    with app.app_context():
+        ActivityEvent.query.filter_by(kind='bench').delete()
+        db.session.commit()
+    return results
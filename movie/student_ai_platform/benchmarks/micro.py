@@ -0,0 +1,97 @@
+"""
+Microbenchmarks for the service layer, called directly without Flask
+"""
+import io
+import random
+from benchmarks.common import measure
+
+SAMPLE_FEATURES = {'cgpa': 8.2, 'aptitude': 84, 'coding': 8, 'comm': 6, 'leadership': 5, 'interest': 'AI/ML'}
+
+SAMPLE_RESUME = (
+    "Experienced engineer skilled in Python, SQL, Git and machine learning. "
+    "Built deep learning models with PyTorch and deployed REST APIs. " * 20
+)
+
+SAMPLE_ANSWER = (
+    "Supervised learning trains on labelled examples to predict a target, while "
+    "unsupervised learning finds structure such as clusters in unlabelled data."
+)
+
+def _random_features(rng, interests):
+    return {
+        'cgpa': round(rng.uniform(2.5, 10.0), 2),
+        'aptitude': rng.randint(50, 99),
+        'coding': rng.randint(1, 9),
+        'comm': rng.randint(1, 9),
+        'leadership': rng.randint(1, 9),
+        'interest': rng.choice(interests),
+    }
+
+def sample_pdf():
+    from reportlab.pdfgen import canvas
+    buffer = io.BytesIO()
+    p = canvas.Canvas(buffer)
+    for i, line in enumerate(SAMPLE_RESUME.split('. ')[:40]):
+        p.drawString(50, 800 - i * 18, line[:90])
+    p.save()
+    return buffer.getvalue()
+
+def run(iterations=200):
+    from services.prediction_service import PredictionService
+    from services.resume_service import ResumeService
+    from services.personality_service import PersonalityService
+    from services.interview_service import InterviewService
+
+    prediction_service = PredictionService()
+    resume_service = ResumeService()
+    personality_service = PersonalityService()
+    interview_service = InterviewService()
+    results = {}
+
+    if prediction_service.model_data:
+        rng = random.Random(42)
+        interests = list(prediction_service.model_data['le_interest'].classes_)
+        inputs = [_random_features(rng, interests) for _ in range(iterations + 10)]
+        it = iter(inputs * 2)
+
+        results['micro.predict_career'] = measure(lambda: prediction_service.predict_career(next(it)), iterations)
+        # Distinct inputs each time so the PNG cache does not hide the SHAP cost
+        explain_inputs = iter(inputs)
+        results['micro.get_explanation'] = measure(
+            lambda: prediction_service.get_explanation(next(explain_inputs)), max(5, iterations // 20), warmup=1
+        )
+    else:
+        print("models/career_model.pkl missing, skipping career model benchmarks (run utils/train_models.py)")
+
+    careers = list(prediction_service.career_base)
+    rng = random.Random(7)
+    results['micro.predict_salary.cached'] = measure(
+        lambda: prediction_service.predict_salary('AI Engineer', 8, 8.2), iterations
+    )
+    results['micro.predict_salary.uncached'] = measure(
+        lambda: prediction_service.predict_salary(rng.choice(careers), rng.randint(1, 9), round(rng.uniform(2.5, 10), 2)),
+        iterations
+    )
+    batch = 10000
+    results[f'micro.predict_salary_batch.{batch}'] = measure(
+        lambda: prediction_service.predict_salary_batch(
+            [careers[i % len(careers)] for i in range(batch)],
+            [1 + i % 9 for i in range(batch)],
+            [2.5 + (i % 75) / 10 for i in range(batch)]
+        ), max(5, iterations // 20)
+    )
+
+    results['micro.analyze_resume'] = measure(
+        lambda: resume_service.analyze_resume(SAMPLE_RESUME, 'AI Engineer'), iterations
+    )
+    pdf = sample_pdf()
+    results['micro.extract_text_from_pdf'] = measure(
+        lambda: resume_service.extract_text_from_pdf(io.BytesIO(pdf)), max(10, iterations // 10)
+    )
+    results['micro.analyze_personality'] = measure(
+        lambda: personality_service.analyze_personality(SAMPLE_RESUME), iterations
+    )
+    results['micro.evaluate_answer'] = measure(
+        lambda: interview_service.evaluate_answer("What is supervised learning?", SAMPLE_ANSWER), iterations
+    )
+    return results
@@ -0,0 +1,89 @@
+"""
+Memory per worker of serve.py with and without preloading. Each mode starts
+a real server, drives a mix of routes through every worker, then reads the
+master's status file: with preload and gc.freeze() the workers' unique
+memory (USS) should be a fraction of a worker that built the app itself.
+"""
+import os
+import sys
+import json
+import time
+import socket
+import signal
+import tempfile
+import subprocess
+import urllib.parse
+import urllib.request
+from http.cookiejar import CookieJar
+from benchmarks.common import PLATFORM_DIR, summarize
+from benchmarks.routes import seed_database, BENCH_PASSWORD, PREDICT_FORM
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def _wait_up(url, timeout=180):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(url, timeout=5).read()
+            return
+        except OSError:
+            time.sleep(0.5)
+    raise RuntimeError(f"server at {url} did not come up")
+
+def _drive(base, rounds):
+    samples = []
+    started = time.perf_counter()
+    for _ in range(rounds):
+        opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(CookieJar()))
+        calls = [
+            ('/auth/login', {'username': 'student0', 'password': BENCH_PASSWORD}),
+            ('/student/dashboard', None),
+            ('/student/predict', PREDICT_FORM),
+            ('/student/result', None),
+            ('/student/similar', None),
+        ]
+        for path, form in calls:
+            t = time.perf_counter()
+            data = urllib.parse.urlencode(form).encode() if form else None
+            opener.open(base + path, data=data, timeout=60).read()
+            samples.append(time.perf_counter() - t)
+    return summarize(samples, time.perf_counter() - started)
+
+def _run_mode(db_path, workers, preload, rounds):
+    port = _free_port()
+    status_path = os.path.join(tempfile.mkdtemp(prefix='prefork-'), 'status.json')
+    env = dict(os.environ, DATABASE_URL=f'sqlite:///{db_path}', RATE_LIMIT_ENABLED='0',
+               PREFORK_STATUS_PATH=status_path, PREFORK_CHECK_INTERVAL='1', PREFORK_MAX_WORKER_USS_MB='0')
+    cmd = [sys.executable, 'serve.py', '--bind', f'127.0.0.1:{port}', '--workers', str(workers)]
+    if not preload:
+        cmd.append('--no-preload')
+    server = subprocess.Popen(cmd, cwd=PLATFORM_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        base = f'http://127.0.0.1:{port}'
+        _wait_up(base + '/')
+        result = _drive(base, rounds)
+        time.sleep(3)  # let the master write a status after the traffic
+        with open(status_path) as f:
+            status = json.load(f)
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=60)
+    result['mean_worker_uss_mb'] = status['totals']['mean_worker_uss_mb']
+    result['total_pss_mb'] = status['totals']['total_pss_mb']
+    result['master_rss_mb'] = status['master']['memory']['rss_mb']
+    return result
+
+def run(size=1000, workers=2, rounds=20):
+    db_path = seed_database(size)
+    results = {}
+    for preload in (True, False):
+        results[f"prefork.{size}.{'preload' if preload else 'no_preload'}"] = _run_mode(db_path, workers, preload, rounds)
+
+    with_preload = results[f'prefork.{size}.preload']['mean_worker_uss_mb']
+    without = results[f'prefork.{size}.no_preload']['mean_worker_uss_mb']
+    print(f"Worker USS: {with_preload} MB preloaded vs {without} MB without "
+          f"({without / with_preload:.1f}x as many workers per GB)")
+    return results
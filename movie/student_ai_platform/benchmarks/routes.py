@@ -0,0 +1,114 @@
+"""
+Load tests of the Flask routes through the test client against seeded
+SQLite databases of a given number of student profiles
+"""
+import os
+import sqlite3
+import random
+from datetime import datetime
+from benchmarks.common import DATA_DIR, measure
+
+INTERESTS = ['AI/ML', 'Data Science', 'Web Development', 'UI/UX Design', 'Cyber Security', 'Business Analyst', 'Software Engineering']
+CAREERS = ['AI Engineer', 'Data Scientist', 'Web Developer', 'UI/UX Designer', 'Cyber Security Analyst', 'Business Analyst', 'Software Developer', 'General IT']
+BENCH_PASSWORD = 'benchpassword'
+
+PREDICT_FORM = {'name': 'Bench Student', 'cgpa': '8.2', 'aptitude': '84', 'coding': '8',
+                'communication': '6', 'leadership': '5', 'interest': 'AI/ML'}
+PREDICT_JSON = {'cgpa': 8.2, 'aptitude': 84, 'coding': 8, 'comm': 6, 'leadership': 5, 'interest': 'AI/ML'}
+
+def bench_config(db_path):
+    from config import Config
+
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{db_path}'
+        RATE_LIMIT_ENABLED = False
+        TESTING = True
+
+    return BenchConfig
+
+def seed_database(size, chunk=50000):
+    """
+    Builds (once) a SQLite file with `size` profiles, written with executemany
+    so a million rows take seconds rather than an ORM session's minutes
+    """
+    path = os.path.join(DATA_DIR, f'profiles_{size}.db')
+    if os.path.exists(path):
+        return path
+    os.makedirs(DATA_DIR, exist_ok=True)
+    tmp_path = path + '.tmp'
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    # Let the app create the schema (and the admin user) on the empty file
+    from app import create_app
+    create_app(bench_config(tmp_path))
+    from werkzeug.security import generate_password_hash
+
+    rng = random.Random(size)
+    now = datetime.utcnow().isoformat(sep=' ')
+    conn = sqlite3.connect(tmp_path)
+    conn.execute('PRAGMA journal_mode=OFF')
+    conn.execute('PRAGMA synchronous=OFF')
+    password = generate_password_hash(BENCH_PASSWORD)
+    for start in range(0, size, chunk):
+        users, profiles = [], []
+        for i in range(start, min(size, start + chunk)):
+            user_id = i + 2  # id 1 is the seeded admin
+            users.append((user_id, f'student{i}', f'student{i}@bench.local', password, 'student', now))
+            cgpa = round(rng.uniform(2.5, 10.0), 2)
+            aptitude, coding = rng.randint(50, 99), rng.randint(1, 9)
+            comm, leadership = rng.randint(1, 9), rng.randint(1, 9)
+            profiles.append((
+                i + 1, user_id, f'Student {i}', cgpa, aptitude, coding, comm, leadership,
+                rng.choice(INTERESTS), rng.choice(CAREERS), round(rng.uniform(40000, 140000), 2),
+                round(cgpa * 8 + aptitude * 0.3 + coding * 3, 2), round((coding + comm + leadership) * 2.5 + cgpa * 6.25, 2),
+                None, None, now, now
+            ))
+        conn.executemany('INSERT INTO user (id, username, email, password, role, created_at) VALUES (?, ?, ?, ?, ?, ?)', users)
+        conn.executemany(
+            'INSERT INTO student_profile (id, user_id, name, cgpa, aptitude_score, coding_skill, communication_skill, '
+            'leadership_score, interest_area, predicted_career, predicted_salary, intelligence_score, '
+            'career_readiness_score, ats_score, personality_type, created_at, updated_at) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', profiles
+        )
+        conn.commit()
+    conn.close()
+    os.replace(tmp_path, path)
+    return path
+
+def _login(client, username, password):
+    client.post('/auth/login', data={'username': username, 'password': password})
+    return client
+
+def _check(response, expected=(200, 302)):
+    if response.status_code not in expected:
+        raise RuntimeError(f"unexpected status {response.status_code}")
+
+def run(size, iterations=50):
+    from app import create_app
+
+    db_path = seed_database(size)
+    app = create_app(bench_config(db_path))
+    heavy = max(3, iterations // 10)
+
+    anon = app.test_client()
+    student = _login(app.test_client(), 'student0', BENCH_PASSWORD)
+    admin = _login(app.test_client(), 'admin', 'adminpassword')
+    # Make sure student0 has a fresh, model-backed prediction before reading pages
+    student.post('/student/predict', data=PREDICT_FORM)
+
+    cases = [
+        ('GET /', anon, lambda c: c.get('/'), iterations),
+        ('POST /auth/login', anon, lambda c: c.post('/auth/login', data={'username': 'student0', 'password': BENCH_PASSWORD}), heavy),
+        ('GET /student/dashboard', student, lambda c: c.get('/student/dashboard'), iterations),
+        ('POST /student/predict', student, lambda c: c.post('/student/predict', data=PREDICT_FORM), iterations),
+        ('GET /student/result', student, lambda c: c.get('/student/result'), iterations),
+        ('POST /api/predict', anon, lambda c: c.post('/api/predict', json=PREDICT_JSON), iterations),
+        ('GET /api/market', anon, lambda c: c.get('/api/market'), iterations),
+        ('GET /admin/analytics', admin, lambda c: c.get('/admin/analytics'), heavy),
+    ]
+
+    results = {}
+    for name, client, call, n in cases:
+        results[f'routes.{size}.{name}'] = measure(lambda: _check(call(client)), n, warmup=1)
+    return results
@@ -0,0 +1,88 @@
+"""
+Offline benchmark suite. From movie/student_ai_platform:
+
+    python -m benchmarks.run_benchmarks                       # micro + routes at 1k profiles
+    python -m benchmarks.run_benchmarks --sizes 1000 100000 1000000
+    python -m benchmarks.run_benchmarks --suite artifacts     # pickle vs .npy model load time and RSS
+    python -m benchmarks.run_benchmarks --suite auth          # session vs bearer-token requests/sec
+    python -m benchmarks.run_benchmarks --suite prefork       # serve.py worker memory with and without preload
+    python -m benchmarks.run_benchmarks --suite assets        # dashboard bytes per visit, asset route latency
+    python -m benchmarks.run_benchmarks --suite events        # per-row commits vs the write-behind buffer
+    python -m benchmarks.run_benchmarks --save-baseline       # store results as the new baseline
+
+Results go to benchmarks/results/<timestamp>.json. The run exits non-zero
+when any p95 regresses past --tolerance against benchmarks/baseline.json.
+"""
+import os
+import sys
+import time
+import argparse
+import warnings
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import (
+    enter_platform_dir, environment, write_json, load_json, compare, print_table,
+    RESULTS_DIR, BASELINE_PATH
+)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Service and route benchmarks")
+    parser.add_argument('--suite', choices=['all', 'micro', 'routes', 'artifacts', 'auth', 'prefork', 'assets', 'events'], default='all')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000], help="seeded profile counts for route tests")
+    parser.add_argument('--iterations', type=int, default=200, help="microbenchmark iterations")
+    parser.add_argument('--route-iterations', type=int, default=50)
+    parser.add_argument('--output', help="results file (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--tolerance', type=float, default=0.2, help="allowed p95 slowdown, 0.2 = 20%%")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    enter_platform_dir()
+    warnings.filterwarnings('ignore')
+
+    from benchmarks import micro, routes, artifacts, auth, prefork, assets, events
+
+    results = {}
+    if args.suite in ('all', 'micro'):
+        results.update(micro.run(args.iterations))
+    if args.suite in ('all', 'routes'):
+        for size in args.sizes:
+            results.update(routes.run(size, args.route_iterations))
+    if args.suite in ('all', 'artifacts'):
+        results.update(artifacts.run())
+    if args.suite in ('all', 'auth'):
+        for size in args.sizes:
+            results.update(auth.run(size, args.iterations))
+    if args.suite in ('all', 'prefork'):
+        results.update(prefork.run(args.sizes[0]))
+    if args.suite in ('all', 'assets'):
+        results.update(assets.run(args.sizes[0], args.iterations))
+    if args.suite in ('all', 'events'):
+        results.update(events.run(args.sizes[0], args.iterations))
+
+    print_table(results)
+    output = args.output or os.path.join(RESULTS_DIR, time.strftime('%Y%m%d-%H%M%S') + '.json')
+    write_json(output, {'environment': environment(), 'results': results})
+    print(f"\nResults written to {output}")
+
+    if args.save_baseline:
+        write_json(args.baseline, {'environment': environment(), 'results': results})
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    baseline = load_json(args.baseline)
+    if not baseline:
+        print("No baseline found; run with --save-baseline to create one")
+        return 0
+    regressions = compare(results, baseline['results'], args.tolerance)
+    for name, before, after, ratio in regressions:
+        print(f"REGRESSION {name}: p95 {before:.2f}ms -> {after:.2f}ms (x{ratio})")
+    if not regressions:
+        print(f"No p95 regressions beyond {args.tolerance:.0%} against baseline")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,7 +8,63 @@ class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY', 'platform-secret-key-2026')
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL', 'sqlite:///database.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Read replicas (utils/db_routing.py): comma-separated URLs; @read_replica routes and bulk
+    # reads use them, everything else the primary. Empty sends everything to the primary
+    SQLALCHEMY_REPLICA_URIS = [u.strip() for u in os.environ.get('DATABASE_REPLICA_URLS', '').split(',') if u.strip()]
+    PRIMARY_POOL_SIZE = int(os.environ.get('PRIMARY_POOL_SIZE', 0)) or None  # default: SQLAlchemy's
+    REPLICA_POOL_SIZE = int(os.environ.get('REPLICA_POOL_SIZE', 0)) or None  # per replica
+    REPLICA_STICKY_SECONDS = 10  # a user's reads stay on the primary this long after their write
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY', 'jwt-secret-key-ai')
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=2)
+    JWT_REVOCATION_REFRESH = 30  # seconds between reloads of the revoked-token list per worker
     UPLOAD_FOLDER = 'static/uploads'
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB
+    PAGE_CACHE_MAX_AGE = 300  # seconds, public pages only
+    # Release id (e.g. the git commit) mixed into every per-user page ETag with the template digest
+    APP_VERSION = os.environ.get('APP_VERSION', '')
+    # Static assets (utils/assets.py): rebuild static/dist on startup when static/src changed
+    ASSETS_AUTO_BUILD = os.environ.get('ASSETS_AUTO_BUILD', '1') == '1'
+    ASSETS_MAX_AGE = 31536000  # seconds; asset URLs carry a content hash
+    RATE_LIMIT_ENABLED = os.environ.get('RATE_LIMIT_ENABLED', '1') == '1'
+    # 'memory' (per worker) or a SQLite file path shared by all workers on the host
+    RATE_LIMIT_STORAGE = os.environ.get('RATE_LIMIT_STORAGE', 'memory')
+    # ASGI mode (asgi.py): process pool size (default: CPU count) and backlog limits
+    ASGI_POOL_WORKERS = int(os.environ.get('ASGI_POOL_WORKERS', 0)) or None
+    ASGI_QUEUE_PER_WORKER = 16
+    ASGI_QUEUE_TIMEOUT = 2.0
+    ASGI_WSGI_THREADS = 10  # threads for the Flask routes served through a2wsgi
+    # Instrumentation: Prometheus /metrics and the admin-only sampling profiler
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '1') == '1'
+    # Addresses that may scrape /metrics without logging in (admins always may). Behind a
+    # reverse proxy this is the proxy's address, so keep the endpoint off the public route
+    METRICS_ALLOWED_IPS = [ip.strip() for ip in os.environ.get('METRICS_ALLOWED_IPS', '127.0.0.1,::1').split(',') if ip.strip()]
+    # Per-span Server-Timing headers (including DB time) go to admins only unless this is set
+    SERVER_TIMING_PUBLIC = os.environ.get('SERVER_TIMING_PUBLIC', '0') == '1'
+    PROFILER_ENABLED = True
+    PROFILER_HEADER = 'X-Profile'  # send "X-Profile: 1" as an admin to dump a folded stack profile
+    PROFILER_INTERVAL = 0.005  # seconds between stack samples
+    # Password hashing: werkzeug method string (e.g. 'scrypt:32768:8:1', 'pbkdf2:sha256:600000');
+    # existing hashes are upgraded on the next successful login after it changes
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 0)) or None  # default: CPU count
+    PASSWORD_HASH_MAX_PENDING = 64  # hashes queued behind the running ones
+    PASSWORD_HASH_TIMEOUT = 5.0  # seconds to wait for a slot before answering 503
+    # Columnar profile snapshot (utils/profile_snapshot.py) used by analytics and simulations
+    PROFILE_SNAPSHOT_REFRESH = int(os.environ.get('PROFILE_SNAPSHOT_REFRESH', 30))  # seconds between incremental refreshes
+    # Write-behind buffer (utils/event_buffer.py) for interview attempts and activity events:
+    # a spool directory that survives worker crashes, or 'memory'
+    EVENT_SPOOL = os.environ.get('EVENT_SPOOL', os.path.join('instance', 'spool'))
+    EVENT_FLUSH_SIZE = 500  # rows waiting that trigger a flush
+    EVENT_FLUSH_INTERVAL = float(os.environ.get('EVENT_FLUSH_INTERVAL', 1.0))  # seconds between flushes
+    EVENT_MAX_BACKLOG = 100000  # rows held while the database is unavailable; later ones are dropped
+    EVENT_RECOVER_INTERVAL = 60  # seconds between scans for spools left by dead workers
+    EVENT_DEAD_LETTER = os.path.join('instance', 'event_dead_letter.jsonl')  # rows the database rejects
+    ACTIVITY_PAGE_VIEWS = True  # log student/admin page views as activity events
+    # Preforking server (serve.py)
+    PREFORK_BIND = os.environ.get('PREFORK_BIND', '0.0.0.0:8000')
+    PREFORK_WORKERS = int(os.environ.get('PREFORK_WORKERS', 0))  # default: one per available core
+    PREFORK_MAX_WORKER_USS_MB = float(os.environ.get('PREFORK_MAX_WORKER_USS_MB', 512))  # 0 disables recycling
+    PREFORK_CHECK_INTERVAL = float(os.environ.get('PREFORK_CHECK_INTERVAL', 10))  # seconds between worker memory checks
+    PREFORK_GRACEFUL_TIMEOUT = 30  # seconds a recycled worker gets to finish its requests
+    PREFORK_PRELOAD_TIMEOUT = 120  # seconds to wait for the similarity index before forking
+    PREFORK_STATUS_PATH = os.environ.get('PREFORK_STATUS_PATH', os.path.join('instance', 'prefork_status.json'))
@@ -1,8 +1,11 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
+from sqlalchemy import inspect, text
 from datetime import datetime
+from utils.db_routing import RoutingSession
 
-db = SQLAlchemy()
+# Reads in @read_replica routes may go to a replica (utils/db_routing.py)
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 class User(UserMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -29,6 +32,7 @@ class StudentProfile(db.Model):
     ats_score = db.Column(db.Float)
     personality_type = db.Column(db.String(50))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
 class ResumeData(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -47,3 +51,33 @@ class InterviewAttempt(db.Model):
     feedback = db.Column(db.Text)
     score = db.Column(db.Float)
     attempted_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+# Append-only; rows arrive in batches through utils/event_buffer.py
+class ActivityEvent(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, index=True)
+    kind = db.Column(db.String(50), nullable=False)  # page_view, prediction, resume_upload
+    detail = db.Column(db.Text)  # JSON string
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+class RevokedToken(db.Model):
+    jti = db.Column(db.String(64), primary_key=True)
+    user_id = db.Column(db.Integer)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    revoked_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+# Columns added after the first release; create_all() does not alter existing tables
+ADDED_COLUMNS = {
+    'student_profile': {'updated_at': 'DATETIME'},
+}
+
+def upgrade_schema():
+    inspector = inspect(db.engine)
+    with db.engine.begin() as conn:
+        for table, columns in ADDED_COLUMNS.items():
+            if not inspector.has_table(table):
+                continue
+            existing = {c['name'] for c in inspector.get_columns(table)}
+            for name, ddl in columns.items():
+                if name not in existing:
+                    conn.execute(text(f'ALTER TABLE {table} ADD COLUMN {name} {ddl}'))
@@ -1,10 +1,20 @@
-from flask import Blueprint, render_template, request, jsonify, flash, redirect, url_for
+from flask import Blueprint, render_template, request, jsonify, flash, redirect, url_for, current_app
 from flask_login import login_required, current_user
 from models.database import db, User, StudentProfile, InterviewAttempt
-import joblib
-import os
+from utils.http_cache import conditional_page
+from utils.admission import metrics as admission_metrics, admission_control
+from services.simulation_service import SimulationService, FEATURES, OPERATIONS
+from services.shap_summary_service import ShapSummaryService
+from utils.profile_snapshot import get_snapshot
+from utils.db_routing import read_replica
+from routes.student_routes import prediction_service
+import numpy as np
 
 admin_bp = Blueprint('admin', __name__)
+simulation_service = SimulationService(prediction_service)
+shap_summary_service = ShapSummaryService(simulation_service.prediction_service, simulation_service)
+
+SIMULATION_FORM_ROWS = 4
 
 @admin_bp.before_request
 @login_required
@@ -14,36 +24,123 @@ def check_admin():
         return redirect(url_for('student.dashboard'))
 
 @admin_bp.route('/analytics')
+@read_replica
 def analytics():
-    total_students = StudentProfile.query.count()
-    users = User.query.all()
-    profiles = StudentProfile.query.all()
-    
-    # Aggregates
-    career_counts = {}
-    total_intel = 0
-    for p in profiles:
-        career_counts[p.predicted_career] = career_counts.get(p.predicted_career, 0) + 1
-        total_intel += (p.intelligence_score or 0)
-        
-    avg_intel = round(total_intel / total_students, 2) if total_students > 0 else 0
-    top_career = max(career_counts, key=career_counts.get) if career_counts else "N/A"
-    
-    # Model info
-    model_path = os.path.join('models', 'career_model.pkl')
-    model_info = {}
-    if os.path.exists(model_path):
-        data = joblib.load(model_path)
-        model_info = {'accuracy': f"{data['accuracy']*100:.2f}%"}
+    # The snapshot's watermarks version the page; aggregates come from its columns, not ORM rows
+    snapshot = get_snapshot()
+    # The model this process serves, so a promoted version shows once the workers restart
+    prediction_service = simulation_service.prediction_service
+    shap_summary = shap_summary_service.load()
+    shap_status = shap_summary_service.status
+    drift_monitor = prediction_service.drift_monitor
+    drift_report = drift_monitor.latest() if drift_monitor else None
+    shadow = prediction_service.shadow
+    shadow_report = shadow.latest() if shadow else None
+
+    def render():
+        total_students = len(snapshot)
+
+        # Aggregates
+        career_counts = snapshot.value_counts('predicted_career')
+        total_intel = float(np.nansum(snapshot.column('intelligence_score')))
+
+        avg_intel = round(total_intel / total_students, 2) if total_students > 0 else 0
+        top_career = max(career_counts, key=career_counts.get) if career_counts else "N/A"
         
-    return render_template('admin_analytics.html', 
-                           total_students=total_students,
-                           avg_intel=avg_intel,
-                           top_career=top_career,
-                           model_info=model_info,
-                           career_counts=career_counts)
+        # Model info
+        model_info = {}
+        if prediction_service.model_data:
+            model_info = {'accuracy': f"{prediction_service.model_data['accuracy']*100:.2f}%",
+                          'version': prediction_service.model_version}
+            
+        return render_template('admin_analytics.html', 
+                               total_students=total_students,
+                               avg_intel=avg_intel,
+                               top_career=top_career,
+                               model_info=model_info,
+                               career_counts=career_counts,
+                               shap_summary=shap_summary,
+                               shap_status=shap_status,
+                               drift=drift_report,
+                               shadow=shadow_report)
+
+    return conditional_page(
+        ('analytics', current_user.id, current_user.username, len(snapshot), snapshot.updated_mark, snapshot.max_id, prediction_service.model_version,
+         shap_summary and shap_summary['computed_at'], shap_status['running'], shap_status['done'], shap_status['error'],
+         drift_report and drift_report['computed_at'], shadow_report and shadow_report['computed_at']),
+        snapshot.updated_mark, render
+    )
+
+@admin_bp.route('/shap-summary', methods=['GET', 'POST'])
+@admission_control('admin.shap_summary', per_minute=2, burst=1, max_concurrent=1, methods=['POST'])
+def shap_summary():
+    if request.method == 'POST':
+        if not shap_summary_service.prediction_service.model_data:
+            flash('Career model not loaded', 'danger')
+        elif shap_summary_service.start(current_app._get_current_object()):
+            flash('Computing SHAP summaries for every profile; the charts appear when it finishes.', 'info')
+        else:
+            flash('A SHAP summary run is already in progress.', 'warning')
+        return redirect(url_for('admin.analytics'))
+    return jsonify({'status': shap_summary_service.status, 'summary': shap_summary_service.load()})
+
+@admin_bp.route('/drift')
+def drift():
+    drift_monitor = simulation_service.prediction_service.drift_monitor
+    if drift_monitor is None:
+        return jsonify({"error": "The career model has no drift reference; retrain or run utils/drift.py reference"}), 404
+    if request.args.get('refresh') == '1':
+        return jsonify(drift_monitor.report())
+    return jsonify(drift_monitor.latest())
+
+@admin_bp.route('/shadow')
+def shadow():
+    evaluator = simulation_service.prediction_service.shadow
+    if evaluator is None:
+        return jsonify({"error": "No candidate model; train one with utils/train_models.py --candidate"}), 404
+    if request.args.get('refresh') == '1':
+        return jsonify(evaluator.report())
+    return jsonify(evaluator.latest())
 
 @admin_bp.route('/students')
+@read_replica
 def list_students():
     students = StudentProfile.query.all()
     return render_template('admin_students.html', students=students)
+
+@admin_bp.route('/admission')
+def admission():
+    return jsonify(admission_metrics.snapshot())
+
+def _form_scenarios(form):
+    scenarios = []
+    for i in range(SIMULATION_FORM_ROWS):
+        feature, value = form.get(f'feature_{i}'), form.get(f'value_{i}', '').strip()
+        if not feature or not value:
+            continue
+        scenarios.append({
+            'name': form.get(f'name_{i}') or f"{feature} {form.get(f'operation_{i}')} {value}",
+            'changes': {feature: {form.get(f'operation_{i}'): value}}
+        })
+    return {'scenarios': scenarios}
+
+@admin_bp.route('/simulation', methods=['GET', 'POST'])
+@admission_control('admin.simulation', per_minute=6, burst=3, max_concurrent=1, methods=['POST'])
+def simulation():
+    report = None
+    if request.method == 'POST':
+        payload = request.get_json(silent=True) if request.is_json else _form_scenarios(request.form)
+        try:
+            report = simulation_service.run(payload)
+        except ValueError as e:
+            if request.is_json:
+                return jsonify({"error": str(e)}), 400
+            flash(str(e), 'danger')
+        if request.is_json:
+            return jsonify(report)
+
+    interests = []
+    if simulation_service.prediction_service.model_data:
+        interests = [str(c) for c in simulation_service.prediction_service.model_data['le_interest'].classes_]
+    return render_template('admin_simulation.html', report=report, features=FEATURES, operations=OPERATIONS,
+                           interests=interests, rows=range(SIMULATION_FORM_ROWS), form=request.form)
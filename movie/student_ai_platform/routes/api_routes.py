@@ -1,13 +1,17 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, make_response
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from models.database import StudentProfile
 from services.prediction_service import PredictionService
+from services.market_service import MarketService
+from utils.admission import admission_control
 
 api_bp = Blueprint('api', __name__)
 prediction_service = PredictionService()
+market_service = MarketService()
 
 @api_bp.route('/predict', methods=['POST'])
 # @jwt_required()  # Optional: enable for production security
+@admission_control('api.predict', per_minute=60, burst=20, max_concurrent=8)
 def external_predict():
     data = request.json
     if not data:
@@ -18,7 +22,7 @@ def external_predict():
         return jsonify({"error": "Missing required fields"}), 400
         
     career, confidence = prediction_service.predict_career(data)
-    salary, _ = prediction_service.predict_salary(career, data['coding'])
+    salary, _ = prediction_service.predict_salary(career, data['coding'], data['cgpa'])
     
     return jsonify({
         "predicted_career": career,
@@ -26,3 +30,18 @@ def external_predict():
         "estimated_salary": salary,
         "status": "success"
     })
+
+@api_bp.route('/market', methods=['GET'])
+def market():
+    career = request.args.get('career')
+    etag, payload = market_service.get_market_payload(career)
+
+    # Dashboards revalidate with If-None-Match and skip the download when unchanged
+    if request.if_none_match.contains(etag):
+        response = make_response('', 304)
+    else:
+        response = jsonify(payload)
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.no_cache = True
+    return response
@@ -0,0 +1,165 @@
+"""
+Authenticated JSON API for non-browser clients (mobile app, partner portals).
+Send "Authorization: Bearer <token>" from POST /api/v1/auth/token.
+"""
+import json
+from flask import Blueprint, request, jsonify, current_app
+from models.database import db, User, StudentProfile, ResumeData
+from utils.admission import admission_control
+from utils.event_buffer import record_row, record_activity
+from utils.passwords import authenticate, HasherBusy
+from utils.token_auth import issue_token, revoke_current_token, token_required, token_user_id
+# The web pages' services, so the API adds no model copy, SHAP explainer or cache of its own
+from routes.student_routes import profile_service, resume_service, interview_service
+from routes.admin_routes import simulation_service
+
+api_v1_bp = Blueprint('api_v1', __name__)
+
+PREDICT_FIELDS = ['cgpa', 'aptitude', 'coding', 'comm', 'leadership', 'interest']
+
+def _profile_json(profile):
+    version = profile.updated_at or profile.created_at
+    return {
+        'name': profile.name,
+        'cgpa': profile.cgpa,
+        'aptitude_score': profile.aptitude_score,
+        'coding_skill': profile.coding_skill,
+        'communication_skill': profile.communication_skill,
+        'leadership_score': profile.leadership_score,
+        'interest_area': profile.interest_area,
+        'predicted_career': profile.predicted_career,
+        'predicted_salary': profile.predicted_salary,
+        'intelligence_score': profile.intelligence_score,
+        'career_readiness_score': profile.career_readiness_score,
+        'ats_score': profile.ats_score,
+        'personality_type': profile.personality_type,
+        'updated_at': version.isoformat() if version else None,
+    }
+
+def _current_profile():
+    return StudentProfile.query.filter_by(user_id=token_user_id()).first()
+
+@api_v1_bp.route('/auth/token', methods=['POST'])
+@admission_control('api_v1.token', per_minute=20, burst=10, max_concurrent=8)
+def token():
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or not all(isinstance(data.get(k), str) and data[k] for k in ('username', 'password')):
+        return jsonify({"error": "username and password are required"}), 400
+    user = User.query.filter_by(username=data['username']).first()
+    try:
+        valid = authenticate(user, data['password'])
+    except HasherBusy:
+        response = jsonify({"error": "Server busy, please retry"})
+        response.status_code = 503
+        response.headers['Retry-After'] = str(max(1, int(current_app.config.get('PASSWORD_HASH_TIMEOUT', 5.0))))
+        return response
+    if not valid:
+        return jsonify({"error": "Invalid credentials"}), 401
+
+    return jsonify({
+        "access_token": issue_token(user),
+        "token_type": "Bearer",
+        "expires_in": int(current_app.config['JWT_ACCESS_TOKEN_EXPIRES'].total_seconds()),
+        "role": user.role
+    })
+
+@api_v1_bp.route('/auth/revoke', methods=['POST'])
+@token_required()
+def revoke():
+    revoke_current_token()
+    return jsonify({"status": "revoked"})
+
+@api_v1_bp.route('/profile', methods=['GET'])
+@token_required()
+def profile():
+    student = _current_profile()
+    if not student:
+        return jsonify({"error": "No profile yet, POST /api/v1/predict first"}), 404
+    return jsonify(_profile_json(student))
+
+@api_v1_bp.route('/predict', methods=['POST'])
+@token_required()
+@admission_control('api_v1.predict', per_minute=60, burst=20, max_concurrent=8)
+def predict():
+    data = request.get_json(silent=True)
+    if not data:
+        return jsonify({"error": "No input data provided"}), 400
+    if not all(k in data for k in PREDICT_FIELDS):
+        return jsonify({"error": "Missing required fields"}), 400
+
+    try:
+        features = {
+            'cgpa': float(data['cgpa']), 'aptitude': int(data['aptitude']), 'coding': int(data['coding']),
+            'comm': int(data['comm']), 'leadership': int(data['leadership']), 'interest': data['interest']
+        }
+        student = profile_service.save_prediction(token_user_id(), data.get('name'), features)
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    current_app.extensions['similarity'].update(student)
+    record_activity('prediction', student.user_id, career=student.predicted_career)
+    return jsonify(_profile_json(student))
+
+@api_v1_bp.route('/resume-analysis', methods=['POST'])
+@token_required()
+@admission_control('api_v1.resume_analysis', per_minute=10, burst=3, max_concurrent=2)
+def resume_analysis():
+    student = _current_profile()
+    if not student or not student.predicted_career:
+        return jsonify({"error": "Predict a career before analysing a resume"}), 409
+    file = request.files.get('resume')
+    if not file or not file.filename.endswith('.pdf'):
+        return jsonify({"error": "Upload a PDF as the 'resume' field"}), 400
+
+    text = resume_service.extract_text_from_pdf(file)
+    analysis = resume_service.analyze_resume(text, student.predicted_career)
+
+    res_data = ResumeData.query.filter_by(student_id=student.id).first()
+    if not res_data:
+        res_data = ResumeData(student_id=student.id)
+        db.session.add(res_data)
+    res_data.filename = file.filename
+    res_data.extracted_skills = json.dumps(analysis['known_skills'])
+    res_data.missing_skills = json.dumps(analysis['missing_skills'])
+    student.ats_score = analysis['ats_score']
+    db.session.commit()
+    record_activity('resume_upload', student.user_id, ats_score=analysis['ats_score'])
+    return jsonify(analysis)
+
+@api_v1_bp.route('/interview/question', methods=['GET'])
+@token_required()
+def interview_question():
+    student = _current_profile()
+    if not student or not student.predicted_career:
+        return jsonify({"error": "Predict a career before starting an interview"}), 409
+    return jsonify({"career": student.predicted_career, "question": interview_service.generate_question(student.predicted_career)})
+
+@api_v1_bp.route('/interview/evaluate', methods=['POST'])
+@token_required()
+@admission_control('api_v1.interview', per_minute=30, burst=10, max_concurrent=4)
+def interview_evaluate():
+    student = _current_profile()
+    if not student or not student.predicted_career:
+        return jsonify({"error": "Predict a career before starting an interview"}), 409
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or not all(isinstance(data.get(k), str) and data[k] for k in ('question', 'answer')):
+        return jsonify({"error": "question and answer are required"}), 400
+
+    evaluation = interview_service.evaluate_answer(data['question'], data['answer'])
+    record_row('interview_attempt', {
+        'student_id': student.id,
+        'career_context': student.predicted_career,
+        'question': data['question'],
+        'answer': data['answer'],
+        'feedback': evaluation['feedback'],
+        'score': evaluation['score']
+    })
+    return jsonify(evaluation)
+
+@api_v1_bp.route('/simulations', methods=['POST'])
+@token_required('admin', 'counselor')
+@admission_control('api_v1.simulations', per_minute=6, burst=3, max_concurrent=1)
+def simulations():
+    try:
+        return jsonify(simulation_service.run(request.get_json(silent=True)))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
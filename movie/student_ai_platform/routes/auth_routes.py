@@ -1,18 +1,31 @@
-from flask import Blueprint, request, jsonify, render_template, redirect, url_for, flash
+from flask import Blueprint, request, jsonify, render_template, redirect, url_for, flash, make_response, current_app
 from flask_login import login_user, logout_user, login_required, current_user
 from models.database import db, User
-from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+from utils.passwords import hash_password, authenticate, HasherBusy
 
 auth_bp = Blueprint('auth', __name__)
 
+def _busy(template):
+    flash('Too many sign-ins right now, please try again in a moment', 'warning')
+    response = make_response(render_template(template), 503)
+    response.headers['Retry-After'] = str(max(1, int(current_app.config.get('PASSWORD_HASH_TIMEOUT', 5.0))))
+    return response
+
 @auth_bp.route('/login', methods=['GET', 'POST'])
 def login():
     if request.method == 'POST':
         username = request.form.get('username')
         password = request.form.get('password')
         user = User.query.filter_by(username=username).first()
-        
-        if user and check_password_hash(user.password, password):
+
+        try:
+            valid = authenticate(user, password)
+        except HasherBusy:
+            return _busy('login.html')
+
+        if valid:
             login_user(user)
             return redirect(url_for('student.dashboard'))
         else:
@@ -26,23 +39,31 @@ def register():
         email = request.form.get('email')
         password = request.form.get('password')
         role = request.form.get('role', 'student')
-        
-        if User.query.filter_by(username=username).first():
-            flash('Username already exists', 'danger')
-            return redirect(url_for('auth.register'))
-            
-        if User.query.filter_by(email=email).first():
-            flash('Email already registered', 'danger')
+
+        # One lookup for both constraints; the unique indexes catch concurrent sign-ups
+        existing = User.query.filter(or_(User.username == username, User.email == email)).first()
+        if existing:
+            flash('Username already exists' if existing.username == username else 'Email already registered', 'danger')
             return redirect(url_for('auth.register'))
-            
+
+        try:
+            hashed = hash_password(password)
+        except HasherBusy:
+            return _busy('register.html')
+
         new_user = User(
-            username=username, 
-            email=email, 
-            password=generate_password_hash(password),
+            username=username,
+            email=email,
+            password=hashed,
             role=role
         )
         db.session.add(new_user)
-        db.session.commit()
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            flash('Username or email already registered', 'danger')
+            return redirect(url_for('auth.register'))
         flash('Registration successful!', 'success')
         return redirect(url_for('auth.login'))
     return render_template('register.html')
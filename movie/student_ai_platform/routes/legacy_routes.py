@@ -0,0 +1,71 @@
+"""
+URLs of the retired student_ai_system app, served from the platform's
+services and database. Migrate its data with utils/migrate_legacy.py.
+"""
+import io
+from flask import Blueprint, request, redirect, url_for, flash, send_file, current_app
+from flask_login import login_required, current_user
+from models.database import StudentProfile
+from services.report_service import ReportService
+from utils.db_routing import read_replica
+from utils.event_buffer import record_activity
+# The student pages' services, so the legacy URLs add no model copy of their own
+from routes.student_routes import profile_service
+
+legacy_bp = Blueprint('legacy', __name__)
+
+report_service = ReportService()
+
+@legacy_bp.route('/predict', methods=['POST'])
+@login_required
+def predict():
+    try:
+        data = profile_service.features_from_form(request.form)
+        profile = profile_service.save_prediction(current_user.id, request.form.get('name'), data)
+    except (TypeError, ValueError) as e:
+        flash(f'Error during prediction: {str(e)}', 'danger')
+        return redirect(url_for('student.dashboard'))
+    current_app.extensions['similarity'].update(profile)
+    record_activity('prediction', current_user.id, career=profile.predicted_career)
+    return redirect(url_for('student.result'))
+
+@legacy_bp.route('/result')
+@login_required
+def result():
+    return redirect(url_for('student.result'), code=301)
+
+@legacy_bp.route('/export_pdf')
+@read_replica
+@login_required
+def export_pdf():
+    profile = StudentProfile.query.filter_by(user_id=current_user.id).first()
+    if not profile:
+        return redirect(url_for('student.dashboard'))
+
+    pdf = report_service.career_report_pdf(profile, current_user.email)
+    return send_file(io.BytesIO(pdf), as_attachment=True, download_name=f"{profile.name}_Career_Report.pdf", mimetype='application/pdf')
+
+@legacy_bp.route('/admin')
+@login_required
+def admin():
+    if current_user.role != 'admin':
+        flash('Unauthorized access', 'danger')
+        return redirect(url_for('student.dashboard'))
+    return redirect(url_for('admin.analytics'))
+
+# Old bookmarks and form targets; 308 keeps POST bodies on login and register
+@legacy_bp.route('/dashboard')
+def dashboard():
+    return redirect(url_for('student.dashboard'), code=301)
+
+@legacy_bp.route('/login', methods=['GET', 'POST'])
+def login():
+    return redirect(url_for('auth.login'), code=308)
+
+@legacy_bp.route('/register', methods=['GET', 'POST'])
+def register():
+    return redirect(url_for('auth.register'), code=308)
+
+@legacy_bp.route('/logout')
+def logout():
+    return redirect(url_for('auth.logout'), code=301)
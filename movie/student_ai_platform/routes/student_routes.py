@@ -1,94 +1,157 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, make_response, abort, current_app
 from flask_login import login_required, current_user
-from models.database import db, StudentProfile, ResumeData, InterviewAttempt
+from models.database import db, StudentProfile, ResumeData
 from services.prediction_service import PredictionService
 from services.resume_service import ResumeService
 from services.personality_service import PersonalityService
 from services.interview_service import InterviewService
 from services.market_service import MarketService
+from services.profile_service import ProfileService
+from services.similarity_service import SimilarityService
+from services.learning_path_service import LearningPathService
+from utils.http_cache import conditional_page, immutable
+from utils.admission import admission_control
+from utils.db_routing import read_replica
+from utils.event_buffer import record_row, record_activity
 import json
 
 student_bp = Blueprint('student', __name__)
 
 # Initialize Services
 prediction_service = PredictionService()
-resume_service = ResumeService()
+learning_path_service = LearningPathService()
+resume_service = ResumeService(learning_path_service)
 personality_service = PersonalityService()
 interview_service = InterviewService()
 market_service = MarketService()
+profile_service = ProfileService(prediction_service)
+
+@student_bp.record_once
+def register_similarity_index(state):
+    # One index per app, so apps on different databases never share results.
+    # create_app starts it once the tables exist
+    state.app.extensions['similarity'] = SimilarityService(prediction_service)
+
+def _profile_features(profile):
+    return {
+        'cgpa': profile.cgpa, 'aptitude': profile.aptitude_score, 
+        'coding': profile.coding_skill, 'comm': profile.communication_skill,
+        'leadership': profile.leadership_score, 'interest': profile.interest_area
+    }
+
+def _profile_version(profile):
+    if not profile:
+        return None
+    return profile.updated_at or profile.created_at
 
 @student_bp.route('/dashboard')
+@read_replica
 @login_required
 def dashboard():
     profile = StudentProfile.query.filter_by(user_id=current_user.id).first()
-    market_data = market_service.get_all_market_data()
-    return render_template('dashboard.html', profile=profile, market_data=market_data)
+    version = _profile_version(profile)
+
+    def render():
+        market_data = market_service.get_all_market_data()
+        return render_template('dashboard.html', profile=profile, market_data=market_data)
+
+    return conditional_page(
+        ('dashboard', current_user.id, current_user.username, current_user.role, version, market_service.get_etag()),
+        version, render
+    )
 
 @student_bp.route('/predict', methods=['POST'])
 @login_required
 def predict():
-    data = {
-        'cgpa': float(request.form.get('cgpa')),
-        'aptitude': int(request.form.get('aptitude')),
-        'coding': int(request.form.get('coding')),
-        'comm': int(request.form.get('communication')),
-        'leadership': int(request.form.get('leadership')),
-        'interest': request.form.get('interest')
-    }
-    
-    career, confidence = prediction_service.predict_career(data)
-    
-    # Calculate Intelligence & Readiness (Re-using logic from monolithic)
-    intel_score = round((data['cgpa'] * 20) * 0.4 + (data['aptitude']) * 0.3 + (data['coding'] * 10) * 0.3, 2)
-    readiness = round((data['coding'] * 10 + data['comm'] * 10 + data['leadership'] * 10 + data['cgpa'] * 25) / 4, 2)
-    
-    # Salary prediction
-    salary, projection = prediction_service.predict_salary(career, data['coding'])
-    
-    # Update Profile
-    profile = StudentProfile.query.filter_by(user_id=current_user.id).first()
-    if not profile:
-        profile = StudentProfile(user_id=current_user.id)
-        db.session.add(profile)
-        
-    profile.name = request.form.get('name')
-    profile.cgpa = data['cgpa']
-    profile.aptitude_score = data['aptitude']
-    profile.coding_skill = data['coding']
-    profile.communication_skill = data['comm']
-    profile.leadership_score = data['leadership']
-    profile.interest_area = data['interest']
-    profile.predicted_career = career
-    profile.predicted_salary = salary
-    profile.intelligence_score = intel_score
-    profile.career_readiness_score = readiness
-    
-    db.session.commit()
+    data = profile_service.features_from_form(request.form)
+    profile = profile_service.save_prediction(current_user.id, request.form.get('name'), data)
+    current_app.extensions['similarity'].update(profile)
+    record_activity('prediction', current_user.id, career=profile.predicted_career)
     return redirect(url_for('student.result'))
 
 @student_bp.route('/result')
+@read_replica
 @login_required
 def result():
     profile = StudentProfile.query.filter_by(user_id=current_user.id).first()
     if not profile:
         return redirect(url_for('student.dashboard'))
-        
+
+    version = _profile_version(profile)
+    # Skills from the last resume analysis personalize the roadmap
+    resume = ResumeData.query.filter_by(student_id=profile.id).first()
+    known_skills = tuple(json.loads(resume.extracted_skills or '[]')) if resume else ()
+
+    def render():
+        # SHAP image is served from its own content-keyed URL so it is cached separately
+        explanation_url = None
+        if prediction_service.model_data:
+            key = prediction_service.explanation_key(_profile_features(profile))
+            explanation_url = url_for('student.explanation', key=key)
+
+        # Get Market Insights
+        market_info = market_service.get_market_insights(profile.predicted_career)
+        roadmap = learning_path_service.roadmap(profile.predicted_career, known_skills)
+
+        return render_template('result.html', profile=profile, explanation_url=explanation_url, market=market_info,
+                               roadmap=roadmap, has_resume=resume is not None)
+
+    return conditional_page(
+        ('result', current_user.id, current_user.username, current_user.role, version,
+         market_service.get_etag(), prediction_service.model_version,
+         learning_path_service.version, resume is not None, ','.join(known_skills)),
+        version, render
+    )
+
+@student_bp.route('/similar')
+@read_replica
+@login_required
+def similar():
+    profile = StudentProfile.query.filter_by(user_id=current_user.id).first()
+    if not profile or not profile.predicted_career:
+        flash('Please complete your profile prediction first.', 'warning')
+        return redirect(url_for('student.dashboard'))
+
+    k = min(max(request.args.get('k', 10, type=int), 1), 50)
+    neighbours = current_app.extensions['similarity'].similar(profile, k)
+    peers, outcomes = [], {}
+    if neighbours:
+        by_id = {p.id: p for p in StudentProfile.query.filter(StudentProfile.id.in_([i for _, i in neighbours]))}
+        for distance, peer_id in neighbours:
+            peer = by_id.get(peer_id)
+            if peer is None:
+                continue
+            peers.append({'profile': peer, 'similarity': round(100 / (1 + distance))})
+            outcomes[peer.predicted_career] = outcomes.get(peer.predicted_career, 0) + 1
+
+    return render_template('similar.html', profile=profile, peers=peers, k=k, loading=neighbours is None,
+                           outcomes=sorted(outcomes.items(), key=lambda kv: -kv[1]))
+
+@student_bp.route('/explanation/<key>.png')
+@read_replica
+@login_required
+@admission_control('student.explanation', per_minute=20, burst=5, max_concurrent=2)
+def explanation(key):
+    profile = StudentProfile.query.filter_by(user_id=current_user.id).first()
+    if not profile or not prediction_service.model_data:
+        abort(404)
+
+    features = _profile_features(profile)
+    current_key = prediction_service.explanation_key(features)
+    if key != current_key:
+        # Profile changed since the page was rendered
+        return redirect(url_for('student.explanation', key=current_key))
+
     # Get explanation (SHAP)
     # Note: SHAP image generation might be slow, could be async in prod
-    features = {
-        'cgpa': profile.cgpa, 'aptitude': profile.aptitude_score, 
-        'coding': profile.coding_skill, 'comm': profile.communication_skill,
-        'leadership': profile.leadership_score, 'interest': profile.interest_area
-    }
-    explanation_img = prediction_service.get_explanation(features)
-    
-    # Get Market Insights
-    market_info = market_service.get_market_insights(profile.predicted_career)
-    
-    return render_template('result.html', profile=profile, explanation=explanation_img, market=market_info)
+    png = prediction_service.get_explanation_png(features)
+    response = make_response(png)
+    response.mimetype = 'image/png'
+    return immutable(response)
 
 @student_bp.route('/resume-analysis', methods=['GET', 'POST'])
 @login_required
+@admission_control('student.resume_analysis', per_minute=10, burst=3, max_concurrent=2, methods=['POST'])
 def resume_analysis():
     profile = StudentProfile.query.filter_by(user_id=current_user.id).first()
     analysis_result = None
@@ -106,10 +169,11 @@ def resume_analysis():
                 db.session.add(res_data)
             
             res_data.filename = file.filename
-            res_data.extracted_skills = json.dumps(analysis_result['found_skills'])
+            res_data.extracted_skills = json.dumps(analysis_result['known_skills'])
             res_data.missing_skills = json.dumps(analysis_result['missing_skills'])
             profile.ats_score = analysis_result['ats_score']
             db.session.commit()
+            record_activity('resume_upload', current_user.id, ats_score=analysis_result['ats_score'])
             
     return render_template('resume_analysis.html', profile=profile, result=analysis_result)
 
@@ -145,16 +209,14 @@ def interview():
             a = request.form.get('answer')
             evaluation = interview_service.evaluate_answer(q, a)
             
-            # Save attempt
-            attempt = InterviewAttempt(
-                student_id=profile.id,
-                career_context=profile.predicted_career,
-                question=q,
-                answer=a,
-                feedback=evaluation['feedback'],
-                score=evaluation['score']
-            )
-            db.session.add(attempt)
-            db.session.commit()
+            # Save attempt; inserted with the next batch rather than committed here
+            record_row('interview_attempt', {
+                'student_id': profile.id,
+                'career_context': profile.predicted_career,
+                'question': q,
+                'answer': a,
+                'feedback': evaluation['feedback'],
+                'score': evaluation['score']
+            })
             
     return render_template('interview.html', profile=profile, question=question, evaluation=evaluation)
@@ -0,0 +1,322 @@
+"""
+Preforking production server. Run with:
+
+    python serve.py --bind 0.0.0.0:8000     # one worker per core
+    python serve.py --report                # per-worker memory of the running server
+
+The master builds the app once, warms everything that otherwise loads on
+first use (SHAP explainer, market data, templates, similarity index), moves
+the heap out of the garbage collector's reach with gc.freeze() and only then
+forks. Workers therefore share the imported libraries and models
+copy-on-write instead of each importing shap/spaCy/NLTK and loading the
+models again. Each worker serves the shared listening socket with werkzeug's
+threaded WSGI server. The master replaces workers that exit, and recycles
+any whose unique memory (USS) passes PREFORK_MAX_WORKER_USS_MB once its
+in-flight requests finish.
+
+Signals to the master: TERM/INT stop, HUP recycles every worker, USR1
+prints the memory report.
+"""
+import gc
+
+# Objects allocated during preload would otherwise be collected, and their
+# pages touched, in every worker; freeze them before forking instead
+gc.disable()
+
+import os
+import sys
+import json
+import time
+import signal
+import socket
+import argparse
+import threading
+
+def read_memory(pid):
+    """
+    RSS, PSS, USS (pages only this process maps) and shared MB from /proc/<pid>/smaps_rollup
+    """
+    fields = {}
+    try:
+        with open(f'/proc/{pid}/smaps_rollup') as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0].endswith(':') and parts[1].isdigit():
+                    fields[parts[0][:-1]] = int(parts[1])
+    except OSError:
+        return None
+
+    def mb(*names):
+        return round(sum(fields.get(n, 0) for n in names) / 1024, 1)
+
+    return {
+        'rss_mb': mb('Rss'), 'pss_mb': mb('Pss'),
+        'uss_mb': mb('Private_Clean', 'Private_Dirty'), 'shared_mb': mb('Shared_Clean', 'Shared_Dirty'),
+    }
+
+def default_workers():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+def warm_up(app):
+    """
+    Loads in the master what each worker would otherwise load on first use
+    """
+    from routes import student_routes
+
+    with app.app_context():
+        if student_routes.prediction_service.model_data:
+            student_routes.prediction_service._get_explainer()
+        student_routes.market_service.get_all_market_data()
+    for name in app.jinja_env.list_templates():
+        app.jinja_env.get_template(name)
+    similarity = app.extensions.get('similarity')
+    if similarity is not None:
+        similarity.wait_ready(app.config.get('PREFORK_PRELOAD_TIMEOUT', 120))
+
+def after_fork(app):
+    from models.database import db
+
+    # Connections opened by the master must not be shared with the workers
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+    similarity = app.extensions.get('similarity')
+    if similarity is not None:
+        similarity.start(app)
+
+def before_exit(app):
+    """
+    Flushes what the worker buffers in memory. Workers leave with os._exit,
+    which skips atexit handlers
+    """
+    from utils import drift, shadow
+
+    event_buffer = app.extensions.get('event_buffer')
+    for flush in (event_buffer.close if event_buffer is not None else None, drift.flush_all, shadow.flush_all):
+        if flush is None:
+            continue
+        try:
+            flush()
+        except Exception as e:
+            print(f"Worker {os.getpid()} exit flush failed: {e}", file=sys.stderr, flush=True)
+
+def format_report(status):
+    lines = [f"{'pid':>8} {'role':<8} {'age s':>7} {'rss MB':>8} {'pss MB':>8} {'uss MB':>8} {'shared MB':>10}"]
+    for proc in [status['master']] + status['workers']:
+        memory = proc.get('memory') or {}
+        lines.append(f"{proc['pid']:>8} {proc['role']:<8} {proc['age_s']:>7} {memory.get('rss_mb', '-'):>8} "
+                     f"{memory.get('pss_mb', '-'):>8} {memory.get('uss_mb', '-'):>8} {memory.get('shared_mb', '-'):>10}")
+    totals = status['totals']
+    lines.append(f"workers: {len(status['workers'])}, mean USS {totals['mean_worker_uss_mb']} MB, "
+                 f"total PSS {totals['total_pss_mb']} MB, recycled {status['recycled']}")
+    return '\n'.join(lines)
+
+class Arbiter:
+    def __init__(self, app_factory, sock, workers, preload=True, max_uss_mb=0, check_interval=10,
+                 graceful_timeout=30, status_path=None):
+        self.app_factory = app_factory
+        self.app = None
+        self.sock = sock
+        self.num_workers = workers
+        self.preload = preload
+        self.max_uss_mb = max_uss_mb
+        self.check_interval = check_interval
+        self.graceful_timeout = graceful_timeout
+        self.status_path = status_path
+        self.workers = {}  # pid -> {'started', 'stopping'}
+        self.recycled = 0
+        self.running = True
+        self.started = time.time()
+
+    # Master
+
+    def run(self):
+        if self.preload:
+            self.app = self.app_factory()
+            warm_up(self.app)
+            gc.freeze()
+        # The master keeps running background threads (similarity refresh, event
+        # buffer); the frozen heap stays out of reach, their garbage does not
+        gc.enable()
+
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+        signal.signal(signal.SIGHUP, lambda *_: self._recycle_all())
+        signal.signal(signal.SIGUSR1, lambda *_: print(format_report(self.status()), file=sys.stderr, flush=True))
+
+        print(f"Master {os.getpid()} serving on {self.sock.getsockname()} with {self.num_workers} workers "
+              f"({'preloaded' if self.preload else 'no preload'})", file=sys.stderr, flush=True)
+        next_check = time.monotonic() + self.check_interval
+        while self.running:
+            self._reap()
+            while sum(1 for w in self.workers.values() if not w['stopping']) < self.num_workers:
+                self._spawn()
+            self._kill_stragglers()
+            if time.monotonic() >= next_check:
+                self._check_memory()
+                next_check = time.monotonic() + self.check_interval
+            time.sleep(0.5)
+        self._shutdown()
+
+    def _stop(self, *_):
+        self.running = False
+
+    def _spawn(self):
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                self._run_worker()
+            except BaseException as e:
+                print(f"Worker {os.getpid()} failed: {e}", file=sys.stderr, flush=True)
+                code = 1
+            finally:
+                os._exit(code)
+        self.workers[pid] = {'started': time.time(), 'stopping': None}
+
+    def _reap(self):
+        while self.workers:
+            try:
+                pid, _ = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            self.workers.pop(pid, None)
+
+    def _retire(self, pid):
+        if self.workers[pid]['stopping'] is None:
+            self.workers[pid]['stopping'] = time.monotonic()
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def _recycle_all(self):
+        for pid in list(self.workers):
+            self._retire(pid)
+            self.recycled += 1
+
+    def _kill_stragglers(self):
+        for pid, worker in self.workers.items():
+            if worker['stopping'] is not None and time.monotonic() - worker['stopping'] > self.graceful_timeout:
+                try:
+                    os.kill(pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+
+    def _check_memory(self):
+        status = self.status()
+        if self.max_uss_mb:
+            for worker in status['workers']:
+                memory = worker.get('memory')
+                if memory and memory['uss_mb'] > self.max_uss_mb and not self.workers[worker['pid']]['stopping']:
+                    print(f"Recycling worker {worker['pid']}: USS {memory['uss_mb']} MB > {self.max_uss_mb} MB",
+                          file=sys.stderr, flush=True)
+                    self._retire(worker['pid'])
+                    self.recycled += 1
+        if self.status_path:
+            os.makedirs(os.path.dirname(self.status_path) or '.', exist_ok=True)
+            tmp = f"{self.status_path}.tmp"
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(status, f, indent=2)
+            os.replace(tmp, self.status_path)
+
+    def status(self):
+        now = time.time()
+        workers = [{'pid': pid, 'role': 'worker', 'age_s': int(now - w['started']), 'memory': read_memory(pid)}
+                   for pid, w in sorted(self.workers.items()) if not w['stopping']]
+        measured = [w['memory'] for w in workers if w['memory']]
+        master = {'pid': os.getpid(), 'role': 'master', 'age_s': int(now - self.started), 'memory': read_memory(os.getpid())}
+        return {
+            'preload': self.preload,
+            'recycled': self.recycled,
+            'master': master,
+            'workers': workers,
+            'totals': {
+                'mean_worker_uss_mb': round(sum(m['uss_mb'] for m in measured) / len(measured), 1) if measured else None,
+                'total_pss_mb': round(sum(m['pss_mb'] for m in measured + [master['memory'] or {'pss_mb': 0}]), 1),
+            },
+        }
+
+    def _shutdown(self):
+        for pid in list(self.workers):
+            self._retire(pid)
+        deadline = time.monotonic() + self.graceful_timeout
+        while self.workers and time.monotonic() < deadline:
+            self._reap()
+            time.sleep(0.1)
+        for pid in list(self.workers):
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+        self._reap()
+
+    # Worker
+
+    def _run_worker(self):
+        from werkzeug.serving import make_server
+
+        signal.signal(signal.SIGINT, signal.SIG_IGN)  # Ctrl-C reaches the whole group; the master decides
+        signal.signal(signal.SIGHUP, signal.SIG_DFL)
+        signal.signal(signal.SIGUSR1, signal.SIG_DFL)
+        gc.enable()
+        if self.app is None:
+            self.app = self.app_factory()
+        else:
+            after_fork(self.app)
+
+        host, port = self.sock.getsockname()[:2]
+        server = make_server(host, port, self.app, threaded=True, fd=self.sock.fileno())
+        # Let server_close() wait for in-flight requests instead of dropping them
+        server.daemon_threads = False
+        server.block_on_close = True
+        signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=server.shutdown, daemon=True).start())
+        server.serve_forever()
+        server.server_close()
+        before_exit(self.app)
+
+def bind(address, backlog=2048):
+    host, _, port = address.rpartition(':')
+    sock = socket.create_server((host or '0.0.0.0', int(port)), backlog=backlog, reuse_port=False)
+    sock.set_inheritable(True)
+    return sock
+
+def main(argv=None):
+    from config import Config
+
+    parser = argparse.ArgumentParser(description="Preforking production server")
+    parser.add_argument('--bind', default=Config.PREFORK_BIND)
+    parser.add_argument('--workers', type=int, default=Config.PREFORK_WORKERS or default_workers())
+    parser.add_argument('--max-worker-uss-mb', type=float, default=Config.PREFORK_MAX_WORKER_USS_MB)
+    parser.add_argument('--no-preload', action='store_true', help="build the app in each worker instead (for comparison)")
+    parser.add_argument('--report', action='store_true', help="print the running server's memory report and exit")
+    args = parser.parse_args(argv)
+
+    if args.report:
+        if not os.path.exists(Config.PREFORK_STATUS_PATH):
+            print(f"No status at {Config.PREFORK_STATUS_PATH}; is the server running?")
+            return 1
+        with open(Config.PREFORK_STATUS_PATH, 'r', encoding='utf-8') as f:
+            print(format_report(json.load(f)))
+        return 0
+
+    from app import create_app
+
+    arbiter = Arbiter(
+        create_app, bind(args.bind), args.workers,
+        preload=not args.no_preload,
+        max_uss_mb=args.max_worker_uss_mb,
+        check_interval=Config.PREFORK_CHECK_INTERVAL,
+        graceful_timeout=Config.PREFORK_GRACEFUL_TIMEOUT,
+        status_path=Config.PREFORK_STATUS_PATH,
+    )
+    arbiter.run()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,248 @@
+"""
+Skill graph behind the learning-path roadmaps: skills point to their
+prerequisites and careers to the skills they require. The graph is built
+once per process into adjacency arrays, and each skill's prerequisite
+closure is stored as a bitmask, so a roadmap is a handful of integer ORs:
+
+    needed = closure of every requirement not already covered - covered skills
+
+The steps come out in prerequisite order and are memoized per
+(career, known skills), so repeated requests are a dictionary lookup.
+"""
+import re
+import hashlib
+import threading
+from functools import lru_cache
+import numpy as np
+
+# skill -> (label, weeks to learn, prerequisites)
+SKILLS = {
+    'programming basics': ('Programming Fundamentals', 4, ()),
+    'python': ('Python', 4, ('programming basics',)),
+    'r': ('R', 3, ('programming basics',)),
+    'java': ('Java', 6, ('programming basics',)),
+    'c++': ('C++', 8, ('programming basics',)),
+    'git': ('Git & Version Control', 1, ()),
+    'sql': ('SQL', 3, ()),
+    'linux': ('Linux', 3, ()),
+    'statistics': ('Statistics & Probability', 6, ()),
+    'linear algebra': ('Linear Algebra', 4, ()),
+    'data structures': ('Data Structures', 6, ('programming basics',)),
+    'algorithms': ('Algorithms', 8, ('data structures',)),
+    'system design': ('System Design', 6, ('algorithms', 'sql')),
+    'pandas': ('pandas', 2, ('python',)),
+    'data visualization': ('Data Visualization', 2, ('pandas',)),
+    'scikit-learn': ('scikit-learn', 3, ('pandas', 'statistics')),
+    'machine learning': ('Machine Learning', 8, ('scikit-learn', 'linear algebra')),
+    'deep learning': ('Deep Learning', 8, ('machine learning',)),
+    'pytorch': ('PyTorch', 4, ('deep learning',)),
+    'tensorflow': ('TensorFlow', 4, ('deep learning',)),
+    'html': ('HTML', 1, ()),
+    'css': ('CSS', 2, ('html',)),
+    'javascript': ('JavaScript', 6, ('html', 'programming basics')),
+    'react': ('React', 4, ('javascript', 'css')),
+    'node': ('Node.js', 4, ('javascript',)),
+    'api': ('REST APIs', 2, ('programming basics',)),
+    'flask': ('Flask', 2, ('python', 'api')),
+    'django': ('Django', 4, ('python', 'sql', 'api')),
+    'networking': ('Networking Fundamentals', 4, ()),
+    'firewalls': ('Firewalls', 2, ('networking',)),
+    'network security': ('Network Security', 6, ('networking', 'linux')),
+    'cryptography': ('Cryptography', 6, ('programming basics',)),
+    'ethical hacking': ('Ethical Hacking', 8, ('network security',)),
+    'excel': ('Excel', 2, ()),
+    'tableau': ('Tableau', 3, ('excel',)),
+    'power bi': ('Power BI', 3, ('excel',)),
+    'business logic': ('Business Process Modelling', 3, ()),
+    'presentation': ('Presentation Skills', 2, ()),
+    'design fundamentals': ('Design Fundamentals', 4, ()),
+    'user research': ('User Research', 4, ()),
+    'wireframing': ('Wireframing', 2, ('design fundamentals',)),
+    'prototyping': ('Prototyping', 3, ('wireframing',)),
+    'figma': ('Figma', 2, ('design fundamentals',)),
+    'sketch': ('Sketch', 2, ('design fundamentals',)),
+    'adobe xd': ('Adobe XD', 2, ('design fundamentals',)),
+}
+
+# career -> required skills, in the order the resume analyzer reports them
+CAREER_SKILLS = {
+    'AI Engineer': ('python', 'pytorch', 'tensorflow', 'machine learning', 'deep learning', 'git', 'sql'),
+    'Data Scientist': ('python', 'r', 'statistics', 'pandas', 'sql', 'scikit-learn', 'data visualization'),
+    'Web Developer': ('html', 'css', 'javascript', 'react', 'node', 'django', 'flask', 'api'),
+    'Software Developer': ('java', 'c++', 'python', 'algorithms', 'data structures', 'system design'),
+    'Cyber Security Analyst': ('network security', 'linux', 'ethical hacking', 'firewalls', 'cryptography'),
+    'Business Analyst': ('excel', 'tableau', 'power bi', 'sql', 'business logic', 'presentation'),
+    'UI/UX Designer': ('figma', 'sketch', 'adobe xd', 'user research', 'wireframing', 'prototyping'),
+    'General IT': ('programming basics', 'linux', 'networking', 'sql', 'git'),
+}
+
+# Other spellings found in resumes
+ALIASES = {
+    'sklearn': 'scikit-learn', 'node.js': 'node', 'nodejs': 'node', 'powerbi': 'power bi',
+    'rest api': 'api', 'statistical analysis': 'statistics', 'probability': 'statistics',
+    'ux research': 'user research', 'computer networks': 'networking', 'js': 'javascript',
+}
+
+class SkillGraph:
+    def __init__(self, skills=SKILLS, careers=CAREER_SKILLS, aliases=ALIASES):
+        self.skills = list(skills)
+        self.index = {skill: i for i, skill in enumerate(self.skills)}
+        self.labels = [skills[s][0] for s in self.skills]
+        self.weeks = np.array([skills[s][1] for s in self.skills], dtype=np.int16)
+
+        # skill -> prerequisites and career -> required skills as CSR adjacency arrays
+        prereqs = [[self.index[p] for p in skills[s][2]] for s in self.skills]
+        self.prereq_indptr = np.cumsum([0] + [len(p) for p in prereqs]).astype(np.int32)
+        self.prereq_indices = np.array([p for ps in prereqs for p in ps], dtype=np.int32)
+        self.careers = list(careers)
+        self.career_index = {career: c for c, career in enumerate(self.careers)}
+        required = [[self.index[s] for s in careers[c]] for c in self.careers]
+        self.career_indptr = np.cumsum([0] + [len(r) for r in required]).astype(np.int32)
+        self.career_indices = np.array([s for rs in required for s in rs], dtype=np.int32)
+
+        self.order = self._topological_order()
+        # closure[i]: bit i plus the bits of every transitive prerequisite of i
+        self.closure = [0] * len(self.skills)
+        for i in self.order:
+            mask = 1 << int(i)
+            for p in self.prerequisites(i):
+                mask |= self.closure[p]
+            self.closure[i] = mask
+
+        self.version = hashlib.sha1(repr((skills, careers)).encode('utf-8')).hexdigest()[:12]
+        names = {skill: skill for skill in self.skills}
+        names.update(aliases)
+        pattern = '|'.join(re.escape(n) for n in sorted(names, key=len, reverse=True))
+        # Whole words only, so "r" does not match every word containing an r
+        self._names = names
+        self._pattern = re.compile(rf'(?<![a-z0-9+#])({pattern})(?![a-z0-9+#])')
+
+    def prerequisites(self, i):
+        return self.prereq_indices[self.prereq_indptr[i]:self.prereq_indptr[i + 1]].tolist()
+
+    def requirements(self, career):
+        c = self.career_index[career]
+        return self.career_indices[self.career_indptr[c]:self.career_indptr[c + 1]].tolist()
+
+    def path_order(self, career):
+        """
+        The career's requirements and their prerequisites, each requirement
+        right after the prerequisites it still needs (depth-first post-order)
+        """
+        order, seen = [], set()
+
+        def visit(i):
+            if i in seen:
+                return
+            seen.add(i)
+            for p in self.prerequisites(i):
+                visit(p)
+            order.append(i)
+
+        for r in self.requirements(career):
+            visit(r)
+        return order
+
+    def _topological_order(self):
+        indegree = np.diff(self.prereq_indptr)
+        dependents = [[] for _ in self.skills]
+        for i in range(len(self.skills)):
+            for p in self.prerequisites(i):
+                dependents[p].append(i)
+        ready = [i for i in range(len(self.skills)) if indegree[i] == 0]
+        order = []
+        while ready:
+            i = ready.pop(0)
+            order.append(i)
+            for d in dependents[i]:
+                indegree[d] -= 1
+                if indegree[d] == 0:
+                    ready.append(d)
+        if len(order) != len(self.skills):
+            raise ValueError("Skill prerequisites contain a cycle")
+        return order
+
+    def skills_in(self, text):
+        return {self._names[m] for m in self._pattern.findall(text.lower())}
+
+    def known_mask(self, skills):
+        mask = 0
+        for skill in skills:
+            i = self.index.get(skill)
+            if i is not None:
+                # Knowing a skill covers its prerequisites too
+                mask |= self.closure[i]
+        return mask
+
+_graph = None
+_graph_lock = threading.Lock()
+
+def get_skill_graph():
+    global _graph
+    if _graph is None:
+        with _graph_lock:
+            if _graph is None:
+                _graph = SkillGraph()
+    return _graph
+
+class LearningPathService:
+    def __init__(self, graph=None):
+        self.graph = graph or get_skill_graph()
+        self._orders = {career: self.graph.path_order(career) for career in self.graph.careers}
+        self._relevant = {}
+        for career, order in self._orders.items():
+            mask = 0
+            for i in order:
+                mask |= 1 << i
+            self._relevant[career] = mask
+        self._cached_path = lru_cache(maxsize=8192)(self._path)
+
+    @property
+    def version(self):
+        return self.graph.version
+
+    def requirements(self, career):
+        if career not in self._relevant:
+            return []
+        return [self.graph.skills[i] for i in self.graph.requirements(career)]
+
+    def skills_in(self, text):
+        return self.graph.skills_in(text)
+
+    def covered(self, known_skills):
+        """
+        Skills known_skills cover, prerequisites included; the roadmap counts
+        a requirement in this set as met
+        """
+        mask = self.graph.known_mask(known_skills)
+        return {skill for i, skill in enumerate(self.graph.skills) if mask >> i & 1}
+
+    def _path(self, career, known):
+        graph = self.graph
+        required = graph.requirements(career)
+        needed = 0
+        for r in required:
+            if not known >> r & 1:
+                needed |= graph.closure[r]
+        needed &= ~known
+        steps = tuple(
+            {'skill': graph.skills[i], 'label': graph.labels[i], 'weeks': int(graph.weeks[i]), 'required': i in required}
+            for i in self._orders[career] if needed >> i & 1
+        )
+        return {
+            'career': career,
+            'steps': steps,
+            'weeks': sum(step['weeks'] for step in steps),
+            'requirements_met': sum(1 for r in required if known >> r & 1),
+            'requirements': len(required),
+        }
+
+    def roadmap(self, career, known_skills=()):
+        """
+        Ordered steps from known_skills to every skill the career requires.
+        Returns None for a career outside the graph
+        """
+        if career not in self._relevant:
+            return None
+        # Only skills under this career's requirements change its path
+        return self._cached_path(career, self.graph.known_mask(known_skills) & self._relevant[career])
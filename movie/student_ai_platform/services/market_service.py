@@ -1,5 +1,186 @@
+import os
+import time
+import json
+import hashlib
+import threading
+import numpy as np
+import pandas as pd
+
+class MarketSnapshot:
+    """
+    Immutable, pre-aggregated view of one market data drop.
+    Raw rows are reduced to per-career / per-region columnar arrays on load.
+    """
+    def __init__(self, careers, regions, postings, salary_sum, recent, previous, etag):
+        self.careers = careers          # (n_careers,) object array of names
+        self.regions = regions          # (n_regions,) object array of names
+        self.postings = postings        # (n_careers, n_regions) float64
+        self.salary_sum = salary_sum    # (n_careers, n_regions) posting-weighted salary totals
+        self.recent = recent            # (n_careers,) postings in the latest window
+        self.previous = previous        # (n_careers,) postings in the window before it
+        self.etag = etag
+        self.career_index = {c: i for i, c in enumerate(careers)}
+        self._build_views()
+
+    def _build_views(self):
+        career_postings = self.postings.sum(axis=1)
+        region_postings = self.postings.sum(axis=0)
+        peak = career_postings.max() if len(career_postings) else 0
+        demand = np.round(career_postings / peak * 100) if peak else np.zeros(len(self.careers))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            growth = np.where(self.previous > 0, (self.recent - self.previous) / self.previous * 100, 0)
+            career_salary = np.where(career_postings > 0, self.salary_sum.sum(axis=1) / career_postings, 0)
+            region_salary = np.where(region_postings > 0, self.salary_sum.sum(axis=0) / region_postings, 0)
+
+        self.by_career = {}
+        for i, career in enumerate(self.careers):
+            self.by_career[career] = {
+                'demand': int(demand[i]),
+                'growth': round(float(growth[i]), 1),
+                'trend': MarketDataStore.trend_label(growth[i]),
+                'postings': int(career_postings[i]),
+                'avg_salary': round(float(career_salary[i]), 2)
+            }
+        self.by_region = {}
+        for j, region in enumerate(self.regions):
+            self.by_region[region] = {
+                'postings': int(region_postings[j]),
+                'avg_salary': round(float(region_salary[j]), 2)
+            }
+
+    def career_regions(self, career):
+        i = self.career_index.get(career)
+        if i is None:
+            return {}
+        row = self.postings[i]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            salary = np.where(row > 0, self.salary_sum[i] / row, 0)
+        return {
+            region: {'postings': int(row[j]), 'avg_salary': round(float(salary[j]), 2)}
+            for j, region in enumerate(self.regions) if row[j] > 0
+        }
+
+class MarketDataStore:
+    """
+    Loads CSV/Parquet market drops (date, career, region, salary[, postings])
+    from a directory and keeps only their aggregates in memory.
+    A refresh builds a new snapshot off to the side and swaps it in atomically.
+    """
+    extensions = ('.csv', '.parquet')
+    window_days = 30
+
+    def __init__(self, data_dir, refresh_interval=300):
+        self.data_dir = data_dir
+        self.refresh_interval = refresh_interval
+        self.snapshot = None
+        self._signature = None
+        self._checked_at = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def trend_label(growth):
+        if growth >= 25:
+            return 'Rising'
+        if growth >= 10:
+            return 'High'
+        if growth >= 0:
+            return 'Stable'
+        return 'Declining'
+
+    def _source_files(self):
+        if not os.path.isdir(self.data_dir):
+            return []
+        return sorted(
+            os.path.join(self.data_dir, f) for f in os.listdir(self.data_dir)
+            if f.endswith(self.extensions)
+        )
+
+    def _signature_for(self, files):
+        return tuple((f, os.path.getsize(f), os.path.getmtime(f)) for f in files)
+
+    def _read_file(self, path):
+        columns = ['date', 'career', 'region', 'salary', 'postings']
+        if path.endswith('.parquet'):
+            try:
+                df = pd.read_parquet(path)
+            except ImportError as e:
+                print(f"Skipping {path}, parquet support unavailable: {e}")
+                return None
+        else:
+            df = pd.read_csv(
+                path, usecols=lambda c: c in columns,
+                dtype={'career': 'category', 'region': 'category', 'salary': 'float32', 'postings': 'float32'}
+            )
+        if 'postings' not in df:
+            df['postings'] = np.float32(1)
+        return df[columns]
+
+    def _build(self, files, signature):
+        frames = [df for df in (self._read_file(f) for f in files) if df is not None]
+        if not frames:
+            return None
+        df = pd.concat(frames, ignore_index=True)
+
+        career_codes, careers = pd.factorize(df['career'].astype(str), sort=True)
+        region_codes, regions = pd.factorize(df['region'].astype(str), sort=True)
+        days = pd.to_datetime(df['date']).to_numpy(dtype='datetime64[D]').astype(np.int64)
+        postings = df['postings'].to_numpy(dtype=np.float64)
+        salary = df['salary'].to_numpy(dtype=np.float64)
+        del df, frames
+
+        n_c, n_r = len(careers), len(regions)
+        flat = career_codes * n_r + region_codes
+        grid = n_c * n_r
+        postings_cr = np.bincount(flat, weights=postings, minlength=grid).reshape(n_c, n_r)
+        salary_cr = np.bincount(flat, weights=salary * postings, minlength=grid).reshape(n_c, n_r)
+
+        latest = days.max()
+        recent_mask = days > latest - self.window_days
+        previous_mask = ~recent_mask & (days > latest - 2 * self.window_days)
+        recent = np.bincount(career_codes[recent_mask], weights=postings[recent_mask], minlength=n_c)
+        previous = np.bincount(career_codes[previous_mask], weights=postings[previous_mask], minlength=n_c)
+
+        etag = hashlib.sha1(repr(signature).encode()).hexdigest()
+        return MarketSnapshot(
+            np.asarray(careers, dtype=object), np.asarray(regions, dtype=object),
+            postings_cr, salary_cr, recent, previous, etag
+        )
+
+    def refresh(self, force=False):
+        """
+        Rebuilds the snapshot if the files in data_dir changed since the last load
+        """
+        with self._lock:
+            return self._refresh_locked(force)
+
+    def _refresh_locked(self, force=False):
+        self._checked_at = time.monotonic()
+        files = self._source_files()
+        signature = self._signature_for(files)
+        if not force and signature == self._signature:
+            return False
+        snapshot = self._build(files, signature) if files else None
+        # Single reference assignment: readers see either the old or the new snapshot
+        self.snapshot = snapshot
+        self._signature = signature
+        return True
+
+    def get_snapshot(self):
+        if self._checked_at is None or time.monotonic() - self._checked_at >= self.refresh_interval:
+            # Only one request pays for the rebuild; the rest keep serving the current snapshot
+            if self._lock.acquire(blocking=self._checked_at is None):
+                try:
+                    self._refresh_locked()
+                except Exception as e:
+                    print(f"Error refreshing market data: {e}")
+                finally:
+                    self._lock.release()
+        return self.snapshot
+
 class MarketService:
-    def __init__(self):
+    _stores = {}
+
+    def __init__(self, data_dir=None):
         # Market data (Simulated demand/growth)
         self.market_data = {
             'AI Engineer': {'demand': 95, 'growth': 35, 'trend': 'Rising'},
@@ -10,9 +191,43 @@ class MarketService:
             'Business Analyst': {'demand': 75, 'growth': 10, 'trend': 'Stable'},
             'UI/UX Designer': {'demand': 80, 'growth': 18, 'trend': 'Rising'}
         }
+        self.static_etag = hashlib.sha1(json.dumps(self.market_data, sort_keys=True).encode()).hexdigest()
+
+        # One store per data directory, shared by every service instance in the process
+        data_dir = data_dir or os.environ.get('MARKET_DATA_DIR', os.path.join('data', 'market'))
+        if data_dir not in MarketService._stores:
+            MarketService._stores[data_dir] = MarketDataStore(data_dir)
+        self.store = MarketService._stores[data_dir]
 
     def get_market_insights(self, career):
+        snapshot = self.store.get_snapshot()
+        if snapshot and career in snapshot.by_career:
+            return snapshot.by_career[career]
         return self.market_data.get(career, {'demand': 50, 'growth': 5, 'trend': 'Variable'})
 
     def get_all_market_data(self):
+        snapshot = self.store.get_snapshot()
+        if snapshot:
+            return snapshot.by_career
         return self.market_data
+
+    def get_etag(self):
+        snapshot = self.store.get_snapshot()
+        return snapshot.etag if snapshot else self.static_etag
+
+    def get_market_payload(self, career=None):
+        """
+        Returns (etag, payload) read from a single snapshot so the two always agree
+        """
+        snapshot = self.store.get_snapshot()
+        if not snapshot:
+            if career:
+                return self.static_etag, {'career': career, 'insights': self.get_market_insights(career)}
+            return self.static_etag, {'careers': self.market_data, 'regions': {}}
+        if career:
+            return snapshot.etag, {
+                'career': career,
+                'insights': snapshot.by_career.get(career),
+                'regions': snapshot.career_regions(career)
+            }
+        return snapshot.etag, {'careers': snapshot.by_career, 'regions': snapshot.by_region}
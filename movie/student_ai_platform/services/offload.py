@@ -0,0 +1,61 @@
+"""
+Process-pool entry points for CPU-heavy service calls.
+Each pool worker builds its own service instances once and reuses them.
+"""
+import io
+import os
+import numpy as np
+
+_services = {}
+_cohorts = {}
+
+def init_worker():
+    from services.prediction_service import PredictionService
+    from services.resume_service import ResumeService
+    from services.personality_service import PersonalityService
+
+    _services['prediction'] = PredictionService()
+    _services['resume'] = ResumeService()
+    _services['personality'] = PersonalityService()
+
+def init_prediction_worker():
+    from services.prediction_service import PredictionService
+
+    _services['prediction'] = PredictionService()
+
+def predict(data):
+    prediction_service = _services['prediction']
+    career, confidence = prediction_service.predict_career(data)
+    salary, _ = prediction_service.predict_salary(career, data['coding'], data['cgpa'])
+    return career, confidence, salary
+
+def analyze_resume(pdf_bytes, target_career):
+    resume_service = _services['resume']
+    text = resume_service.extract_text_from_pdf(io.BytesIO(pdf_bytes))
+    return resume_service.analyze_resume(text, target_career)
+
+def analyze_personality(text):
+    return _services['personality'].analyze_personality(text)
+
+def simulate(cohort_path, changes, interest_classes, model_version):
+    from services.prediction_service import PredictionService
+    from services.simulation_service import evaluate
+
+    if _services['prediction'].model_version != model_version:
+        _services['prediction'] = PredictionService()
+    if cohort_path not in _cohorts:
+        _cohorts.clear()
+        _cohorts[cohort_path] = (
+            np.load(os.path.join(cohort_path, 'features.npy'), mmap_mode='r'),
+            np.load(os.path.join(cohort_path, 'baseline_careers.npy'), mmap_mode='r'),
+        )
+    X, baseline_careers = _cohorts[cohort_path]
+    return evaluate(_services['prediction'], X, baseline_careers, changes, interest_classes)
+
+def explain_chunk(X, model_version):
+    from services.prediction_service import PredictionService
+    from services.shap_summary_service import predicted_class_shap
+
+    if _services['prediction'].model_version != model_version:
+        _services['prediction'] = PredictionService()
+    return predicted_class_shap(_services['prediction'], X)
@@ -6,19 +6,63 @@ import shap
 import matplotlib.pyplot as plt
 from io import BytesIO
 import base64
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from utils import model_artifacts
+from utils import drift
+from utils import shadow
 
 class PredictionService:
+    # Fallback base salaries, only used when the salary regressor is unavailable
+    career_base = {
+        'AI Engineer': 80000,
+        'Data Scientist': 75000,
+        'Web Developer': 60000,
+        'Software Developer': 65000,
+        'Cyber Security Analyst': 72000,
+        'Business Analyst': 55000,
+        'UI/UX Designer': 58000
+    }
+    salary_growth = 1.1
+    projection_years = 5
+    explanation_cache_size = 256
+
     def __init__(self):
         self.model_path = os.path.join('models', 'career_model.pkl')
         self.salary_model_path = os.path.join('models', 'salary_model.pkl')
+        self.model_dir = os.path.join('models', 'career_model')
+        self.salary_model_dir = os.path.join('models', 'salary_model')
         self.model_data = None
         self.salary_data = None
+        self.model_version = None
+        self._explainer = None
+        # Shared by request threads; least recently used PNGs are evicted first
+        self._explanation_cache = OrderedDict()
+        self._explanation_lock = threading.Lock()
         self._load_models()
+        self.drift_monitor = drift.get_monitor(self.model_data, self.model_version)
+        # Candidate model mirrored on a sample of live predictions, when one is registered
+        self.shadow = shadow.get_evaluator(self._predict_with, self.model_data, self.model_version, self.model_dir)
+        self._cached_salary = lru_cache(maxsize=4096)(self._predict_salary_single)
 
     def _load_models(self):
-        if os.path.exists(self.model_path):
+        # Prefer the memory-mapped array artifacts; fall back to the pickles
+        career_dir = model_artifacts.current_version_dir(self.model_dir)
+        if career_dir:
+            self.model_data = model_artifacts.load_career_model(career_dir)
+            self.model_version = self.model_data['version']
+        elif os.path.exists(self.model_path):
             self.model_data = joblib.load(self.model_path)
-        if os.path.exists(self.salary_model_path):
+            stat = os.stat(self.model_path)
+            self.model_version = f"{int(stat.st_mtime)}-{stat.st_size}"
+
+        salary_dir = model_artifacts.current_version_dir(self.salary_model_dir)
+        if salary_dir:
+            self.salary_data = model_artifacts.load_salary_model(salary_dir)
+        elif os.path.exists(self.salary_model_path):
             self.salary_data = joblib.load(self.salary_model_path)
 
     def predict_career(self, features_dict):
@@ -28,10 +72,20 @@ class PredictionService:
         if not self.model_data:
             return None, None
 
-        model = self.model_data['model']
-        scaler = self.model_data['scaler']
-        le_interest = self.model_data['le_interest']
-        le_career = self.model_data['le_career']
+        started = time.perf_counter()
+        career, confidence = self._predict_with(self.model_data, features_dict)
+        if self.shadow is not None:
+            self.shadow.submit(features_dict, career, confidence, time.perf_counter() - started)
+        if self.drift_monitor is not None:
+            self.drift_monitor.record(features_dict, career)
+        return career, confidence
+
+    @staticmethod
+    def _predict_with(model_data, features_dict):
+        model = model_data['model']
+        scaler = model_data['scaler']
+        le_interest = model_data['le_interest']
+        le_career = model_data['le_career']
 
         # Encode interest
         interest_encoded = le_interest.transform([features_dict['interest']])[0]
@@ -55,16 +109,50 @@ class PredictionService:
         # Probabilities for confidence calibration
         probs = model.predict_proba(X_scaled)[0]
         confidence = round(np.max(probs) * 100, 2)
-        
         return career, confidence
 
-    def get_explanation(self, features_dict):
+    def predict_career_batch(self, X):
+        """
+        X: (n, 6) rows of [cgpa, aptitude, coding, comm, leadership, interest_code],
+        interest_code from model_data['le_interest']. Returns (careers, confidences)
         """
-        Generates SHAP values for explainability
+        if not self.model_data:
+            return None, None
+        model = self.model_data['model']
+        probs = model.predict_proba(self.model_data['scaler'].transform(X))
+        best = np.argmax(probs, axis=1)
+        careers = self.model_data['le_career'].inverse_transform(np.asarray(model.classes_)[best])
+        return careers, np.round(probs[np.arange(len(best)), best] * 100, 2)
+
+    def explanation_key(self, features_dict):
+        """
+        Content key for the explanation image: same features + same model => same image
+        """
+        parts = [self.model_version] + [features_dict[k] for k in ('cgpa', 'aptitude', 'coding', 'comm', 'leadership', 'interest')]
+        return hashlib.sha1('|'.join(str(p) for p in parts).encode('utf-8')).hexdigest()[:20]
+
+    def _get_explainer(self):
+        if self._explainer is None:
+            model = self.model_data['model']
+            if hasattr(model, 'to_shap_dict'):
+                model = model.to_shap_dict()
+            self._explainer = shap.TreeExplainer(model)
+        return self._explainer
+
+    def get_explanation_png(self, features_dict):
+        """
+        Renders the SHAP force plot for the predicted class as PNG bytes
         """
         if not self.model_data:
             return None
 
+        key = self.explanation_key(features_dict)
+        with self._explanation_lock:
+            png = self._explanation_cache.get(key)
+            if png is not None:
+                self._explanation_cache.move_to_end(key)
+                return png
+
         model = self.model_data['model']
         scaler = self.model_data['scaler']
         le_interest = self.model_data['le_interest']
@@ -81,46 +169,82 @@ class PredictionService:
         X_scaled = scaler.transform(X)
         
         # SHAP calculation (KernelExplainer for model-agnostic or TreeExplainer for RF/DT)
-        # Using a subset of training data for background
-        explainer = shap.TreeExplainer(model)
+        explainer = self._get_explainer()
         shap_values = explainer.shap_values(X_scaled)
         
         # Generate plot
         plt.figure(figsize=(10, 6))
         # Plot for the predicted class
         pred_idx = model.predict(X_scaled)[0]
-        shap.force_plot(explainer.expected_value[pred_idx], shap_values[pred_idx], X[0], 
+        if isinstance(shap_values, list):
+            class_values = shap_values[pred_idx][0]
+        else:
+            # Newer shap returns a single (samples, features, classes) array
+            class_values = shap_values[0, :, pred_idx]
+        shap.force_plot(explainer.expected_value[pred_idx], class_values, X[0], 
                         feature_names=self.model_data['features'], matplotlib=True, show=False)
         
         buffer = BytesIO()
         plt.savefig(buffer, format='png', bbox_inches='tight')
-        buffer.seek(0)
-        image_base64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
         plt.close()
-        
-        return image_base64
+        png = buffer.getvalue()
+
+        with self._explanation_lock:
+            self._explanation_cache[key] = png
+            while len(self._explanation_cache) > self.explanation_cache_size:
+                self._explanation_cache.popitem(last=False)
+        return png
+
+    def get_explanation(self, features_dict):
+        """
+        Generates SHAP values for explainability (base64 PNG)
+        """
+        png = self.get_explanation_png(features_dict)
+        if png is None:
+            return None
+        return base64.b64encode(png).decode('utf-8')
 
-    def predict_salary(self, career, skill_score):
+    def predict_salary(self, career, skill_score, cgpa):
         """
         Predicts starting salary based on career and skills
         """
-        # Base salaries per career (simplified regression logic)
-        career_base = {
-            'AI Engineer': 80000,
-            'Data Scientist': 75000,
-            'Web Developer': 60000,
-            'Software Developer': 65000,
-            'Cyber Security Analyst': 72000,
-            'Business Analyst': 55000,
-            'UI/UX Designer': 58000
-        }
-        
-        base = career_base.get(career, 50000)
-        # Multiplier based on skill score (1-10)
-        multiplier = 1 + (skill_score - 5) * 0.1
-        predicted = round(base * multiplier, 2)
-        
+        predicted, projection = self._cached_salary(career, int(skill_score), round(float(cgpa), 2))
+        return predicted, list(projection)
+
+    def _predict_salary_single(self, career, skill_score, cgpa):
+        salaries, projections = self.predict_salary_batch([career], [skill_score], [cgpa])
+        return float(salaries[0]), tuple(projections[0].tolist())
+
+    def predict_salary_batch(self, careers, skill_scores, cgpas):
+        """
+        Vectorized salary prediction: returns (salaries, projections) where
+        projections has one row of yearly figures per input
+        """
+        careers = np.asarray(careers, dtype=object)
+        skill_scores = np.asarray(skill_scores, dtype=float)
+        cgpas = np.asarray(cgpas, dtype=float)
+        predicted = np.empty(len(careers), dtype=float)
+
+        known = np.zeros(len(careers), dtype=bool)
+        if self.salary_data is not None and self.model_data:
+            known = np.isin(careers, self.model_data['le_career'].classes_)
+
+        if known.any():
+            X = np.column_stack([skill_scores[known], cgpas[known], self.model_data['le_career'].transform(careers[known])])
+            # Cohorts repeat (skill, CGPA, career) triples a lot; predict each distinct one once
+            unique, inverse = np.unique(X, axis=0, return_inverse=True)
+            X = pd.DataFrame(unique, columns=['CodingSkill', 'CGPA', 'CareerEncoded'])
+            predicted[known] = np.asarray(self.salary_data.predict(X))[inverse.ravel()]
+
+        if not known.all():
+            # Table fallback (simplified regression logic)
+            base = np.array([self.career_base.get(c, 50000) for c in careers[~known]], dtype=float)
+            # Multiplier based on skill score (1-10)
+            predicted[~known] = base * (1 + (skill_scores[~known] - 5) * 0.1)
+
+        predicted = np.round(predicted, 2)
         # 5-year projection
-        projection = [round(predicted * (1.1 ** i), 2) for i in range(1, 6)]
-        
-        return predicted, projection
+        growth = self.salary_growth ** np.arange(1, self.projection_years + 1)
+        projections = np.round(np.outer(predicted, growth), 2)
+
+        return predicted, projections
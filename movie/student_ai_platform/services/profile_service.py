@@ -0,0 +1,54 @@
+from models.database import db, StudentProfile
+from services.prediction_service import PredictionService
+
+class ProfileService:
+    """
+    Scores a student's inputs, predicts career and salary, and stores the
+    result on their profile. Shared by the platform and legacy predict routes.
+    """
+    def __init__(self, prediction_service=None):
+        self.prediction_service = prediction_service or PredictionService()
+
+    @staticmethod
+    def features_from_form(form):
+        return {
+            'cgpa': float(form.get('cgpa')),
+            'aptitude': int(form.get('aptitude')),
+            'coding': int(form.get('coding')),
+            'comm': int(form.get('communication')),
+            'leadership': int(form.get('leadership')),
+            'interest': form.get('interest')
+        }
+
+    @staticmethod
+    def calculate_scores(data):
+        # Intelligence: weighted performance metrics; readiness: average of skills and CGPA
+        intel_score = round((data['cgpa'] * 20) * 0.4 + (data['aptitude']) * 0.3 + (data['coding'] * 10) * 0.3, 2)
+        readiness = round((data['coding'] * 10 + data['comm'] * 10 + data['leadership'] * 10 + data['cgpa'] * 25) / 4, 2)
+        return intel_score, readiness
+
+    def save_prediction(self, user_id, name, data):
+        career, confidence = self.prediction_service.predict_career(data)
+        intel_score, readiness = self.calculate_scores(data)
+        salary, projection = self.prediction_service.predict_salary(career, data['coding'], data['cgpa'])
+
+        profile = StudentProfile.query.filter_by(user_id=user_id).first()
+        if not profile:
+            profile = StudentProfile(user_id=user_id)
+            db.session.add(profile)
+
+        if name is not None:
+            profile.name = name
+        profile.cgpa = data['cgpa']
+        profile.aptitude_score = data['aptitude']
+        profile.coding_skill = data['coding']
+        profile.communication_skill = data['comm']
+        profile.leadership_score = data['leadership']
+        profile.interest_area = data['interest']
+        profile.predicted_career = career
+        profile.predicted_salary = salary
+        profile.intelligence_score = intel_score
+        profile.career_readiness_score = readiness
+
+        db.session.commit()
+        return profile
@@ -0,0 +1,47 @@
+import io
+from datetime import datetime
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+
+class ReportService:
+    def career_report_pdf(self, profile, email):
+        """
+        One-page career report, the layout the legacy app exported
+        """
+        buffer = io.BytesIO()
+        p = canvas.Canvas(buffer, pagesize=letter)
+
+        p.setFont("Helvetica-Bold", 24)
+        p.drawString(100, 750, "StudentAI Career Report")
+
+        p.setFont("Helvetica", 12)
+        p.drawString(100, 720, f"Name: {profile.name}")
+        p.drawString(100, 705, f"Email: {email}")
+        p.drawString(100, 690, f"Date: {datetime.now().strftime('%Y-%m-%d')}")
+
+        p.line(100, 680, 500, 680)
+
+        p.setFont("Helvetica-Bold", 16)
+        p.drawString(100, 650, "Prediction Result")
+        p.setFont("Helvetica", 14)
+        p.drawString(100, 630, f"Predicted Career: {profile.predicted_career}")
+        if profile.predicted_salary:
+            p.drawString(100, 612, f"Estimated Salary: ${profile.predicted_salary:,.0f}")
+
+        p.setFont("Helvetica-Bold", 16)
+        p.drawString(100, 590, "Scores")
+        p.setFont("Helvetica", 12)
+        p.drawString(100, 570, f"Intelligence Score: {profile.intelligence_score}/100")
+        p.drawString(100, 555, f"Career Readiness: {profile.career_readiness_score}%")
+
+        p.setFont("Helvetica-Bold", 16)
+        p.drawString(100, 520, "Skill Analysis")
+        p.setFont("Helvetica", 12)
+        p.drawString(100, 500, f"CGPA: {profile.cgpa}/4.0")
+        p.drawString(100, 485, f"Coding Skill: {profile.coding_skill}/10")
+        p.drawString(100, 470, f"Communication: {profile.communication_skill}/10")
+        p.drawString(100, 455, f"Leadership: {profile.leadership_score}/10")
+
+        p.showPage()
+        p.save()
+        return buffer.getvalue()
@@ -11,11 +11,13 @@ import os
 import io
 import PyPDF2
 import json
+from services.learning_path_service import LearningPathService
 
 class ResumeService:
-    def __init__(self):
+    def __init__(self, learning_paths=None):
         # Load spaCy NLP model
         self.nlp = nlp
+        self.learning_paths = learning_paths or LearningPathService()
 
     def extract_text_from_pdf(self, pdf_file):
         text = ""
@@ -29,38 +31,29 @@ class ResumeService:
 
     def analyze_resume(self, text, target_career):
         """
-        Extracts skills and compares with target career requirements
+        Extracts skills, compares them with the target career's requirements
+        and plans the learning path to the missing ones
         """
-        # Dictionary of required skills for careers
-        career_requirements = {
-            'AI Engineer': ['python', 'pytorch', 'tensorflow', 'machine learning', 'deep learning', 'git', 'sql'],
-            'Data Scientist': ['python', 'r', 'statistics', 'pandas', 'sql', 'scikit-learn', 'data visualization'],
-            'Web Developer': ['html', 'css', 'javascript', 'react', 'node', 'django', 'flask', 'api'],
-            'Software Developer': ['java', 'c++', 'python', 'algorithms', 'data structures', 'system design'],
-            'Cyber Security Analyst': ['network security', 'linux', 'ethical hacking', 'firewalls', 'cryptography'],
-            'Business Analyst': ['excel', 'tableau', 'power bi', 'sql', 'business logic', 'presentation'],
-            'UI/UX Designer': ['figma', 'sketch', 'adobe xd', 'user research', 'wireframing', 'prototyping']
-        }
-
-        requirements = career_requirements.get(target_career, [])
-        found_skills = []
-        
-        # Simple keyword matching using NLP tokens
-        doc = self.nlp(text.lower()) if self.nlp else None
-        text_content = text.lower()
-        
-        for skill in requirements:
-            if skill in text_content:
-                found_skills.append(skill)
+        # Required skills per career come from the skill graph
+        requirements = self.learning_paths.requirements(target_career)
+        # Whole-word matches (and aliases) from the skill graph, so "digital" is not git
+        graph_skills = self.learning_paths.skills_in(text)
+        found_skills = [s for s in requirements if s in graph_skills]
         
-        missing_skills = [s for s in requirements if s not in found_skills]
+        # Any graph skill in the resume counts towards the path, prerequisites included
+        known_skills = sorted(graph_skills)
+        # Missing means what the roadmap still teaches, so knowing PyTorch covers deep learning
+        covered = self.learning_paths.covered(known_skills)
+        missing_skills = [s for s in requirements if s not in covered]
         
-        match_score = round((len(found_skills) / len(requirements)) * 100, 2) if requirements else 0
+        match_score = round(((len(requirements) - len(missing_skills)) / len(requirements)) * 100, 2) if requirements else 0
         ats_score = round(match_score * 0.8 + 10, 2) # Adding base for formatting etc.
 
         return {
             'found_skills': found_skills,
             'missing_skills': missing_skills,
+            'known_skills': known_skills,
+            'roadmap': self.learning_paths.roadmap(target_career, known_skills),
             'match_score': match_score,
             'ats_score': ats_score
         }
@@ -0,0 +1,162 @@
+"""
+Cohort-level SHAP summaries: TreeExplainer values for every profile,
+computed in chunks across a process pool and reduced to mean |SHAP| per
+feature for each predicted career and SHAP distributions per interest.
+Results are stored as JSON per model version, so they are computed once per
+model and the analytics page only reads them.
+"""
+import os
+import json
+import time
+import threading
+import multiprocessing
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from services.prediction_service import PredictionService
+from services.simulation_service import SimulationService
+
+QUANTILES = (10, 25, 50, 75, 90)
+
+def predicted_class_shap(prediction_service, X):
+    """
+    X: (n, 6) unscaled feature rows. Returns (n, 6) SHAP values for each row's predicted class
+    """
+    X_scaled = prediction_service.model_data['scaler'].transform(X)
+    predicted = np.argmax(prediction_service.model_data['model'].predict_proba(X_scaled), axis=1)
+    values = prediction_service._get_explainer().shap_values(X_scaled, check_additivity=False)
+    rows = np.arange(len(X))
+    if isinstance(values, list):
+        # Older shap returns one (samples, features) array per class
+        values = np.stack(values, axis=-1)
+    return values[rows, :, predicted].astype(np.float32)
+
+def _mean_abs(values, features):
+    return {f: round(float(v), 4) for f, v in zip(features, np.abs(values).mean(axis=0))} if len(values) else {}
+
+def summarize(values, careers, interests, features):
+    by_career = {}
+    for career in np.unique(careers):
+        mask = careers == career
+        by_career[str(career)] = {'count': int(mask.sum()), 'mean_abs': _mean_abs(values[mask], features)}
+
+    by_interest = {}
+    for interest in np.unique(interests):
+        mask = interests == interest
+        quantiles = np.percentile(values[mask], QUANTILES, axis=0)
+        by_interest[str(interest)] = {
+            'count': int(mask.sum()),
+            'mean_abs': _mean_abs(values[mask], features),
+            'quantiles': {f: [round(float(q), 4) for q in quantiles[:, i]] for i, f in enumerate(features)},
+        }
+    return {'overall': _mean_abs(values, features), 'by_career': by_career, 'by_interest': by_interest}
+
+class ShapSummaryService:
+    chunk_rows = 2000
+    _pools = {}
+    _pools_lock = threading.Lock()
+
+    def __init__(self, prediction_service=None, simulation_service=None, store_dir=None, workers=None):
+        self.prediction_service = prediction_service or PredictionService()
+        # The simulation cohort already streams and caches every profile's features
+        self.cohorts = simulation_service or SimulationService(self.prediction_service)
+        self.store_dir = store_dir or os.path.join('instance', 'shap_summary')
+        self.workers = workers or int(os.environ.get('SHAP_POOL_WORKERS', 0)) or os.cpu_count() or 1
+        self.status = {'running': False, 'done': 0, 'total': 0, 'error': None}
+        self._lock = threading.Lock()
+
+    def _path(self, model_version):
+        return os.path.join(self.store_dir, f"{model_version}.json")
+
+    def load(self, model_version=None):
+        path = self._path(model_version or self.prediction_service.model_version)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _save(self, summary):
+        os.makedirs(self.store_dir, exist_ok=True)
+        path = self._path(summary['model_version'])
+        tmp = f"{path}.tmp{os.getpid()}"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(summary, f)
+        os.replace(tmp, path)
+
+    def _pool(self):
+        with self._pools_lock:
+            pool = self._pools.get(self.workers)
+            if pool is None:
+                from services import offload
+                pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=offload.init_prediction_worker
+                )
+                self._pools[self.workers] = pool
+            return pool
+
+    def compute(self):
+        """
+        Explains the whole cohort and stores the summary for the current model version
+        """
+        if not self.prediction_service.model_data:
+            raise ValueError("Career model not loaded")
+        started = time.perf_counter()
+        model_version = self.prediction_service.model_version
+        cohort = self.cohorts.load_cohort()
+
+        # Profiles with identical features are explained once
+        unique, inverse = np.unique(cohort.X, axis=0, return_inverse=True)
+        chunks = [unique[i:i + self.chunk_rows] for i in range(0, len(unique), self.chunk_rows)]
+        self.status.update(done=0, total=len(chunks))
+        values = np.empty((len(unique), cohort.X.shape[1]), dtype=np.float32)
+
+        if self.workers > 1 and len(chunks) > 1:
+            from services import offload
+            pool = self._pool()
+            futures = {pool.submit(offload.explain_chunk, chunk, model_version): i for i, chunk in enumerate(chunks)}
+            for future in as_completed(futures):
+                i = futures[future]
+                values[i * self.chunk_rows:i * self.chunk_rows + len(chunks[i])] = future.result()
+                self.status['done'] += 1
+        else:
+            for i, chunk in enumerate(chunks):
+                values[i * self.chunk_rows:i * self.chunk_rows + len(chunk)] = predicted_class_shap(self.prediction_service, chunk)
+                self.status['done'] += 1
+
+        interest_classes = np.asarray(self.prediction_service.model_data['le_interest'].classes_).astype(str)
+        interests = interest_classes[cohort.X[:, 5].astype(int)] if len(cohort.X) else np.empty(0, dtype=str)
+        summary = summarize(values[inverse.ravel()], cohort.baseline_careers, interests,
+                            list(self.prediction_service.model_data['features']))
+        summary.update({
+            'model_version': model_version,
+            'cohort_key': cohort.key,
+            'cohort_size': int(len(cohort.X)),
+            'unique_rows': int(len(unique)),
+            'computed_at': datetime.utcnow().isoformat(timespec='seconds'),
+            'duration_s': round(time.perf_counter() - started, 1),
+        })
+        self._save(summary)
+        return summary
+
+    def start(self, app):
+        """
+        Runs compute() on a background thread; returns False if a run is already going
+        """
+        with self._lock:
+            if self.status['running']:
+                return False
+            self.status.update(running=True, done=0, total=0, error=None)
+
+        def run():
+            try:
+                with app.app_context():
+                    self.compute()
+            except Exception as e:
+                self.status['error'] = str(e)
+            finally:
+                self.status['running'] = False
+
+        threading.Thread(target=run, name='shap-summary', daemon=True).start()
+        return True
@@ -0,0 +1,281 @@
+"""
+Nearest-neighbour search over every student's profile vector.
+
+Vectors are the five numeric features run through the career model's
+StandardScaler plus a one-hot interest block, indexed with a KD-tree. The
+tree is static, so changes go to a small brute-forced delta that shadows the
+tree's entry for the same profile; a background thread folds new and changed
+profiles in by id and updated_at watermarks (this catches writes from other
+workers, and imported rows stamped in the past) and rebuilds the tree once
+the delta grows. Each rebuild is saved to disk so
+a restart only loads the snapshot and catches up from its watermark.
+"""
+import os
+import time
+import threading
+import joblib
+import numpy as np
+from sklearn.neighbors import KDTree
+from sqlalchemy import select, func, and_, or_
+from models.database import StudentProfile
+from utils.db_routing import read_engine
+from services.prediction_service import PredictionService
+
+COLUMNS = [StudentProfile.id, StudentProfile.cgpa, StudentProfile.aptitude_score, StudentProfile.coding_skill,
+           StudentProfile.communication_skill, StudentProfile.leadership_score, StudentProfile.interest_area,
+           func.coalesce(StudentProfile.updated_at, StudentProfile.created_at)]
+
+class NeighbourIndex:
+    """
+    Immutable KD-tree snapshot plus the changes made since it was built.
+    Query cost is one tree lookup plus a scan of the delta.
+    """
+    def __init__(self, ids, vectors, watermark, max_id=0, leaf_size=40):
+        self.ids = ids
+        self.vectors = vectors
+        self.watermark = watermark
+        self.max_id = max_id
+        self.tree = KDTree(vectors, leaf_size=leaf_size) if len(ids) else None
+        self.delta = {}
+        self.delta_ids = np.empty(0, dtype=np.int64)
+        self.delta_vectors = np.empty((0, vectors.shape[1]))
+
+    def with_changes(self, ids, vectors, watermark, max_id=0):
+        # Copy-on-write so readers never see a half-applied batch
+        updated = object.__new__(NeighbourIndex)
+        updated.__dict__.update(self.__dict__)
+        updated.delta = dict(self.delta)
+        updated.delta.update(zip(ids.tolist(), vectors))
+        updated.delta_ids = np.fromiter(updated.delta.keys(), dtype=np.int64, count=len(updated.delta))
+        updated.delta_vectors = np.array(list(updated.delta.values())).reshape(len(updated.delta), self.vectors.shape[1])
+        updated.watermark = max(self.watermark, watermark) if self.watermark and watermark else (watermark or self.watermark)
+        updated.max_id = max(self.max_id, max_id)
+        return updated
+
+    def compacted(self):
+        """
+        Rebuilds the tree with the delta merged in, without going back to the database
+        """
+        keep = ~np.isin(self.ids, self.delta_ids)
+        return NeighbourIndex(np.concatenate([self.ids[keep], self.delta_ids]),
+                              np.vstack([self.vectors[keep], self.delta_vectors]), self.watermark, self.max_id)
+
+    def query(self, vector, k, exclude_id=None):
+        results = []
+        if self.tree is not None:
+            fetch = min(len(self.ids), k + 1)
+            while True:
+                dist, idx = self.tree.query(vector[None, :], k=fetch)
+                candidates = [(d, int(i)) for d, i in zip(dist[0], self.ids[idx[0]])
+                              if int(i) not in self.delta and int(i) != exclude_id]
+                # Stale entries shadowed by the delta can crowd out real neighbours
+                if len(candidates) >= k or fetch >= len(self.ids):
+                    break
+                fetch = min(len(self.ids), fetch * 4)
+            results.extend(candidates[:k])
+        if len(self.delta_ids):
+            dist = np.sqrt(((self.delta_vectors - vector) ** 2).sum(axis=1))
+            nearest = np.argpartition(dist, k)[:k + 1] if len(dist) > k + 1 else np.arange(len(dist))
+            for i in nearest:
+                if int(self.delta_ids[i]) != exclude_id:
+                    results.append((float(dist[i]), int(self.delta_ids[i])))
+        results.sort()
+        return results[:k]
+
+class SimilarityService:
+    interest_weight = 1.0  # distance between different interests, in standard deviations
+    stream_rows = 50000
+    max_delta = 10000  # the delta is brute-forced per query, so it is folded into the tree past this size
+    refresh_interval = 30  # seconds between background catch-ups
+
+    def __init__(self, prediction_service=None, index_path=None):
+        self.prediction_service = prediction_service or PredictionService()
+        self.index_path = index_path or os.path.join('instance', 'similarity', 'index.joblib')
+        self.source = None
+        self._engine = None
+        self.index = None
+        self._local = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+    # Vectors
+
+    def vectors(self, X):
+        """
+        X: (n, 6) rows of [cgpa, aptitude, coding, comm, leadership, interest_code]
+        """
+        scaled = np.asarray(self.prediction_service.model_data['scaler'].transform(X))
+        n_interests = len(self.prediction_service.model_data['le_interest'].classes_)
+        onehot = np.eye(n_interests)[X[:, 5].astype(int)] * self.interest_weight
+        return np.hstack([scaled[:, :5], onehot])
+
+    def _encode(self, rows):
+        """
+        rows: (id, cgpa, aptitude, coding, comm, leadership, interest, updated) tuples
+        """
+        if not rows:
+            return np.empty(0, dtype=np.int64), None, None
+        block = np.array(rows, dtype=object)
+        le_interest = self.prediction_service.model_data['le_interest']
+        interests = block[:, 6].astype(str)
+        known = np.isin(interests, np.asarray(le_interest.classes_).astype(str))
+        block = block[known]
+        if not len(block):
+            return np.empty(0, dtype=np.int64), None, max(r[7] for r in rows)
+        X = np.column_stack([block[:, 1:6].astype(np.float64), le_interest.transform(interests[known])])
+        return block[:, 0].astype(np.int64), self.vectors(X), max(r[7] for r in rows)
+
+    def _read(self, index=None):
+        """
+        Every complete profile, or with `index` those inserted after its max_id
+        or updated since its watermark. Returns (ids, vectors, watermark, max_id)
+        """
+        stmt = select(*COLUMNS).where(and_(*[c.isnot(None) for c in COLUMNS[1:7]]))
+        if index is not None:
+            # The id watermark catches rows whose timestamps predate the
+            # watermark, like students imported by utils/migrate_legacy.py
+            changed = COLUMNS[0] > index.max_id
+            if index.watermark is not None:
+                changed = or_(changed, COLUMNS[7] >= index.watermark)
+            stmt = stmt.where(changed)
+        if self._engine is None:
+            # Pinned, so the watermarks always refer to the same replica
+            self._engine = read_engine()
+        ids, vectors, watermark, max_id = [], [], None, 0
+        with self._engine.connect() as conn:
+            result = conn.execution_options(stream_results=True, yield_per=self.stream_rows).execute(stmt)
+            for rows in result.partitions():
+                part_ids, part_vectors, part_mark = self._encode(rows)
+                if part_vectors is not None:
+                    ids.append(part_ids)
+                    vectors.append(part_vectors)
+                if part_mark is not None:
+                    watermark = part_mark if watermark is None else max(watermark, part_mark)
+                max_id = max(max_id, max(r[0] for r in rows))
+        width = 5 + len(self.prediction_service.model_data['le_interest'].classes_)
+        if not ids:
+            return np.empty(0, dtype=np.int64), np.empty((0, width)), watermark, max_id
+        return np.concatenate(ids), np.vstack(vectors), watermark, max_id
+
+    # Build, persist, refresh
+
+    def build(self):
+        ids, vectors, watermark, max_id = self._read()
+        index = NeighbourIndex(ids, vectors, watermark, max_id)
+        self.save(index)
+        return index
+
+    def save(self, index):
+        os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+        tmp = f"{self.index_path}.tmp{os.getpid()}"
+        joblib.dump({'model_version': self.prediction_service.model_version, 'source': self.source, 'index': index}, tmp)
+        os.replace(tmp, self.index_path)
+
+    def load(self):
+        if not os.path.exists(self.index_path):
+            return None
+        try:
+            saved = joblib.load(self.index_path)
+        except Exception as e:
+            print(f"Ignoring unreadable similarity index: {e}")
+            return None
+        # Vectors depend on the scaler, so a new model means a rebuild
+        if saved.get('model_version') != self.prediction_service.model_version or saved.get('source') != self.source:
+            return None
+        if not hasattr(saved['index'], 'max_id'):
+            # Saved before the id watermark; it may be missing imported rows
+            return None
+        return saved['index']
+
+    def refresh(self):
+        """
+        Folds in profiles changed since the watermark; recompacts when the delta is large
+        """
+        with self._lock:
+            self._local = {}
+            index = self.index
+        if index is None:
+            index = self.load() or self.build()
+        ids, vectors, watermark, max_id = self._read(index)
+        if len(ids) or max_id > index.max_id:
+            index = index.with_changes(ids, vectors, watermark, max_id)
+        if len(index.delta) > self.max_delta:
+            index = index.compacted()
+            self.save(index)
+        with self._lock:
+            # Replay local writes that landed while this refresh was reading
+            if self._local:
+                ids = np.fromiter(self._local.keys(), dtype=np.int64, count=len(self._local))
+                index = index.with_changes(ids, np.array(list(self._local.values())), index.watermark)
+            self.index = index
+
+    def start(self, app):
+        """
+        Loads or builds the index in the background, then keeps it current.
+        Called again in a forked child, it restarts the thread, which fork does
+        not carry over; the parent's index is kept.
+        """
+        if not self.prediction_service.model_data:
+            return
+        if self._thread is not None:
+            if self._pid == os.getpid():
+                return
+            self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self.source = app.config.get('SQLALCHEMY_DATABASE_URI')
+
+        def run():
+            while True:
+                try:
+                    with app.app_context():
+                        self.refresh()
+                except Exception as e:
+                    print(f"Similarity index refresh failed: {e}")
+                time.sleep(self.refresh_interval)
+
+        self._thread = threading.Thread(target=run, name='similarity-index', daemon=True)
+        self._thread.start()
+
+    def wait_ready(self, timeout):
+        """
+        Blocks until the first load finishes; returns at once if the index is not in use
+        """
+        deadline = time.monotonic() + timeout
+        while self._thread is not None and self.index is None and time.monotonic() < deadline:
+            time.sleep(0.1)
+        return self.index is not None
+
+    # Reads and local writes
+
+    def update(self, profile):
+        """
+        Applies a profile change made by this worker straight away
+        """
+        if self._thread is None or not self.prediction_service.model_data:
+            return
+        ids, vectors, _ = self._encode([(profile.id, profile.cgpa, profile.aptitude_score, profile.coding_skill,
+                                                 profile.communication_skill, profile.leadership_score,
+                                                 profile.interest_area, profile.updated_at or profile.created_at)])
+        if vectors is None:
+            return
+        with self._lock:
+            # Local writes do not advance the watermark; the catch-up still sees other workers' rows
+            self._local[int(ids[0])] = vectors[0]
+            if self.index is not None:
+                self.index = self.index.with_changes(ids, vectors, self.index.watermark)
+
+    def similar(self, profile, k=10):
+        """
+        Returns [(distance, profile_id)] of the k nearest other profiles, or None
+        while the index is still loading
+        """
+        index = self.index
+        if index is None:
+            return None
+        ids, vectors, _ = self._encode([(profile.id, profile.cgpa, profile.aptitude_score, profile.coding_skill,
+                                         profile.communication_skill, profile.leadership_score,
+                                         profile.interest_area, None)])
+        if vectors is None:
+            return []
+        return index.query(vectors[0], k, exclude_id=profile.id)
@@ -0,0 +1,261 @@
+"""
+Cohort what-if simulation: every profile's features are loaded once into a
+matrix, each scenario perturbs the whole matrix at once, and batched career
+and salary predictions are compared against the unperturbed baseline.
+
+    {"scenarios": [
+        {"name": "Coding +2", "changes": {"coding": {"add": 2}}},
+        {"name": "All AI/ML", "changes": {"interest": {"set": "AI/ML"}, "cgpa": {"multiply": 1.1}}}
+    ]}
+"""
+import os
+import shutil
+import hashlib
+import threading
+import multiprocessing
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from services.prediction_service import PredictionService
+from utils.profile_snapshot import get_snapshot
+
+FEATURES = ['cgpa', 'aptitude', 'coding', 'comm', 'leadership', 'interest']
+COLUMNS = ['cgpa', 'aptitude_score', 'coding_skill', 'communication_skill', 'leadership_score']
+# Perturbed values are clipped to the ranges the model was trained on
+BOUNDS = {'cgpa': (0.0, 10.0), 'aptitude': (0, 100), 'coding': (1, 10), 'comm': (1, 10), 'leadership': (1, 10)}
+OPERATIONS = ('add', 'multiply', 'set')
+
+def parse_scenarios(payload, interests, max_scenarios):
+    """
+    Validates the request body and returns [{'name', 'changes': [(feature, op, value)]}]
+    """
+    if payload is not None and not isinstance(payload, dict):
+        raise ValueError("The request body must be a JSON object")
+    scenarios = (payload or {}).get('scenarios')
+    if not isinstance(scenarios, list) or not scenarios:
+        raise ValueError("Provide a non-empty 'scenarios' list")
+    if len(scenarios) > max_scenarios:
+        raise ValueError(f"At most {max_scenarios} scenarios per request")
+
+    parsed = []
+    for i, scenario in enumerate(scenarios):
+        if not isinstance(scenario, dict):
+            raise ValueError(f"Scenario {i + 1} must be an object with 'name' and 'changes'")
+        if not isinstance(scenario.get('changes') or {}, dict):
+            raise ValueError(f"Scenario {i + 1}: 'changes' must map features to operations")
+        changes = []
+        for feature, change in (scenario.get('changes') or {}).items():
+            if feature not in FEATURES:
+                raise ValueError(f"Unknown feature '{feature}', expected one of {', '.join(FEATURES)}")
+            if not isinstance(change, dict) or len(change) != 1 or next(iter(change)) not in OPERATIONS:
+                raise ValueError(f"Change for '{feature}' must be one of {{'add': x}}, {{'multiply': x}}, {{'set': x}}")
+            op, value = next(iter(change.items()))
+            if feature == 'interest':
+                if op != 'set' or value not in interests:
+                    raise ValueError(f"interest only supports 'set' to one of {', '.join(interests)}")
+            else:
+                # Strings come from the admin form; bool is an int to Python but never an operand
+                try:
+                    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+                        raise ValueError
+                    value = float(value)
+                except ValueError:
+                    raise ValueError(f"The value for '{feature}' must be a number")
+                if not np.isfinite(value):
+                    raise ValueError(f"The value for '{feature}' must be finite")
+            changes.append((feature, op, value))
+        if not changes:
+            raise ValueError(f"Scenario {i + 1} has no changes")
+        parsed.append({'name': str(scenario.get('name') or f"Scenario {i + 1}"), 'changes': changes})
+    return parsed
+
+def apply_scenario(X, changes, interest_classes):
+    X = X.copy()
+    for feature, op, value in changes:
+        col = X[:, FEATURES.index(feature)]
+        if feature == 'interest':
+            col[:] = list(interest_classes).index(value)
+            continue
+        if op == 'add':
+            col += value
+        elif op == 'multiply':
+            col *= value
+        else:
+            col[:] = value
+        np.clip(col, *BOUNDS[feature], out=col)
+        if feature != 'cgpa':
+            np.round(col, out=col)
+    return X
+
+def summarize(careers, salaries, baseline_careers=None):
+    names, counts = np.unique(careers, return_counts=True)
+    summary = {
+        'career_counts': {str(n): int(c) for n, c in zip(names, counts)},
+        'mean_salary': round(float(salaries.mean()), 2) if len(salaries) else 0.0,
+        'median_salary': round(float(np.median(salaries)), 2) if len(salaries) else 0.0,
+    }
+    if baseline_careers is not None:
+        summary['switched_pct'] = round(float((careers != baseline_careers).mean() * 100), 2) if len(careers) else 0.0
+    return summary
+
+def evaluate(prediction_service, X, baseline_careers, changes, interest_classes):
+    perturbed = apply_scenario(X, changes, interest_classes)
+    careers, _ = prediction_service.predict_career_batch(perturbed)
+    salaries, _ = prediction_service.predict_salary_batch(careers, perturbed[:, 2], perturbed[:, 0])
+    return summarize(careers, salaries, baseline_careers)
+
+class Cohort:
+    def __init__(self, key, path, X, baseline_careers, baseline):
+        self.key = key
+        self.path = path
+        self.X = X
+        self.baseline_careers = baseline_careers
+        self.baseline = baseline
+
+class SimulationService:
+    max_scenarios = 48
+    _pools = {}
+    _pools_lock = threading.Lock()
+
+    def __init__(self, prediction_service=None, cache_dir=None, workers=None):
+        self.prediction_service = prediction_service or PredictionService()
+        self.cache_dir = cache_dir or os.path.join('instance', 'simulation')
+        self.workers = workers or int(os.environ.get('SIMULATION_POOL_WORKERS', 0)) or os.cpu_count() or 1
+        self._cohort = None
+        self._lock = threading.Lock()
+
+    def _cohort_key(self, snapshot):
+        parts = (len(snapshot), snapshot.updated_mark, snapshot.max_id, self.prediction_service.model_version)
+        return hashlib.sha1('|'.join(str(p) for p in parts).encode('utf-8')).hexdigest()[:16]
+
+    def _read_features(self, snapshot):
+        numeric = np.column_stack([snapshot.column(c) for c in COLUMNS]).astype(np.float64)
+        # Snapshot interest codes -> model codes; NULL (-1) and unknown interests map to -1
+        classes = [str(c) for c in self.prediction_service.model_data['le_interest'].classes_]
+        lookup = np.full(len(snapshot.categories['interest_area']) + 1, -1)
+        for model_code, code in enumerate(snapshot.codes('interest_area', classes)):
+            if code >= 0:
+                lookup[code] = model_code
+        interest = lookup[snapshot.column('interest_area')]
+        keep = (interest >= 0) & ~np.isnan(numeric).any(axis=1)
+        return np.column_stack([numeric[keep], interest[keep]]).astype(np.float64)
+
+    def load_cohort(self):
+        snapshot = get_snapshot()
+        key = self._cohort_key(snapshot)
+        with self._lock:
+            if self._cohort is not None and self._cohort.key == key:
+                # A worker on a newer snapshot may have pruned it
+                self._write_cohort(self._cohort)
+                return self._cohort
+
+            X = self._read_features(snapshot)
+            if len(X):
+                careers, _ = self.prediction_service.predict_career_batch(X)
+                salaries, _ = self.prediction_service.predict_salary_batch(careers, X[:, 2], X[:, 0])
+            else:
+                careers, salaries = np.empty(0, dtype=str), np.empty(0)
+            careers = np.asarray(careers).astype(str)
+
+            self._cohort = Cohort(key, os.path.join(self.cache_dir, key), X, careers, summarize(careers, salaries))
+            self._write_cohort(self._cohort)
+            self._prune(self._cohort.path)
+            return self._cohort
+
+    def _write_cohort(self, cohort):
+        """
+        Pool workers memory-map the cohort instead of receiving a copy per scenario
+        """
+        if os.path.exists(cohort.path):
+            return
+        tmp = f"{cohort.path}.tmp{os.getpid()}"
+        os.makedirs(tmp, exist_ok=True)
+        np.save(os.path.join(tmp, 'features.npy'), cohort.X)
+        np.save(os.path.join(tmp, 'baseline_careers.npy'), cohort.baseline_careers)
+        try:
+            os.replace(tmp, cohort.path)
+        except OSError:
+            # Another worker with the same snapshot got there first
+            shutil.rmtree(tmp, ignore_errors=True)
+            if not os.path.isdir(cohort.path):
+                raise
+
+    def _prune(self, current):
+        """
+        Removes cohorts written before the current one. Prefork workers can
+        hold different snapshots, and a newer cohort belongs to a worker that
+        refreshed first
+        """
+        try:
+            written = os.stat(current).st_mtime
+        except FileNotFoundError:
+            return
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if path == current or '.tmp' in name:
+                continue
+            try:
+                if os.stat(path).st_mtime < written:
+                    shutil.rmtree(path, ignore_errors=True)
+            except FileNotFoundError:
+                continue
+
+    def _pool(self):
+        with self._pools_lock:
+            pool = self._pools.get(self.workers)
+            if pool is None:
+                from services import offload
+                pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=offload.init_prediction_worker
+                )
+                self._pools[self.workers] = pool
+            return pool
+
+    def run(self, payload):
+        if not self.prediction_service.model_data:
+            raise ValueError("Career model not loaded")
+        interest_classes = [str(c) for c in self.prediction_service.model_data['le_interest'].classes_]
+        scenarios = parse_scenarios(payload, interest_classes, self.max_scenarios)
+        cohort = self.load_cohort()
+        changes = [s['changes'] for s in scenarios]
+
+        if self.workers > 1 and len(scenarios) > 1 and len(cohort.X):
+            from services import offload
+            results = list(self._pool().map(
+                offload.simulate, repeat(cohort.path), changes, repeat(interest_classes),
+                repeat(self.prediction_service.model_version)
+            ))
+        else:
+            results = [evaluate(self.prediction_service, cohort.X, cohort.baseline_careers, c, interest_classes)
+                       for c in changes]
+
+        size = len(cohort.X)
+        baseline_counts = cohort.baseline['career_counts']
+        report = []
+        for scenario, result in zip(scenarios, results):
+            careers = sorted(set(baseline_counts) | set(result['career_counts']))
+            deltas = {}
+            for career in careers:
+                before, after = baseline_counts.get(career, 0), result['career_counts'].get(career, 0)
+                deltas[career] = {
+                    'baseline': before,
+                    'scenario': after,
+                    'share_delta_pct': round((after - before) / size * 100, 2) if size else 0.0,
+                }
+            report.append({
+                'name': scenario['name'],
+                'changes': [{'feature': f, 'operation': op, 'value': v} for f, op, v in scenario['changes']],
+                'career_deltas': deltas,
+                'mean_salary': result['mean_salary'],
+                'mean_salary_delta': round(result['mean_salary'] - cohort.baseline['mean_salary'], 2),
+                'switched_pct': result['switched_pct'],
+            })
+
+        return {
+            'cohort_size': size,
+            'model_version': self.prediction_service.model_version,
+            'baseline': cohort.baseline,
+            'scenarios': report,
+        }
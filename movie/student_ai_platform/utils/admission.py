@@ -0,0 +1,198 @@
+import os
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+from functools import wraps
+from flask import current_app, request, jsonify
+from flask_login import current_user
+from flask_jwt_extended import get_jwt_identity
+
+class MemoryBucketStore:
+    """
+    Token buckets kept in process memory (one set per worker)
+    """
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self.buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key, rate, burst):
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self.buckets.get(key, (burst, now))
+            tokens = min(burst, tokens + (now - updated) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self.buckets[key] = (tokens, now)
+            self.buckets.move_to_end(key)
+            if len(self.buckets) > self.max_keys:
+                self.buckets.popitem(last=False)
+        return allowed, 0 if allowed else (1 - tokens) / rate
+
+class SqliteBucketStore:
+    """
+    Token buckets in a local SQLite file so every worker on the box shares them
+    """
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=1, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, tokens REAL, updated REAL)')
+            self._local.conn = conn
+        return conn
+
+    def take(self, key, rate, burst):
+        conn = self._conn()
+        now = time.time()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute('SELECT tokens, updated FROM buckets WHERE key = ?', (key,)).fetchone()
+            tokens, updated = row if row else (burst, now)
+            tokens = min(burst, tokens + max(0, now - updated) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            conn.execute('INSERT OR REPLACE INTO buckets (key, tokens, updated) VALUES (?, ?, ?)', (key, tokens, now))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return allowed, 0 if allowed else (1 - tokens) / rate
+
+class EndpointGate:
+    """
+    Caps concurrent executions of one endpoint. Callers wait at most
+    queue_timeout for a slot, and are turned away at once if the queue is full.
+    """
+    def __init__(self, max_concurrent, max_queue, queue_timeout):
+        self.semaphore = threading.BoundedSemaphore(max_concurrent)
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.waiting = 0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            if self.waiting >= self.max_queue:
+                return False
+            self.waiting += 1
+        try:
+            return self.semaphore.acquire(timeout=self.queue_timeout)
+        finally:
+            with self._lock:
+                self.waiting -= 1
+
+    def release(self):
+        self.semaphore.release()
+
+class AdmissionMetrics:
+    def __init__(self):
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, outcome, wait=0.0):
+        with self._lock:
+            stats = self.counters.setdefault(endpoint, {
+                'admitted': 0, 'rate_limited': 0, 'shed': 0, 'in_flight': 0, 'queue_wait_seconds': 0.0
+            })
+            stats[outcome] += 1
+            stats['queue_wait_seconds'] += wait
+
+    def track(self, endpoint, delta):
+        with self._lock:
+            self.counters[endpoint]['in_flight'] += delta
+
+    def snapshot(self):
+        with self._lock:
+            return {endpoint: dict(stats) for endpoint, stats in self.counters.items()}
+
+metrics = AdmissionMetrics()
+_gates = {}
+_gates_lock = threading.Lock()
+
+def _get_store():
+    app = current_app._get_current_object()
+    store = app.extensions.get('rate_limit_store')
+    if store is None:
+        backend = app.config.get('RATE_LIMIT_STORAGE', 'memory')
+        if backend == 'memory':
+            store = MemoryBucketStore()
+        else:
+            os.makedirs(os.path.dirname(os.path.abspath(backend)), exist_ok=True)
+            store = SqliteBucketStore(backend)
+        app.extensions['rate_limit_store'] = store
+    return store
+
+def _get_gate(name, max_concurrent, max_queue, queue_timeout):
+    gate = _gates.get(name)
+    if gate is None:
+        with _gates_lock:
+            gate = _gates.setdefault(name, EndpointGate(max_concurrent, max_queue, queue_timeout))
+    return gate
+
+def _client_key():
+    # Bearer-token clients are keyed by the verified token, without loading the user
+    try:
+        identity = get_jwt_identity()
+    except RuntimeError:
+        identity = None
+    if identity is not None:
+        return f"user:{identity}"
+    if current_user and current_user.is_authenticated:
+        return f"user:{current_user.id}"
+    return f"ip:{request.remote_addr}"
+
+def _reject(status, message, retry_after):
+    response = jsonify({"error": message, "status": "rejected"})
+    response.status_code = status
+    response.headers['Retry-After'] = str(max(1, int(retry_after + 0.999)))
+    return response
+
+def admission_control(name, per_minute=30, burst=10, max_concurrent=4, max_queue=None, queue_timeout=2.0, methods=None):
+    """
+    Rate limits each user/IP with a token bucket, then bounds how many requests
+    run the endpoint at once. Over-limit requests get 429, requests that cannot
+    get a slot in time get 503, both immediately and with Retry-After. A
+    shared bucket store that stays locked past its timeout also sheds with 503.
+    """
+    rate = per_minute / 60.0
+    max_queue = max_concurrent * 2 if max_queue is None else max_queue
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if not current_app.config.get('RATE_LIMIT_ENABLED', True) or (methods and request.method not in methods):
+                return view(*args, **kwargs)
+
+            try:
+                allowed, retry_after = _get_store().take(f"{name}:{_client_key()}", rate, burst)
+            except sqlite3.OperationalError:
+                # Too many workers contending for the bucket file
+                metrics.record(name, 'shed')
+                return _reject(503, "Server busy, please retry", 1)
+            if not allowed:
+                metrics.record(name, 'rate_limited')
+                return _reject(429, "Rate limit exceeded", retry_after)
+
+            gate = _get_gate(name, max_concurrent, max_queue, queue_timeout)
+            started = time.perf_counter()
+            if not gate.acquire():
+                metrics.record(name, 'shed', time.perf_counter() - started)
+                return _reject(503, "Server busy, please retry", queue_timeout)
+
+            metrics.record(name, 'admitted', time.perf_counter() - started)
+            metrics.track(name, 1)
+            try:
+                return view(*args, **kwargs)
+            finally:
+                metrics.track(name, -1)
+                gate.release()
+        return wrapper
+    return decorator
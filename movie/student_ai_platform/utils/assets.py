@@ -0,0 +1,200 @@
+"""
+Static asset pipeline. Stylesheets and scripts live in static/src; the build
+minifies them, names each file by its content hash and writes gzip (and,
+with the Brotli package installed, brotli) copies next to it:
+
+    static/dist/css/base.3f9c2a1b7d0e.css        .css.gz  .css.br
+    static/dist/manifest.json                    css/base.css -> css/base.3f9c2a1b7d0e.css
+
+Templates link assets with {{ asset_url('css/base.css') }}. A hashed URL
+never changes content, so /assets/ serves it cacheable for a year, picking
+the smallest encoding the client accepts. The app rebuilds on startup when
+the sources changed (ASSETS_AUTO_BUILD); `python -m utils.assets` builds
+ahead of a deploy.
+"""
+import os
+import re
+import sys
+import gzip
+import json
+import hashlib
+import mimetypes
+from flask import Blueprint, current_app, request, send_file, url_for, abort
+from utils.http_cache import immutable
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+MANIFEST = 'manifest.json'
+# Encodings in order of preference, with the suffix of their precompressed copy
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+# Strings and comments are matched first so whitespace inside strings survives
+_CSS_TOKENS = re.compile(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')|/\*.*?\*/|\s+', re.S)
+_CSS_PUNCTUATION = re.compile(r'\s*([{};,>])\s*')
+
+def minify_css(text):
+    def token(m):
+        if m.group(1):
+            return m.group(1)
+        return '' if m.group(0).startswith('/*') else ' '
+
+    parts = re.split(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')', _CSS_TOKENS.sub(token, text))
+    # Only squeeze punctuation outside strings; space before ':' stays since
+    # "a :hover" and "a:hover" are different selectors
+    for i in range(0, len(parts), 2):
+        parts[i] = _CSS_PUNCTUATION.sub(r'\1', parts[i]).replace(';}', '}').replace(': ', ':')
+    return ''.join(parts).strip()
+
+def minify_js(text):
+    """
+    Drops indentation, blank lines and whole-line // comments. Line breaks
+    stay, so automatic semicolon insertion behaves exactly as before
+    """
+    lines = (line.strip() for line in text.splitlines())
+    return '\n'.join(line for line in lines if line and not line.startswith('//'))
+
+MINIFIERS = {'.css': minify_css, '.js': minify_js}
+
+def source_digest(source_dir):
+    digest = hashlib.sha256()
+    for name in sorted(_source_files(source_dir)):
+        digest.update(name.encode('utf-8'))
+        with open(os.path.join(source_dir, name), 'rb') as f:
+            digest.update(hashlib.sha256(f.read()).digest())
+    return digest.hexdigest()
+
+def _source_files(source_dir):
+    for root, _, files in os.walk(source_dir):
+        for name in files:
+            yield os.path.relpath(os.path.join(root, name), source_dir).replace(os.sep, '/')
+
+def _write(path, data):
+    tmp = f"{path}.tmp{os.getpid()}"
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+def build(source_dir, build_dir):
+    """
+    Builds every file under source_dir into build_dir and returns the manifest
+    """
+    manifest = {'source_digest': source_digest(source_dir), 'assets': {}}
+    for name in sorted(_source_files(source_dir)):
+        stem, ext = os.path.splitext(name)
+        with open(os.path.join(source_dir, name), 'rb') as f:
+            data = f.read()
+        if ext in MINIFIERS:
+            data = MINIFIERS[ext](data.decode('utf-8')).encode('utf-8')
+
+        filename = f"{stem}.{hashlib.sha256(data).hexdigest()[:12]}{ext}"
+        path = os.path.join(build_dir, filename)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        _write(path, data)
+        entry = {'file': filename, 'bytes': len(data)}
+        # mtime=0 keeps the gzip output identical across builds
+        compressed = {'gzip': gzip.compress(data, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            compressed['br'] = brotli.compress(data, quality=11)
+        for encoding, suffix in ENCODINGS:
+            if encoding in compressed and len(compressed[encoding]) < len(data):
+                _write(path + suffix, compressed[encoding])
+                entry[encoding] = len(compressed[encoding])
+        manifest['assets'][name] = entry
+
+    _prune(build_dir, manifest)
+    _write(os.path.join(build_dir, MANIFEST), json.dumps(manifest, indent=2).encode('utf-8'))
+    return manifest
+
+def _prune(build_dir, manifest):
+    """
+    Removes builds older than the previous one; pages rendered just before a
+    deploy may still ask for the previous hashes. Per-user pages carry the
+    manifest digest in their ETag, so none revalidates onto a pruned build
+    """
+    keep = {entry['file'] for entry in manifest['assets'].values()}
+    previous = _read_manifest(build_dir)
+    if previous:
+        keep.update(entry['file'] for entry in previous['assets'].values())
+    for name in list(_source_files(build_dir)):
+        base = name
+        for _, suffix in ENCODINGS:
+            if base.endswith(suffix):
+                base = base[:-len(suffix)]
+        if name != MANIFEST and base not in keep:
+            os.remove(os.path.join(build_dir, name))
+
+def _read_manifest(build_dir):
+    path = os.path.join(build_dir, MANIFEST)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+class AssetManifest:
+    def __init__(self, source_dir, build_dir, auto_build=True):
+        self.source_dir = source_dir
+        self.build_dir = build_dir
+        manifest = _read_manifest(build_dir)
+        if auto_build and os.path.isdir(source_dir) and (
+                manifest is None or manifest['source_digest'] != source_digest(source_dir)):
+            manifest = build(source_dir, build_dir)
+        self.assets = manifest['assets'] if manifest else {}
+        self.digest = manifest['source_digest'] if manifest else None
+        self.files = {entry['file']: entry for entry in self.assets.values()}
+
+    def url(self, name):
+        entry = self.assets.get(name)
+        if entry is None:
+            # Not built (ASSETS_AUTO_BUILD off and no manifest); serve the source
+            return url_for('static', filename=f'src/{name}')
+        return url_for('assets.serve', filename=entry['file'])
+
+assets_bp = Blueprint('assets', __name__)
+
+@assets_bp.route('/<path:filename>')
+def serve(filename):
+    manifest = current_app.extensions['assets']
+    entry = manifest.files.get(filename)
+    if entry is None:
+        abort(404)
+
+    path = os.path.join(manifest.build_dir, filename)
+    encoding = None
+    for name, suffix in ENCODINGS:
+        if name in entry and request.accept_encodings[name]:
+            encoding, path = name, path + suffix
+            break
+    max_age = current_app.config.get('ASSETS_MAX_AGE', 31536000)
+    response = send_file(
+        path, mimetype=mimetypes.guess_type(filename)[0], conditional=True,
+        etag=f"{filename}-{encoding or 'identity'}", max_age=max_age
+    )
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    immutable(response, max_age)
+    # Assets are the same for every user, so shared caches may keep them too
+    response.cache_control.private = None
+    response.cache_control.public = True
+    return response
+
+def init_assets(app):
+    app.extensions['assets'] = AssetManifest(
+        os.path.join(app.static_folder, 'src'),
+        os.path.join(app.static_folder, 'dist'),
+        auto_build=app.config.get('ASSETS_AUTO_BUILD', True),
+    )
+    app.register_blueprint(assets_bp, url_prefix='/assets')
+    app.jinja_env.globals['asset_url'] = lambda name: app.extensions['assets'].url(name)
+
+if __name__ == "__main__":
+    static = sys.argv[1] if len(sys.argv) > 1 else 'static'
+    result = build(os.path.join(static, 'src'), os.path.join(static, 'dist'))
+    for name, entry in result['assets'].items():
+        sizes = ', '.join(f"{encoding} {entry[encoding]}" for encoding, _ in ENCODINGS if encoding in entry)
+        print(f"{name} -> {entry['file']}: {entry['bytes']} bytes ({sizes or 'uncompressed'})")
+    if brotli is None:
+        print("Brotli not installed; built gzip copies only")
@@ -0,0 +1,126 @@
+"""
+Typed loading of the career training data. Columns get compact dtypes
+(categories for the text columns, int8 scores, float32 CGPA/salary) instead of
+pandas' object/int64/float64 defaults, and a parsed CSV is cached next to
+it as one .npy file per column, keyed by the CSV's SHA-256:
+
+    <dir>/.dataset_cache/<name>-<hash>/
+        CGPA.npy  AptitudeScore.npy ...  InterestDomain.codes.npy  meta.json
+
+Later loads memory-map the numeric columns instead of parsing the CSV, and a
+changed file gets a new key, so a stale cache is never read.
+"""
+import os
+import json
+import shutil
+import hashlib
+import numpy as np
+import pandas as pd
+
+# Column -> dtype. Scores are 1-100, so int8 holds them
+CAREER_SCHEMA = {
+    'CGPA': np.float32,
+    'AptitudeScore': np.int8,
+    'CodingSkill': np.int8,
+    'CommunicationSkill': np.int8,
+    'LeadershipScore': np.int8,
+    'InterestDomain': 'category',
+    'CareerPath': 'category',
+    'Salary': np.float32,
+}
+REQUIRED = ('CGPA', 'AptitudeScore', 'CodingSkill', 'CommunicationSkill', 'LeadershipScore', 'InterestDomain')
+CACHE_DIR = '.dataset_cache'
+CACHE_FORMAT = 1
+
+def compact(df, schema=CAREER_SCHEMA):
+    """
+    Casts the schema columns present in df to their compact dtypes
+    """
+    missing = [c for c in REQUIRED if c not in df.columns]
+    if missing:
+        raise ValueError(f"Dataset is missing columns: {', '.join(missing)}")
+    dtypes = {c: t for c, t in schema.items() if c in df.columns}
+    for column, dtype in dtypes.items():
+        if dtype is not np.float32 and dtype != 'category':
+            info = np.iinfo(dtype)
+            values = df[column]
+            if len(values) and (values.min() < info.min or values.max() > info.max):
+                raise ValueError(f"{column} has values outside {np.dtype(dtype).name} range")
+    return df.astype(dtypes)
+
+def file_hash(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _cache_path(path, digest):
+    name = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(os.path.dirname(os.path.abspath(path)), CACHE_DIR, f"{name}-{digest[:16]}")
+
+def _write_cache(df, cache_path):
+    tmp = f"{cache_path}.tmp{os.getpid()}"
+    os.makedirs(tmp, exist_ok=True)
+    meta = {'format': CACHE_FORMAT, 'rows': len(df), 'columns': []}
+    for column in df.columns:
+        series = df[column]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            np.save(os.path.join(tmp, f"{column}.codes.npy"), series.cat.codes.to_numpy())
+            meta['columns'].append({'name': column, 'categories': [str(c) for c in series.cat.categories]})
+        else:
+            np.save(os.path.join(tmp, f"{column}.npy"), series.to_numpy())
+            meta['columns'].append({'name': column})
+    with open(os.path.join(tmp, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+    try:
+        os.replace(tmp, cache_path)
+    except OSError:
+        # Another process wrote the same cache first
+        shutil.rmtree(tmp, ignore_errors=True)
+
+def _read_cache(cache_path):
+    with open(os.path.join(cache_path, 'meta.json'), 'r', encoding='utf-8') as f:
+        meta = json.load(f)
+    if meta.get('format') != CACHE_FORMAT:
+        return None
+    columns = {}
+    for column in meta['columns']:
+        name = column['name']
+        if 'categories' in column:
+            codes = np.load(os.path.join(cache_path, f"{name}.codes.npy"))
+            columns[name] = pd.Categorical.from_codes(codes, column['categories'])
+        else:
+            columns[name] = np.load(os.path.join(cache_path, f"{name}.npy"), mmap_mode='r')
+    # copy=False keeps the numeric columns on the memory-mapped pages
+    return pd.DataFrame(columns, copy=False)
+
+def load_dataset(path, schema=CAREER_SCHEMA, use_cache=True):
+    """
+    Reads a career dataset CSV with compact dtypes, through the binary cache
+    """
+    digest = file_hash(path) if use_cache else None
+    cache_path = _cache_path(path, digest) if use_cache else None
+    if use_cache and os.path.exists(cache_path):
+        df = _read_cache(cache_path)
+        if df is not None:
+            return df
+
+    header = pd.read_csv(path, nrows=0).columns
+    # Integer columns are parsed at full width so compact() can range-check
+    # them; read_csv would wrap an out-of-range value into int8 silently
+    parse = {c: t for c, t in schema.items() if c in header and (t is np.float32 or t == 'category')}
+    df = compact(pd.read_csv(path, dtype=parse), schema)
+    if use_cache:
+        # Drop caches of earlier versions of this file
+        cache_root = os.path.dirname(cache_path)
+        stem = os.path.basename(cache_path).rsplit('-', 1)[0]
+        if os.path.isdir(cache_root):
+            for name in os.listdir(cache_root):
+                if name.rsplit('-', 1)[0] == stem and '.tmp' not in name:
+                    shutil.rmtree(os.path.join(cache_root, name), ignore_errors=True)
+        _write_cache(df, cache_path)
+        cached = _read_cache(cache_path)
+        if cached is not None:
+            return cached
+    return df
@@ -0,0 +1,135 @@
+"""
+Read/write routing between the primary database and read replicas.
+
+Replicas are listed in SQLALCHEMY_REPLICA_URIS and become Flask-SQLAlchemy
+binds (replica0, replica1, ...), each with its own connection pool. Without
+replicas everything uses the primary, as before.
+
+    @student_bp.route('/dashboard')
+    @read_replica                      # SELECTs here go to a replica
+    @login_required
+    def dashboard(): ...
+
+    engine = read_engine()             # bulk jobs: a replica engine, or the primary
+
+Everything else, and any INSERT/UPDATE/DELETE or flush anywhere, goes to the
+primary. Once a request writes, its later reads stay on the primary. After a
+commit, the user's signed session cookie keeps their @read_replica requests
+on the primary for REPLICA_STICKY_SECONDS, so they see their own writes
+while the replicas catch up. Token clients send no cookie, so /api/v1
+routes stay on the primary.
+
+To try it locally, copy the SQLite database and point a replica at the copy:
+
+    python utils/db_routing.py copy instance/database.db instance/replica.db
+    DATABASE_REPLICA_URLS=sqlite:///replica.db python app.py
+
+The copy does not follow later writes, so it behaves like a lagging replica.
+Run the copy again to catch it up.
+"""
+import sys
+import time
+import sqlite3
+import itertools
+from functools import wraps
+from flask import g, current_app, has_app_context, has_request_context, session as cookie_session
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+
+STICKY_KEY = '_db_primary_until'
+
+class Router:
+    def __init__(self, replica_keys, sticky_seconds):
+        self.replica_keys = replica_keys
+        self.sticky_seconds = sticky_seconds
+        self._next = itertools.cycle(replica_keys)
+
+    def replica(self, engines):
+        return engines[next(self._next)] if self.replica_keys else None
+
+def _router():
+    return current_app.extensions.get('db_routing') if has_app_context() else None
+
+def _request_wants_replica():
+    if not has_request_context() or not g.get('db_read_replica'):
+        return False
+    return cookie_session.get(STICKY_KEY, 0) <= time.time()
+
+class RoutingSession(Session):
+    """
+    Sends SELECTs to a replica inside @read_replica requests, everything
+    else to the primary
+    """
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not kwargs.get('primary'):
+            if self._flushing or (clause is not None and not getattr(clause, 'is_select', False)):
+                self.info['db_wrote'] = True
+            elif clause is not None and not self.info.get('db_wrote') and _request_wants_replica():
+                router = _router()
+                engine = router.replica(self._db.engines) if router else None
+                if engine is not None:
+                    return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+def _after_commit(session):
+    router = _router()
+    if session.info.get('db_wrote') and router and router.replica_keys and has_request_context():
+        cookie_session[STICKY_KEY] = time.time() + router.sticky_seconds
+
+event.listen(RoutingSession, 'after_commit', _after_commit)
+
+def read_replica(view):
+    """
+    Route decorator: the view's reads may be served by a replica
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        g.db_read_replica = True
+        return view(*args, **kwargs)
+    return wrapper
+
+def read_engine():
+    """
+    Engine for bulk reads outside a request (snapshots, index builds)
+    """
+    from models.database import db
+    router = _router()
+    engine = router.replica(db.engines) if router else None
+    return engine if engine is not None else db.engine
+
+def _pool_options(size):
+    return {'pool_size': size} if size else {}
+
+def configure_routing(app):
+    """
+    Adds the replica binds and pool sizes to the app config; call before db.init_app
+    """
+    config = app.config
+    binds = dict(config.get('SQLALCHEMY_BINDS') or {})
+    keys = []
+    for i, uri in enumerate(config.get('SQLALCHEMY_REPLICA_URIS') or ()):
+        keys.append(f'replica{i}')
+        binds[keys[-1]] = {'url': uri, **_pool_options(config.get('REPLICA_POOL_SIZE'))}
+    config['SQLALCHEMY_BINDS'] = binds
+    options = _pool_options(config.get('PRIMARY_POOL_SIZE'))
+    options.update(config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+    app.extensions['db_routing'] = Router(keys, config.get('REPLICA_STICKY_SECONDS', 10))
+
+def copy_sqlite(source, target):
+    """
+    Consistent copy of a live SQLite database, via the backup API
+    """
+    src, dst = sqlite3.connect(source), sqlite3.connect(target)
+    try:
+        src.backup(dst)
+    finally:
+        dst.close()
+        src.close()
+
+if __name__ == "__main__":
+    if len(sys.argv) != 4 or sys.argv[1] != 'copy':
+        print(__doc__)
+        sys.exit(0)
+    copy_sqlite(sys.argv[2], sys.argv[3])
+    print(f"Copied {sys.argv[2]} to {sys.argv[3]}")
@@ -0,0 +1,382 @@
+"""
+Feature-drift monitoring for the career model. Training writes a reference
+snapshot next to the model artifact (drift_reference.json): per-feature
+decile bins and quantiles, the interest mix and the predicted-career mix.
+At runtime every predict_career() call appends its inputs to a deque, which
+is lock-free in CPython; a background thread drains it in batches into
+fixed-size, exponentially decayed histograms, so memory does not grow with
+traffic and recent requests weigh the most:
+
+    bins       counts over the reference decile bins (PSI / KL)
+    sketch     256 uniform bins over the training range (live quantiles)
+    interest   counts per interest domain, plus one for unseen values
+    predicted  counts per predicted career
+
+Each process writes its state to instance/drift/<model version>/<pid>-<start>.json.
+Decayed counts add up, so report() merges every worker's file and compares
+the result with the reference. Settings come from the environment, since
+process-pool workers have no app config: DRIFT_HALF_LIFE (seconds, default
+a day), DRIFT_FLUSH_INTERVAL (5s) and DRIFT_CHECK_INTERVAL (60s between
+report recomputations).
+
+    python utils/drift.py reference [dataset.csv]   # snapshot for a model trained before this existed
+"""
+import os
+import sys
+import json
+import time
+import threading
+from collections import deque
+from datetime import datetime
+import numpy as np
+
+NUMERIC_FEATURES = ('cgpa', 'aptitude', 'coding', 'comm', 'leadership')
+QUANTILES = (5, 25, 50, 75, 95)
+SKETCH_BINS = 256
+EPSILON = 1e-4
+# PSI below 0.1 is stable, above 0.25 a major shift
+PSI_MODERATE = 0.1
+PSI_MAJOR = 0.25
+
+def _shares(counts):
+    counts = np.asarray(counts, dtype=np.float64)
+    total = counts.sum()
+    return counts / total if total else counts
+
+def psi(actual, expected):
+    a = np.maximum(_shares(actual), EPSILON)
+    e = np.maximum(_shares(expected), EPSILON)
+    return float(np.sum((a - e) * np.log(a / e)))
+
+def kl(actual, expected):
+    """
+    KL(live || training) in nats
+    """
+    a = np.maximum(_shares(actual), EPSILON)
+    e = np.maximum(_shares(expected), EPSILON)
+    a, e = a / a.sum(), e / e.sum()
+    return float(np.sum(a * np.log(a / e)))
+
+def status_for(value):
+    if value >= PSI_MAJOR:
+        return 'major'
+    return 'moderate' if value >= PSI_MODERATE else 'stable'
+
+def build_reference(X, interests, predicted, interest_classes, career_classes):
+    """
+    X: (n, 5) training inputs in NUMERIC_FEATURES order; interests and
+    predicted: the interest label and the model's predicted career per row
+    """
+    X = np.asarray(X, dtype=np.float64)
+    features = {}
+    for j, name in enumerate(NUMERIC_FEATURES):
+        column = X[:, j]
+        edges = np.unique(np.quantile(column, np.linspace(0.1, 0.9, 9)))
+        lo, hi = float(column.min()), float(column.max())
+        pad = (hi - lo) * 0.1 or 1.0
+        features[name] = {
+            'edges': edges.tolist(),
+            'expected': _shares(np.bincount(np.searchsorted(edges, column, side='right'), minlength=len(edges) + 1)).tolist(),
+            'sketch_range': [lo - pad, hi + pad],
+            'quantiles': np.percentile(column, QUANTILES).tolist(),
+            'mean': float(column.mean()),
+        }
+
+    def mix(labels, classes):
+        index = {str(c): i for i, c in enumerate(classes)}
+        codes = np.array([index.get(str(label), len(classes)) for label in labels], dtype=np.int64)
+        return _shares(np.bincount(codes, minlength=len(classes) + 1)[:len(classes)]).tolist()
+
+    interest_classes = [str(c) for c in interest_classes]
+    career_classes = [str(c) for c in career_classes]
+    return {
+        'rows': int(len(X)),
+        'created_at': datetime.utcnow().isoformat(timespec='seconds'),
+        'features': features,
+        'interest': {'classes': interest_classes, 'expected': mix(interests, interest_classes)},
+        'predicted': {'classes': career_classes, 'expected': mix(predicted, career_classes)},
+    }
+
+def reference_for_model(model_data, df):
+    """
+    Reference snapshot of a trained career model over the rows of a training DataFrame
+    """
+    X = df[['CGPA', 'AptitudeScore', 'CodingSkill', 'CommunicationSkill', 'LeadershipScore']].to_numpy(dtype=np.float64)
+    interests = df['InterestDomain'].astype(str).to_numpy()
+    codes = model_data['le_interest'].transform(interests)
+    X_scaled = model_data['scaler'].transform(np.column_stack([X, codes]))
+    predicted = model_data['le_career'].inverse_transform(model_data['model'].predict(X_scaled))
+    return build_reference(X, interests, predicted, model_data['le_interest'].classes_, model_data['le_career'].classes_)
+
+class DriftMonitor:
+    max_pending = 100000  # a stalled flusher drops the oldest inputs instead of growing
+
+    def __init__(self, reference, model_version, state_dir=None, half_life=None, flush_interval=None, check_interval=None):
+        self.reference = reference
+        self.model_version = model_version
+        self.state_dir = state_dir or os.path.join('instance', 'drift', str(model_version))
+        self.half_life = half_life or float(os.environ.get('DRIFT_HALF_LIFE', 86400))
+        self.flush_interval = flush_interval or float(os.environ.get('DRIFT_FLUSH_INTERVAL', 5))
+        self.check_interval = check_interval or float(os.environ.get('DRIFT_CHECK_INTERVAL', 60))
+        self._latest = None
+        self.edges = [np.asarray(reference['features'][name]['edges']) for name in NUMERIC_FEATURES]
+        ranges = np.array([reference['features'][name]['sketch_range'] for name in NUMERIC_FEATURES])
+        self.sketch_lo = ranges[:, 0]
+        self.sketch_width = (ranges[:, 1] - ranges[:, 0]) / SKETCH_BINS
+        self.interest_index = {c: i for i, c in enumerate(reference['interest']['classes'])}
+        self.career_index = {c: i for i, c in enumerate(reference['predicted']['classes'])}
+        self._pending = deque(maxlen=self.max_pending)
+        self._lock = threading.Lock()
+        self._pid = None
+        self._file = None
+        self._reset()
+
+    def _reset(self):
+        self.state = {
+            'stamp': time.time(),
+            'total': 0,
+            'bins': [np.zeros(len(e) + 1) for e in self.edges],
+            'sketch': np.zeros((len(NUMERIC_FEATURES), SKETCH_BINS + 2)),
+            'sums': np.zeros((len(NUMERIC_FEATURES), 2)),
+            'interest': np.zeros(len(self.interest_index) + 1),
+            'predicted': np.zeros(len(self.career_index) + 1),
+        }
+        self._dirty = False
+        self._pending.clear()
+
+    # Hot path
+
+    def record(self, features_dict, career):
+        if self._pid != os.getpid():
+            self._start()
+        self._pending.append((
+            features_dict['cgpa'], features_dict['aptitude'], features_dict['coding'],
+            features_dict['comm'], features_dict['leadership'], features_dict['interest'], career,
+        ))
+
+    def _start(self):
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            if self._pid is not None:
+                # Forked: the parent's counts are in the parent's file already
+                self._reset()
+            self._pid = os.getpid()
+            # Start time in the name, so a recycled pid never overwrites another worker's file
+            self._file = f"{self._pid}-{int(time.time() * 1000)}.json"
+            threading.Thread(target=self._run, name='drift-monitor', daemon=True).start()
+
+    def _run(self):
+        pid = os.getpid()
+        while self._pid == pid:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Drift monitor flush failed: {e}")
+
+    # Aggregation
+
+    def _decay(self, state, now):
+        factor = 0.5 ** (max(now - state['stamp'], 0) / self.half_life)
+        for key in ('sketch', 'sums', 'interest', 'predicted'):
+            state[key] = state[key] * factor
+        state['bins'] = [b * factor for b in state['bins']]
+        state['stamp'] = now
+        return state
+
+    def flush(self):
+        """
+        Folds pending inputs into the state and writes this process's state file
+        """
+        batch = []
+        try:
+            while True:
+                batch.append(self._pending.popleft())
+        except IndexError:
+            pass
+        with self._lock:
+            if batch:
+                state = self._decay(self.state, time.time())
+                X = np.array([row[:5] for row in batch], dtype=np.float64)
+                for j in range(X.shape[1]):
+                    column = X[:, j]
+                    state['bins'][j] += np.bincount(np.searchsorted(self.edges[j], column, side='right'),
+                                                    minlength=len(self.edges[j]) + 1)
+                    cells = np.clip(np.floor((column - self.sketch_lo[j]) / self.sketch_width[j]) + 1, 0, SKETCH_BINS + 1)
+                    state['sketch'][j] += np.bincount(cells.astype(np.int64), minlength=SKETCH_BINS + 2)
+                state['sums'][:, 0] += X.sum(axis=0)
+                state['sums'][:, 1] += len(X)
+                unseen = len(self.interest_index)
+                state['interest'] += np.bincount([self.interest_index.get(row[5], unseen) for row in batch], minlength=unseen + 1)
+                unseen = len(self.career_index)
+                state['predicted'] += np.bincount([self.career_index.get(row[6], unseen) for row in batch], minlength=unseen + 1)
+                state['total'] += len(batch)
+                self._dirty = True
+            if self._dirty and self._pid == os.getpid():
+                self._write()
+                self._dirty = False
+        return len(batch)
+
+    def _write(self):
+        os.makedirs(self.state_dir, exist_ok=True)
+        payload = {key: value.tolist() if isinstance(value, np.ndarray) else value for key, value in self.state.items()}
+        payload['bins'] = [b.tolist() for b in self.state['bins']]
+        path = os.path.join(self.state_dir, self._file)
+        tmp = f"{path}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(payload, f)
+        os.replace(tmp, path)
+
+    def _merged(self, now):
+        merged = None
+        names = os.listdir(self.state_dir) if os.path.isdir(self.state_dir) else []
+        for name in names:
+            if not name.endswith('.json'):
+                continue
+            path = os.path.join(self.state_dir, name)
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    raw = json.load(f)
+            except (OSError, ValueError):
+                continue
+            # Per-feature bins differ in length, so they stay a list of arrays
+            state = {key: np.asarray(value, dtype=np.float64) if isinstance(value, list) and key != 'bins' else value
+                     for key, value in raw.items()}
+            state['bins'] = [np.asarray(b, dtype=np.float64) for b in raw['bins']]
+            state = self._decay(state, now)
+            if state['sums'][:, 1].max() < EPSILON and name != self._file:
+                # Nothing left after decay; a worker that exited long ago
+                os.remove(path)
+                continue
+            if merged is None:
+                merged = state
+            else:
+                for key in ('sketch', 'sums', 'interest', 'predicted'):
+                    merged[key] = merged[key] + state[key]
+                merged['bins'] = [a + b for a, b in zip(merged['bins'], state['bins'])]
+                merged['total'] += state['total']
+        return merged
+
+    def _quantiles(self, sketch, j):
+        total = sketch.sum()
+        if not total:
+            return [None] * len(QUANTILES)
+        cumulative = np.cumsum(sketch)
+        edges = self.sketch_lo[j] + self.sketch_width[j] * np.arange(SKETCH_BINS + 1)
+        out = []
+        for q in QUANTILES:
+            target = total * q / 100
+            cell = int(np.searchsorted(cumulative, target))
+            if cell == 0:
+                out.append(float(edges[0]))
+            elif cell > SKETCH_BINS:
+                out.append(float(edges[-1]))
+            else:
+                before = cumulative[cell - 1]
+                inside = (target - before) / sketch[cell] if sketch[cell] else 0
+                out.append(round(float(edges[cell - 1] + inside * self.sketch_width[j]), 3))
+        return out
+
+    def report(self, min_samples=100):
+        self.flush()
+        now = time.time()
+        state = self._merged(now)
+        reference = self.reference
+        report = {
+            'model_version': self.model_version,
+            'computed_at': datetime.utcnow().isoformat(timespec='seconds'),
+            'half_life_hours': round(self.half_life / 3600, 1),
+            'reference_rows': reference['rows'],
+            'samples': 0, 'predictions': 0, 'status': 'insufficient',
+            'features': {}, 'interest': None, 'predicted': None,
+        }
+        if state is None:
+            return report
+        samples = float(state['sums'][0, 1])
+        report.update(samples=round(samples, 1), predictions=int(state['total']))
+
+        for j, name in enumerate(NUMERIC_FEATURES):
+            ref = reference['features'][name]
+            value = psi(state['bins'][j], ref['expected'])
+            report['features'][name] = {
+                'psi': round(value, 4),
+                'kl': round(kl(state['bins'][j], ref['expected']), 4),
+                'status': status_for(value),
+                'mean': round(float(state['sums'][j, 0] / samples), 3) if samples else None,
+                'train_mean': round(ref['mean'], 3),
+                'quantiles': self._quantiles(state['sketch'][j], j),
+                'train_quantiles': [round(q, 3) for q in ref['quantiles']],
+            }
+        for key in ('interest', 'predicted'):
+            classes, expected = reference[key]['classes'], reference[key]['expected']
+            # Values the model never saw count against an expected share of zero
+            value = psi(state[key], list(expected) + [0.0])
+            live = _shares(state[key])
+            report[key] = {
+                'psi': round(value, 4),
+                'kl': round(kl(state[key], list(expected) + [0.0]), 4),
+                'status': status_for(value),
+                'live': {c: round(float(s), 4) for c, s in zip(classes + ['(unseen)'], live)},
+                'train': {c: round(float(s), 4) for c, s in zip(classes, expected)},
+            }
+
+        if samples >= min_samples:
+            worst = max([f['psi'] for f in report['features'].values()] + [report['interest']['psi'], report['predicted']['psi']])
+            report['status'] = status_for(worst)
+        return report
+
+    def latest(self):
+        """
+        The last report, recomputed at most every check_interval seconds
+        """
+        latest = self._latest
+        if latest is None or time.monotonic() - latest[0] >= self.check_interval:
+            latest = self._latest = (time.monotonic(), self.report())
+        return latest[1]
+
+_monitors = {}
+_monitors_lock = threading.Lock()
+
+def get_monitor(model_data, model_version):
+    """
+    The process-wide monitor for a model version, or None when the model has no reference snapshot
+    """
+    reference = (model_data or {}).get('drift_reference')
+    if reference is None:
+        return None
+    monitor = _monitors.get(model_version)
+    if monitor is None:
+        with _monitors_lock:
+            monitor = _monitors.get(model_version)
+            if monitor is None:
+                monitor = _monitors[model_version] = DriftMonitor(reference, model_version)
+    return monitor
+
+def flush_all():
+    """
+    Writes every monitor's pending inputs; for a worker about to exit
+    """
+    for monitor in list(_monitors.values()):
+        monitor.flush()
+
+if __name__ == "__main__":
+    # Backfill the reference for the current career model artifact
+    if len(sys.argv) < 2 or sys.argv[1] != 'reference':
+        print(__doc__)
+        sys.exit(0)
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from utils import model_artifacts
+    from utils.train_models import generate_advanced_dataset
+    from utils.datasets import load_dataset
+
+    version_dir = model_artifacts.current_version_dir(os.path.join('models', 'career_model'))
+    if not version_dir:
+        sys.exit("No career model artifact; run utils/train_models.py first")
+    df = load_dataset(sys.argv[2]) if len(sys.argv) > 2 else generate_advanced_dataset()
+    reference = reference_for_model(model_artifacts.load_career_model(version_dir), df)
+    path = os.path.join(version_dir, model_artifacts.DRIFT_REFERENCE)
+    with open(f"{path}.tmp", 'w', encoding='utf-8') as f:
+        json.dump(reference, f)
+    os.replace(f"{path}.tmp", path)
+    print(f"Drift reference written to {path}")
@@ -0,0 +1,406 @@
+"""
+Write-behind buffer for append-only rows: interview attempts and activity
+events. record() appends a row to this worker's spool file and to memory,
+and a background thread inserts what has piled up in one transaction per
+batch, when EVENT_FLUSH_SIZE rows are waiting or every EVENT_FLUSH_INTERVAL
+seconds. Requests no longer take the database write lock for these rows.
+
+    instance/spool/<db>/<owner>.lock            locked while the owning worker runs
+    instance/spool/<db>/<owner>.<seq>.jsonl     rows not yet committed
+
+<db> is a hash of the database URI. A segment is deleted once its rows are
+committed. Workers claim the segments of owners whose lock is free (the
+worker exited or crashed) and insert them, at startup and every
+EVENT_RECOVER_INTERVAL seconds. Delivery is at-least-once: a worker that
+dies between a commit and the delete leaves that batch to be inserted again.
+With EVENT_SPOOL = 'memory' rows are kept in memory only.
+
+record() rejects values that do not fit their column. A batch that still
+fails for any reason other than the database being unavailable is retried
+row by row, and rows that fail on their own go to EVENT_DEAD_LETTER (one
+JSON line with the table, row and error each), so they never hold up the
+rows behind them.
+
+Backlog, flush latency and row counts are exported on /metrics.
+"""
+import os
+import json
+import time
+import atexit
+import hashlib
+import itertools
+import threading
+from collections import Counter
+from datetime import datetime
+from flask import current_app, request
+from flask_login import current_user
+from sqlalchemy import DateTime
+from sqlalchemy.exc import OperationalError
+from models.database import db, InterviewAttempt, ActivityEvent
+from utils.instrumentation import Histogram
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Buffered table -> the column stamped with the time the row was recorded
+STAMPS = {InterviewAttempt.__table__: 'attempted_at', ActivityEvent.__table__: 'created_at'}
+OUTCOMES = ('recorded', 'flushed', 'recovered', 'dropped', 'failed', 'dead_lettered')
+# Page views are logged for the pages students and admins navigate
+PAGE_VIEW_BLUEPRINTS = ('student', 'admin')
+
+_owners = itertools.count()
+
+class EventBuffer:
+    def __init__(self, app, spool_dir=None, flush_size=500, flush_interval=1.0, max_backlog=100000, recover_interval=60,
+                 dead_letter_path=None):
+        self.app = app
+        self.spool_dir = spool_dir
+        self.dead_letter_path = dead_letter_path
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.max_backlog = max_backlog
+        self.recover_interval = recover_interval
+        self.tables = {table.name: table for table in STAMPS}
+        self.stamps = {table.name: column for table, column in STAMPS.items()}
+        self.types = {table.name: {column.name: _python_type(column) for column in table.columns} for table in STAMPS}
+        self.flush_duration = Histogram('event_buffer_flush_seconds', 'Time to insert one batch of buffered rows', ('rows',))
+        self.counts = Counter()
+        self._pending = []
+        self._segments = []
+        self._spool = None
+        self._oldest = None
+        self._pid = None
+        self._owner = None
+        self._lock_file = None
+        self._lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._wake = threading.Event()
+        atexit.register(self.close)
+
+    # Recording
+
+    def record(self, table, row):
+        """
+        Queues a row for `table` (a table name in STAMPS); returns False when
+        the backlog is full and the row was dropped
+        """
+        if self._pid != os.getpid():
+            self.start()
+        stamp = self.stamps.get(table)
+        if stamp is None:
+            raise ValueError(f"{table} is not a buffered table")
+        _check_row(table, row, self.types[table])
+        row = dict(row)
+        row.setdefault(stamp, datetime.utcnow())
+        with self._lock:
+            if len(self._pending) >= self.max_backlog:
+                self.counts['dropped'] += 1
+                return False
+            if self.spool_dir:
+                if self._spool is None:
+                    self._spool = open(self._segment_path(), 'w', encoding='utf-8')
+                # Flushed to the OS per row, so a crashed worker loses nothing
+                self._spool.write(json.dumps([table, row], default=str) + '\n')
+                self._spool.flush()
+            if not self._pending:
+                self._oldest = time.monotonic()
+            self._pending.append((table, row))
+            self.counts['recorded'] += 1
+            full = len(self._pending) >= self.flush_size
+        if full:
+            self._wake.set()
+        return True
+
+    def _segment_path(self):
+        return os.path.join(self.spool_dir, f"{self._owner}.{next(self._seq):06d}.jsonl")
+
+    def start(self):
+        """
+        Takes a spool owner name and starts the flush thread for this process.
+        A forked child leaves the parent's rows and files to the parent
+        """
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            if self._pid is not None:
+                for handle in (self._lock_file, self._spool):
+                    if handle is not None:
+                        handle.close()
+                self._lock = threading.Lock()
+                self._wake = threading.Event()
+                self._pending, self._segments, self._spool, self._oldest = [], [], None, None
+                self.counts = Counter()
+            self._pid = os.getpid()
+            # Start time in the name, so a recycled pid never takes over a dead worker's files
+            self._owner = f"{self._pid}-{int(time.time() * 1000)}-{next(_owners)}"
+            self._seq = itertools.count()
+            if self.spool_dir:
+                os.makedirs(self.spool_dir, exist_ok=True)
+                self._lock_file = open(os.path.join(self.spool_dir, f"{self._owner}.lock"), 'w')
+                if fcntl is not None:
+                    fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                self.recover()
+            threading.Thread(target=self._run, name='event-buffer', daemon=True).start()
+
+    def _run(self):
+        pid = os.getpid()
+        recovered_at = time.monotonic()
+        while self._pid == pid:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+                # Without flock a live owner cannot be told from a dead one; claim at startup only
+                if fcntl is not None and self.spool_dir and time.monotonic() - recovered_at >= self.recover_interval:
+                    recovered_at = time.monotonic()
+                    self.recover()
+            except Exception as e:
+                print(f"Event buffer flush failed: {e}")
+                time.sleep(self.flush_interval)
+
+    # Flushing
+
+    def flush(self):
+        """
+        Inserts every row recorded so far in one transaction; returns the row count
+        """
+        with self._lock:
+            batch, self._pending = self._pending, []
+            segments, self._segments = self._segments, []
+            if self._spool is not None:
+                self._spool.close()
+                segments.append(self._spool.name)
+                self._spool = None
+            oldest, self._oldest = self._oldest, None
+        inserted = len(batch)
+        if batch:
+            started = time.perf_counter()
+            try:
+                self._insert(batch)
+            except Exception as e:
+                unsent, dead = batch, []
+                if not isinstance(e, OperationalError):
+                    # Likely a bad row rather than the database; insert around it
+                    unsent, dead = self._insert_each(batch)
+                    self._dead_letter(dead)
+                inserted = len(batch) - len(unsent) - len(dead)
+                self.counts['flushed'] += inserted
+                if unsent:
+                    # Keep the rows and their segments for the next attempt
+                    with self._lock:
+                        self._pending[:0] = unsent
+                        self._segments[:0] = segments
+                        if oldest is not None:
+                            self._oldest = oldest if self._oldest is None else min(oldest, self._oldest)
+                        self.counts['failed'] += len(unsent)
+                    raise
+            else:
+                self.counts['flushed'] += inserted
+            self.flush_duration.observe((_size_bucket(len(batch)),), time.perf_counter() - started)
+        for path in segments:
+            os.remove(path)
+        return inserted
+
+    def _insert_each(self, batch):
+        """
+        Inserts rows one at a time. Returns (rows left for a retry once the
+        database is back, [(table, row, error)] that fail on their own)
+        """
+        dead = []
+        for i, (table, row) in enumerate(batch):
+            try:
+                self._insert([(table, row)])
+            except OperationalError:
+                return batch[i:], dead
+            except Exception as e:
+                dead.append((table, row, e))
+        return [], dead
+
+    def _dead_letter(self, dead):
+        if not dead:
+            return
+        with self._lock:
+            self.counts['dead_lettered'] += len(dead)
+        lines = [json.dumps({'table': table, 'row': row, 'error': str(error).splitlines()[0],
+                             'at': datetime.utcnow().isoformat()}, default=str) for table, row, error in dead]
+        if self.dead_letter_path is None:
+            print(f"Event buffer dropped {len(dead)} rows that cannot be inserted: {lines[0]}")
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.dead_letter_path)), exist_ok=True)
+        with open(self.dead_letter_path, 'a', encoding='utf-8') as f:
+            f.write(''.join(line + '\n' for line in lines))
+
+    def _insert(self, batch):
+        by_table = {}
+        for table, row in batch:
+            by_table.setdefault(table, []).append(row)
+        with self.app.app_context():
+            with db.engine.begin() as conn:
+                for name, rows in by_table.items():
+                    # One executemany per table; every row needs the same keys
+                    keys = set().union(*rows)
+                    conn.execute(self.tables[name].insert(), [{key: row.get(key) for key in keys} for row in rows])
+
+    # Crash recovery
+
+    def recover(self):
+        """
+        Claims the spool segments of owners that are gone and queues their rows
+        """
+        if not self.spool_dir:
+            return 0
+        claimed = []
+        for name in sorted(os.listdir(self.spool_dir)):
+            if not name.endswith('.lock') or name == f"{self._owner}.lock":
+                continue
+            owner = name[:-len('.lock')]
+            if fcntl is None and owner.split('-', 1)[0] == str(self._pid):
+                continue
+            path = os.path.join(self.spool_dir, name)
+            try:
+                handle = open(path, 'a')
+            except OSError:
+                continue
+            try:
+                if fcntl is not None:
+                    try:
+                        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except OSError:
+                        continue  # the owner is alive
+                for segment in sorted(os.listdir(self.spool_dir)):
+                    if segment.startswith(f"{owner}.") and segment.endswith('.jsonl'):
+                        # The rename is the claim; a second claimant finds nothing left
+                        target = self._segment_path()
+                        try:
+                            os.replace(os.path.join(self.spool_dir, segment), target)
+                        except FileNotFoundError:
+                            continue
+                        claimed.append(target)
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            finally:
+                handle.close()
+
+        rows = [row for path in claimed for row in self._read_segment(path)]
+        if claimed:
+            with self._lock:
+                self._pending[:0] = rows
+                self._segments[:0] = claimed
+                if rows and self._oldest is None:
+                    self._oldest = time.monotonic()
+                self.counts['recovered'] += len(rows)
+            self._wake.set()
+        return len(rows)
+
+    def _read_segment(self, path):
+        rows = []
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    table, row = json.loads(line)
+                except ValueError:
+                    continue  # cut short by the crash
+                if table not in self.tables:
+                    continue
+                for column in self.tables[table].columns:
+                    if isinstance(column.type, DateTime) and isinstance(row.get(column.name), str):
+                        row[column.name] = datetime.fromisoformat(row[column.name])
+                rows.append((table, row))
+        return rows
+
+    def close(self):
+        """
+        Flushes what is left; the lock file is removed only when nothing is left to recover
+        """
+        if self._pid != os.getpid():
+            return
+        self._pid = None
+        try:
+            self.flush()
+        except Exception as e:
+            print(f"Event buffer final flush failed, rows stay in the spool: {e}")
+            return
+        if self._lock_file is not None:
+            os.remove(self._lock_file.name)
+            self._lock_file.close()
+            self._lock_file = None
+
+    # Metrics
+
+    def render_metrics(self):
+        with self._lock:
+            backlog, oldest = len(self._pending), self._oldest
+            segments = len(self._segments) + (self._spool is not None)
+        lines = [
+            '# HELP event_buffer_backlog Rows recorded but not yet inserted', '# TYPE event_buffer_backlog gauge',
+            f'event_buffer_backlog {backlog}',
+            '# HELP event_buffer_oldest_seconds Age of the oldest row not yet inserted', '# TYPE event_buffer_oldest_seconds gauge',
+            f'event_buffer_oldest_seconds {round(time.monotonic() - oldest, 3) if oldest is not None else 0}',
+            '# HELP event_buffer_spool_segments Spool files waiting for a flush', '# TYPE event_buffer_spool_segments gauge',
+            f'event_buffer_spool_segments {segments}',
+            '# HELP event_buffer_rows_total Buffered rows by outcome', '# TYPE event_buffer_rows_total counter',
+        ]
+        lines += [f'event_buffer_rows_total{{outcome="{outcome}"}} {self.counts[outcome]}' for outcome in OUTCOMES]
+        return lines + self.flush_duration.render()
+
+def _python_type(column):
+    try:
+        return column.type.python_type
+    except NotImplementedError:
+        return None
+
+def _check_row(table, row, types):
+    for key, value in row.items():
+        if key not in types:
+            raise ValueError(f"{table} has no column {key}")
+        expected = types[key]
+        if value is None or expected is None or isinstance(value, expected):
+            continue
+        if expected is float and isinstance(value, int):
+            continue
+        raise ValueError(f"{table}.{key} expects {expected.__name__}, got {type(value).__name__}")
+
+def _size_bucket(n):
+    for bound in (10, 100, 1000, 10000):
+        if n <= bound:
+            return f"<={bound}"
+    return ">10000"
+
+def init_event_buffer(app):
+    spool = app.config.get('EVENT_SPOOL', 'memory')
+    spool_dir = None
+    if spool != 'memory':
+        # One directory per database, so a claimed spool is never replayed into another one
+        key = hashlib.sha1(app.config['SQLALCHEMY_DATABASE_URI'].encode('utf-8')).hexdigest()[:12]
+        spool_dir = os.path.join(spool, key)
+    buffer = EventBuffer(
+        app, spool_dir,
+        flush_size=app.config.get('EVENT_FLUSH_SIZE', 500),
+        flush_interval=app.config.get('EVENT_FLUSH_INTERVAL', 1.0),
+        max_backlog=app.config.get('EVENT_MAX_BACKLOG', 100000),
+        recover_interval=app.config.get('EVENT_RECOVER_INTERVAL', 60),
+        dead_letter_path=app.config.get('EVENT_DEAD_LETTER'),
+    )
+    app.extensions['event_buffer'] = buffer
+    # Started now rather than on the first event, so rows left by a crash go in at once
+    buffer.start()
+
+    if app.config.get('ACTIVITY_PAGE_VIEWS', True):
+        @app.after_request
+        def record_page_view(response):
+            if (request.method == 'GET' and response.status_code in (200, 304)
+                    and request.blueprint in PAGE_VIEW_BLUEPRINTS and current_user.is_authenticated):
+                record_activity('page_view', current_user.id, endpoint=request.endpoint)
+            return response
+
+def record_row(table, row):
+    return current_app.extensions['event_buffer'].record(table, row)
+
+def record_activity(kind, user_id, **detail):
+    return record_row('activity_event', {
+        'user_id': user_id, 'kind': kind, 'detail': json.dumps(detail) if detail else None,
+    })
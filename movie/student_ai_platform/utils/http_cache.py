@@ -0,0 +1,100 @@
+import os
+import hashlib
+from functools import wraps
+from flask import current_app, request, session, make_response
+from flask.sessions import SecureCookieSessionInterface
+
+# Rendered bodies of public pages, keyed by path
+_page_cache = {}
+
+def make_etag(*parts):
+    return hashlib.sha1('|'.join(str(p) for p in parts).encode('utf-8')).hexdigest()
+
+def deploy_token():
+    """
+    Identifies the running release: APP_VERSION, a digest of the templates
+    and the asset build. Part of every conditional_page ETag, so a deploy
+    invalidates pages whose data did not change
+    """
+    from utils.assets import source_digest
+
+    app = current_app._get_current_object()
+    token = app.extensions.get('deploy_token')
+    if token is None:
+        templates = os.path.join(app.root_path, app.template_folder)
+        assets = app.extensions.get('assets')
+        token = app.extensions['deploy_token'] = make_etag(
+            app.config.get('APP_VERSION', ''), source_digest(templates), assets.digest if assets else None
+        )
+    return token
+
+def public_page(view):
+    """
+    Full-page cache for anonymous, user-independent pages: the template is
+    rendered once per process and then served from memory with an ETag
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if current_app.debug:
+            return view(*args, **kwargs)
+        cached = _page_cache.get(request.path)
+        if cached is None:
+            body = make_response(view(*args, **kwargs)).get_data()
+            cached = (body, make_etag(body))
+            _page_cache[request.path] = cached
+        body, etag = cached
+        response = make_response(body)
+        response.set_etag(etag)
+        response.cache_control.public = True
+        response.cache_control.max_age = current_app.config.get('PAGE_CACHE_MAX_AGE', 300)
+        return response.make_conditional(request)
+    return wrapper
+
+class PublicSessionInterface(SecureCookieSessionInterface):
+    """
+    Flask adds Vary: Cookie whenever the session was read, and Flask-Login
+    reads it on every response. A response marked public is the same for
+    every visitor, so it keeps its shared-cache entry as long as the session
+    was not written
+    """
+    def save_session(self, app, session, response):
+        super().save_session(app, session, response)
+        if response.cache_control.public and not session.modified:
+            response.vary = [header for header in response.vary if header.lower() != 'cookie']
+
+def conditional_page(etag_parts, last_modified, render):
+    """
+    Serves a per-user page with ETag/Last-Modified validators. The template is
+    only rendered when the client's copy is stale, so a revalidation costs the
+    version lookup and nothing else.
+    """
+    if session.get('_flashes'):
+        # Pending flash messages are consumed by the render; never answer 304 over them
+        return render()
+
+    etag = make_etag(deploy_token(), *etag_parts)
+    if last_modified is not None:
+        last_modified = last_modified.replace(microsecond=0)
+    if request.if_none_match.contains(etag) or (
+        not request.if_none_match and last_modified is not None
+        and request.if_modified_since is not None
+        and last_modified <= request.if_modified_since.replace(tzinfo=None)
+    ):
+        response = make_response('', 304)
+    else:
+        response = make_response(render())
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+def immutable(response, max_age=31536000):
+    """
+    Marks a response whose URL embeds a content hash as cacheable forever
+    """
+    response.cache_control.private = True
+    response.cache_control.max_age = max_age
+    response.cache_control.immutable = True
+    return response
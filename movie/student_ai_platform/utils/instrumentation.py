@@ -0,0 +1,247 @@
+import os
+import sys
+import time
+import threading
+from collections import Counter
+from functools import wraps
+from flask import g, request, has_request_context, template_rendered, before_render_template, Response, abort
+from flask_login import current_user
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from utils.admission import metrics as admission_metrics
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class Histogram:
+    """
+    Cumulative-bucket histogram keyed by label tuples, rendered in Prometheus text format
+    """
+    def __init__(self, name, help_text, label_names, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self.series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value):
+        with self._lock:
+            counts, total = self.series.get(labels, ([0] * len(self.buckets), [0.0, 0]))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            total[0] += value
+            total[1] += 1
+            self.series[labels] = (counts, total)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labels, (counts, (total, count)) in sorted(self.series.items()):
+                label_str = ','.join(f'{k}="{_escape(v)}"' for k, v in zip(self.label_names, labels))
+                sep = ',' if label_str else ''
+                for bound, c in zip(self.buckets, counts):
+                    lines.append(f'{self.name}_bucket{{{label_str}{sep}le="{bound}"}} {c}')
+                lines.append(f'{self.name}_bucket{{{label_str}{sep}le="+Inf"}} {count}')
+                lines.append(f'{self.name}_sum{{{label_str}}} {total}')
+                lines.append(f'{self.name}_count{{{label_str}}} {count}')
+        return lines
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+request_duration = Histogram(
+    'http_request_duration_seconds', 'Request latency by endpoint', ('endpoint', 'method', 'status')
+)
+span_duration = Histogram(
+    'span_duration_seconds', 'Time spent per request in services, DB queries and template rendering', ('kind', 'name')
+)
+
+# Per-request spans
+
+def record_span(kind, name, duration):
+    if has_request_context() and hasattr(g, 'spans'):
+        g.spans.append((kind, name, duration))
+
+def timed(kind, name):
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record_span(kind, name, time.perf_counter() - started)
+        wrapper.__instrumented__ = True
+        return wrapper
+    return decorator
+
+def instrument_class(cls, prefix):
+    """
+    Wraps every public method of a service class in a 'service' span
+    """
+    for attr, value in list(vars(cls).items()):
+        func = getattr(value, '__func__', value)
+        if attr.startswith('_') or not callable(func) or getattr(func, '__instrumented__', False):
+            continue
+        if isinstance(value, (staticmethod, classmethod)):
+            setattr(cls, attr, type(value)(timed('service', f'{prefix}.{attr}')(value.__func__)))
+        else:
+            setattr(cls, attr, timed('service', f'{prefix}.{attr}')(value))
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get('query_started')
+    # Statements already running when the listeners were attached have no start time
+    if started:
+        record_span('db', 'query', time.perf_counter() - started.pop())
+
+def _before_render(sender, template, context, **extra):
+    if hasattr(g, 'render_started'):
+        g.render_started.append(time.perf_counter())
+
+def _after_render(sender, template, context, **extra):
+    if getattr(g, 'render_started', None):
+        record_span('render', template.name or 'template', time.perf_counter() - g.render_started.pop())
+
+# Sampling profiler
+
+class StackSampler:
+    """
+    Samples one thread's Python stack at a fixed interval and counts
+    collapsed stacks ("outer;inner;leaf count"), the input format of
+    flamegraph.pl and speedscope
+    """
+    def __init__(self, thread_id, interval=0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def dump(self, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+def _is_admin(app):
+    # Reading current_user opens the session, which makes Flask add Vary: Cookie
+    # to public and asset responses; without a session cookie there is no admin
+    if not request.cookies.get(app.config['SESSION_COOKIE_NAME']):
+        return False
+    return current_user.is_authenticated and current_user.role == 'admin'
+
+def _wants_profile(app):
+    return (
+        app.config.get('PROFILER_ENABLED', True)
+        and request.headers.get(app.config.get('PROFILER_HEADER', 'X-Profile')) == '1'
+        and _is_admin(app)
+    )
+
+def init_instrumentation(app):
+    from services.prediction_service import PredictionService
+    from services.resume_service import ResumeService
+    from services.personality_service import PersonalityService
+    from services.interview_service import InterviewService
+    from services.market_service import MarketService
+    from services.profile_service import ProfileService
+    from services.report_service import ReportService
+    from services.similarity_service import SimilarityService
+    from services.shap_summary_service import ShapSummaryService
+    from services.learning_path_service import LearningPathService
+
+    for cls, prefix in ((PredictionService, 'prediction'), (ResumeService, 'resume'),
+                        (PersonalityService, 'personality'), (InterviewService, 'interview'),
+                        (MarketService, 'market'), (ProfileService, 'profile'), (ReportService, 'report'),
+                        (SimilarityService, 'similarity'), (ShapSummaryService, 'shap_summary'),
+                        (LearningPathService, 'learning_path')):
+        instrument_class(cls, prefix)
+
+    before_render_template.connect(_before_render, app)
+    template_rendered.connect(_after_render, app)
+
+    @app.before_request
+    def start_spans():
+        g.request_started = time.perf_counter()
+        g.spans = []
+        g.render_started = []
+        g.sampler = None
+        if _wants_profile(app):
+            g.sampler = StackSampler(threading.get_ident(), app.config.get('PROFILER_INTERVAL', 0.005))
+            g.sampler.start()
+
+    @app.after_request
+    def emit_timing(response):
+        if not hasattr(g, 'request_started'):
+            return response
+        total = time.perf_counter() - g.request_started
+
+        aggregated = {}
+        for kind, name, duration in g.spans:
+            key = 'db' if kind == 'db' else f'{kind}.{name}'
+            dur, count = aggregated.get(key, (0.0, 0))
+            aggregated[key] = (dur + duration, count + 1)
+            span_duration.observe((kind, name), duration)
+
+        # Span names and DB time describe the internals, so only admins see them by default
+        if app.config.get('SERVER_TIMING_PUBLIC', False) or _is_admin(app):
+            entries = [f'{key.replace("/", ".")};dur={dur * 1000:.2f};desc="{count}x"' for key, (dur, count) in aggregated.items()]
+            entries.append(f'total;dur={total * 1000:.2f}')
+            response.headers['Server-Timing'] = ', '.join(entries)
+
+        request_duration.observe((request.endpoint or 'unmatched', request.method, str(response.status_code)), total)
+
+        if g.get('sampler') is not None:
+            g.sampler.stop()
+            filename = f"{time.strftime('%Y%m%d-%H%M%S')}-{(request.endpoint or 'request').replace('.', '_')}.folded"
+            g.sampler.dump(os.path.join(app.instance_path, 'profiles', filename))
+            response.headers['X-Profile-Output'] = filename
+        return response
+
+    @app.teardown_request
+    def stop_sampler(exc):
+        # after_request is skipped on unhandled errors; never leave a sampler running
+        sampler = g.pop('sampler', None)
+        if sampler is not None and not sampler._stop.is_set():
+            sampler.stop()
+
+    if not app.config.get('METRICS_ENABLED', True):
+        return
+
+    @app.route('/metrics')
+    def metrics():
+        if request.remote_addr not in app.config.get('METRICS_ALLOWED_IPS', ()) and not _is_admin(app):
+            abort(403)
+        lines = request_duration.render() + span_duration.render()
+        lines += ['# HELP admission_requests_total Requests by admission outcome', '# TYPE admission_requests_total counter']
+        for endpoint, stats in admission_metrics.snapshot().items():
+            for outcome in ('admitted', 'rate_limited', 'shed'):
+                lines.append(f'admission_requests_total{{endpoint="{_escape(endpoint)}",outcome="{outcome}"}} {stats[outcome]}')
+        event_buffer = app.extensions.get('event_buffer')
+        if event_buffer is not None:
+            lines += event_buffer.render_metrics()
+        return Response('\n'.join(lines) + '\n', mimetype='text/plain; version=0.0.4')
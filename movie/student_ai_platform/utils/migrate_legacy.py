@@ -0,0 +1,130 @@
+"""
+One-shot import of the student_ai_system database into the platform.
+
+Legacy passwords are stored in plaintext; they are hashed on the way in so
+imported students log in with their old credentials. Accounts whose username
+or email already exist on the platform are skipped (and reported), which also
+makes re-running the import a no-op.
+
+Usage (from movie/student_ai_platform):
+    python utils/migrate_legacy.py [path/to/legacy/database.db] [--dry-run]
+"""
+import os
+import sys
+import sqlite3
+import argparse
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DEFAULT_LEGACY_DB = os.path.join('..', 'student_ai_system', 'instance', 'database.db')
+
+PROFILE_FIELDS = ['name', 'cgpa', 'aptitude_score', 'coding_skill', 'communication_skill', 'leadership_score',
+                  'interest_area', 'predicted_career', 'intelligence_score', 'career_readiness_score']
+
+def read_legacy(path):
+    conn = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+    conn.row_factory = sqlite3.Row
+    try:
+        users = [dict(r) for r in conn.execute('SELECT id, username, email, password, role FROM user ORDER BY id')]
+        profiles = [dict(r) for r in conn.execute(
+            f"SELECT user_id, {', '.join(PROFILE_FIELDS)}, created_at FROM student_profile ORDER BY id"
+        )]
+    finally:
+        conn.close()
+    return users, profiles
+
+def _parse_datetime(value):
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
+def migrate(legacy_path, dry_run=False):
+    from utils.passwords import hash_password
+    from models.database import db, User, StudentProfile
+    from services.prediction_service import PredictionService
+    from services.profile_service import ProfileService
+
+    users, profiles = read_legacy(legacy_path)
+    profiles_by_user = {}
+    for p in profiles:
+        # The legacy app kept one profile per user; keep the latest if there are more
+        profiles_by_user[p['user_id']] = p
+
+    existing_usernames = {u for (u,) in db.session.query(User.username)}
+    existing_emails = {e for (e,) in db.session.query(User.email)}
+    prediction_service = PredictionService()
+
+    report = {'users': 0, 'profiles': 0, 'skipped': []}
+    for legacy_user in users:
+        if legacy_user['username'] in existing_usernames or legacy_user['email'] in existing_emails:
+            report['skipped'].append(legacy_user['username'])
+            continue
+        existing_usernames.add(legacy_user['username'])
+        existing_emails.add(legacy_user['email'])
+
+        user = User(
+            username=legacy_user['username'],
+            email=legacy_user['email'],
+            password=hash_password(legacy_user['password']),
+            role=legacy_user['role'] or 'student'
+        )
+        db.session.add(user)
+        db.session.flush()
+        report['users'] += 1
+
+        legacy_profile = profiles_by_user.get(legacy_user['id'])
+        if not legacy_profile:
+            continue
+        profile = StudentProfile(user_id=user.id, **{f: legacy_profile[f] for f in PROFILE_FIELDS})
+        created_at = _parse_datetime(legacy_profile['created_at'])
+        profile.created_at = created_at or datetime.utcnow()
+        profile.updated_at = profile.created_at
+
+        complete = None not in (profile.cgpa, profile.aptitude_score, profile.coding_skill,
+                                profile.communication_skill, profile.leadership_score)
+        if complete and profile.intelligence_score is None:
+            profile.intelligence_score, profile.career_readiness_score = ProfileService.calculate_scores({
+                'cgpa': profile.cgpa, 'aptitude': profile.aptitude_score, 'coding': profile.coding_skill,
+                'comm': profile.communication_skill, 'leadership': profile.leadership_score
+            })
+        # The legacy app never estimated salaries; the platform result page expects one
+        if complete and profile.predicted_career:
+            profile.predicted_salary, _ = prediction_service.predict_salary(
+                profile.predicted_career, profile.coding_skill, profile.cgpa
+            )
+        db.session.add(profile)
+        report['profiles'] += 1
+
+    if dry_run:
+        db.session.rollback()
+    else:
+        db.session.commit()
+    return report
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import the legacy student_ai_system database")
+    parser.add_argument('legacy_db', nargs='?', default=DEFAULT_LEGACY_DB)
+    parser.add_argument('--dry-run', action='store_true', help="report what would be imported without writing")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.legacy_db):
+        print(f"Legacy database not found: {args.legacy_db}")
+        return 1
+
+    from app import create_app
+    app = create_app()
+    with app.app_context():
+        report = migrate(args.legacy_db, dry_run=args.dry_run)
+
+    action = "Would import" if args.dry_run else "Imported"
+    print(f"{action} {report['users']} users and {report['profiles']} profiles from {args.legacy_db}")
+    if report['skipped']:
+        print(f"Skipped existing accounts: {', '.join(repr(u) for u in report['skipped'])}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
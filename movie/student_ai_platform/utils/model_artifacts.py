@@ -0,0 +1,358 @@
+"""
+Array-based model artifacts: a versioned directory holding a JSON manifest
+and raw .npy arrays, loaded with np.load(mmap_mode='r') so workers share the
+page cache instead of each unpickling a private copy.
+
+    models/career_model/
+        CURRENT                  -> name of the active version
+        CANDIDATE                -> version shadowing it on live traffic (optional, see utils/shadow.py)
+        20260101-120000-1a2b3c/
+            manifest.json
+            tree_left.npy, tree_right.npy, tree_feature.npy, tree_threshold.npy,
+            tree_value.npy, tree_weight.npy, tree_roots.npy,
+            scaler_mean.npy, scaler_scale.npy, le_interest.npy, le_career.npy, classes.npy
+
+Usage:
+    python utils/model_artifacts.py export    # convert models/*.pkl into artifact directories
+    python utils/model_artifacts.py promote   # make the career candidate the active version
+    python utils/model_artifacts.py discard   # stop shadowing the career candidate
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import shutil
+import numpy as np
+
+FORMAT_NAME = 'forest-npy'
+FORMAT_VERSION = 1
+# Training-data snapshot for utils/drift.py, stored beside the career model arrays
+DRIFT_REFERENCE = 'drift_reference.json'
+# Pointer files naming a version directory
+CURRENT = 'CURRENT'
+CANDIDATE = 'CANDIDATE'
+
+class ForestModel:
+    """
+    RandomForest inference over flat node arrays. All trees are concatenated;
+    leaves have left == -1. Matches sklearn: float32 inputs, `x <= threshold`
+    goes left, probabilities are the mean of per-tree leaf fractions.
+    """
+    chunk_rows = 2048
+
+    def __init__(self, arrays, kind, max_depth):
+        self.left = arrays['tree_left']
+        self.right = arrays['tree_right']
+        self.feature = arrays['tree_feature']
+        self.threshold = arrays['tree_threshold']
+        self.value = arrays['tree_value']
+        self.weight = arrays['tree_weight']
+        self.roots = arrays['tree_roots']
+        self.classes_ = arrays.get('classes')
+        self.kind = kind
+        self.max_depth = max_depth
+        self.n_trees = len(self.roots)
+        self._compiled = None
+
+    def _compile(self):
+        # Leaves become self-loops with an always-false test, so every (row, tree)
+        # pair steps the same way and is done once its node stops changing
+        if self._compiled is None:
+            leaf = np.asarray(self.left) < 0
+            nodes = np.arange(len(leaf), dtype=np.int32)
+            children = np.empty((len(leaf), 2), dtype=np.int32)
+            children[:, 0] = np.where(leaf, nodes, self.left)
+            children[:, 1] = np.where(leaf, nodes, self.right)
+            self._compiled = (
+                children.ravel(),
+                np.where(leaf, 0, self.feature).astype(np.intp),
+                np.where(leaf, np.inf, self.threshold),
+            )
+        return self._compiled
+
+    def _leaves(self, X):
+        children, feature, threshold = self._compile()
+        n, d = X.shape
+        flat = X.ravel()
+        nodes = np.tile(np.asarray(self.roots, dtype=np.intp), n)
+        offsets = np.repeat(np.arange(n, dtype=np.intp) * d, self.n_trees)
+        # Only pairs still descending are touched, so shallow leaves stop costing work
+        active = np.arange(len(nodes))
+        while len(active):
+            current = nodes[active]
+            step = children[2 * current + (flat[offsets[active] + feature[current]] > threshold[current])]
+            nodes[active] = step
+            active = active[step != current]
+        return nodes.reshape(n, self.n_trees)
+
+    def _mean_leaf_values(self, X):
+        X = np.asarray(X, dtype=np.float32)
+        out = np.empty((len(X), self.value.shape[1]), dtype=np.float64)
+        for start in range(0, len(X), self.chunk_rows):
+            leaves = self._leaves(X[start:start + self.chunk_rows])
+            total = np.zeros((len(leaves), self.value.shape[1]), dtype=np.float64)
+            for t in range(self.n_trees):
+                total += self.value[leaves[:, t]]
+            out[start:start + self.chunk_rows] = total / self.n_trees
+        return out
+
+    def predict_proba(self, X):
+        return self._mean_leaf_values(X)
+
+    def predict(self, X):
+        values = self._mean_leaf_values(X)
+        if self.kind == 'regressor':
+            return values[:, 0]
+        return self.classes_[np.argmax(values, axis=1)]
+
+    def to_shap_dict(self):
+        """
+        Per-tree dicts in the format shap.TreeExplainer accepts for custom models
+        """
+        bounds = list(self.roots) + [len(self.left)]
+        trees = []
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            left = np.asarray(self.left[start:end])
+            right = np.asarray(self.right[start:end])
+            left = np.where(left >= 0, left - start, -1)
+            right = np.where(right >= 0, right - start, -1)
+            trees.append({
+                'children_left': left,
+                'children_right': right,
+                'children_default': left,
+                'features': np.asarray(self.feature[start:end]),
+                'thresholds': np.asarray(self.threshold[start:end]),
+                'values': np.asarray(self.value[start:end]) / self.n_trees,
+                'node_sample_weight': np.asarray(self.weight[start:end]),
+            })
+        return {
+            'trees': trees,
+            'base_offset': 0,
+            'tree_output': 'raw_value' if self.kind == 'regressor' else 'probability',
+            'input_dtype': np.float32,
+            'internal_dtype': np.float64,
+        }
+
+class ArrayScaler:
+    def __init__(self, mean, scale):
+        self.mean_ = mean
+        self.scale_ = scale
+
+    def transform(self, X):
+        return (np.asarray(X, dtype=np.float64) - self.mean_) / self.scale_
+
+class ArrayLabelEncoder:
+    def __init__(self, classes):
+        self.classes_ = classes
+
+    def transform(self, values):
+        values = np.asarray(values).astype(str)
+        idx = np.searchsorted(self.classes_, values)
+        idx = np.clip(idx, 0, len(self.classes_) - 1)
+        if not np.all(self.classes_[idx] == values):
+            raise ValueError(f"y contains previously unseen labels: {values[self.classes_[idx] != values]}")
+        return idx
+
+    def inverse_transform(self, idx):
+        return np.array([str(c) for c in self.classes_[np.asarray(idx)]], dtype=object)
+
+# Export
+
+def _flatten_forest(forest, classifier):
+    left, right, feature, threshold, value, weight, roots = [], [], [], [], [], [], []
+    offset, max_depth = 0, 0
+    for estimator in forest.estimators_:
+        tree = estimator.tree_
+        roots.append(offset)
+        l, r = tree.children_left.astype(np.int32), tree.children_right.astype(np.int32)
+        left.append(np.where(l >= 0, l + offset, -1))
+        right.append(np.where(r >= 0, r + offset, -1))
+        feature.append(np.where(l >= 0, tree.feature, -2).astype(np.int32))
+        threshold.append(tree.threshold.astype(np.float64))
+        v = tree.value[:, 0, :].astype(np.float64)
+        if classifier:
+            v = v / v.sum(axis=1, keepdims=True)
+        value.append(v)
+        weight.append(tree.weighted_n_node_samples.astype(np.float64))
+        max_depth = max(max_depth, tree.max_depth)
+        offset += tree.node_count
+    return {
+        'tree_left': np.concatenate(left).astype(np.int32),
+        'tree_right': np.concatenate(right).astype(np.int32),
+        'tree_feature': np.concatenate(feature),
+        'tree_threshold': np.concatenate(threshold),
+        'tree_value': np.concatenate(value),
+        'tree_weight': np.concatenate(weight),
+        'tree_roots': np.asarray(roots, dtype=np.int64),
+    }, max_depth
+
+def _write_version(root_dir, arrays, manifest, version=None, extra_json=None, pointer=CURRENT):
+    # The suffix keeps two exports in the same second apart
+    version = version or f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+    version_dir = os.path.join(root_dir, version)
+    # Workers mmap the arrays of live versions, so a version is never written twice
+    if os.path.exists(version_dir):
+        raise FileExistsError(f"Model version {version_dir} already exists")
+    os.makedirs(root_dir, exist_ok=True)
+    tmp_dir = os.path.join(root_dir, f'.{version}.{os.getpid()}.tmp')
+    os.makedirs(tmp_dir)
+    try:
+        # Side files such as the drift reference, written before the pointer flips
+        for name, payload in (extra_json or {}).items():
+            if payload is not None:
+                with open(os.path.join(tmp_dir, name), 'w') as f:
+                    json.dump(payload, f)
+        manifest = dict(manifest, format=FORMAT_NAME, format_version=FORMAT_VERSION, version=version, arrays={})
+        for name, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            np.save(os.path.join(tmp_dir, f'{name}.npy'), array, allow_pickle=False)
+            manifest['arrays'][name] = {'file': f'{name}.npy', 'dtype': array.dtype.str, 'shape': list(array.shape)}
+        with open(os.path.join(tmp_dir, 'manifest.json'), 'w') as f:
+            json.dump(manifest, f, indent=2)
+        # Fails rather than merging if the name was taken meanwhile
+        os.replace(tmp_dir, version_dir)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+    _set_pointer(root_dir, pointer, version)
+    return version_dir
+
+def _set_pointer(root_dir, pointer, version):
+    # Flip atomically so readers never see a half-written version
+    tmp = os.path.join(root_dir, f'{pointer}.tmp')
+    with open(tmp, 'w') as f:
+        f.write(version)
+    os.replace(tmp, os.path.join(root_dir, pointer))
+
+def export_career_model(model_data, root_dir, version=None, pointer=CURRENT):
+    """
+    model_data: the dict saved by train_and_save (model, scaler, encoders, features, accuracy).
+    pointer=CANDIDATE exports it for shadow evaluation without making it active
+    """
+    model = model_data['model']
+    arrays, max_depth = _flatten_forest(model, classifier=True)
+    arrays.update({
+        'classes': np.asarray(model.classes_),
+        'scaler_mean': model_data['scaler'].mean_.astype(np.float64),
+        'scaler_scale': model_data['scaler'].scale_.astype(np.float64),
+        'le_interest': np.asarray(model_data['le_interest'].classes_, dtype=str),
+        'le_career': np.asarray(model_data['le_career'].classes_, dtype=str),
+    })
+    manifest = {
+        'kind': 'classifier',
+        'n_trees': len(model.estimators_),
+        'max_depth': int(max_depth),
+        'features': list(model_data['features']),
+        'accuracy': float(model_data['accuracy']),
+    }
+    return _write_version(root_dir, arrays, manifest, version, {DRIFT_REFERENCE: model_data.get('drift_reference')}, pointer)
+
+def export_salary_model(model, root_dir, version=None):
+    arrays, max_depth = _flatten_forest(model, classifier=False)
+    manifest = {
+        'kind': 'regressor',
+        'n_trees': len(model.estimators_),
+        'max_depth': int(max_depth),
+        'features': ['CodingSkill', 'CGPA', 'CareerEncoded'],
+    }
+    return _write_version(root_dir, arrays, manifest, version)
+
+# Load
+
+def current_version_dir(root_dir, pointer=CURRENT):
+    path = os.path.join(root_dir, pointer)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return os.path.join(root_dir, f.read().strip())
+
+def candidate_version_dir(root_dir):
+    return current_version_dir(root_dir, CANDIDATE)
+
+def promote_candidate(root_dir):
+    """
+    Makes the candidate the active version; running workers switch on restart
+    """
+    candidate = candidate_version_dir(root_dir)
+    if candidate is None:
+        raise ValueError(f"No candidate model in {root_dir}")
+    _set_pointer(root_dir, CURRENT, os.path.basename(candidate))
+    os.remove(os.path.join(root_dir, CANDIDATE))
+    return candidate
+
+def discard_candidate(root_dir):
+    """
+    Stops shadowing the candidate; its version directory is kept
+    """
+    candidate = candidate_version_dir(root_dir)
+    if candidate is not None:
+        os.remove(os.path.join(root_dir, CANDIDATE))
+    return candidate
+
+def load_manifest(version_dir):
+    with open(os.path.join(version_dir, 'manifest.json')) as f:
+        manifest = json.load(f)
+    if manifest.get('format') != FORMAT_NAME or manifest.get('format_version') != FORMAT_VERSION:
+        raise ValueError(f"Unsupported model artifact format in {version_dir}")
+    return manifest
+
+def load_json(version_dir, name):
+    path = os.path.join(version_dir, name)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+def load_arrays(version_dir, manifest):
+    arrays = {}
+    for name, spec in manifest['arrays'].items():
+        arrays[name] = np.load(os.path.join(version_dir, spec['file']), mmap_mode='r', allow_pickle=False)
+    return arrays
+
+def load_career_model(version_dir):
+    """
+    Returns a dict shaped like the pickled model_data, backed by memory-mapped arrays
+    """
+    manifest = load_manifest(version_dir)
+    arrays = load_arrays(version_dir, manifest)
+    return {
+        'model': ForestModel(arrays, 'classifier', manifest['max_depth']),
+        'scaler': ArrayScaler(arrays['scaler_mean'], arrays['scaler_scale']),
+        'le_interest': ArrayLabelEncoder(arrays['le_interest']),
+        'le_career': ArrayLabelEncoder(arrays['le_career']),
+        'features': manifest['features'],
+        'accuracy': manifest['accuracy'],
+        'version': manifest['version'],
+        'drift_reference': load_json(version_dir, DRIFT_REFERENCE),
+    }
+
+def load_salary_model(version_dir):
+    manifest = load_manifest(version_dir)
+    return ForestModel(load_arrays(version_dir, manifest), 'regressor', manifest['max_depth'])
+
+def export_from_pickles(models_dir='models'):
+    import joblib
+
+    career_pkl = os.path.join(models_dir, 'career_model.pkl')
+    salary_pkl = os.path.join(models_dir, 'salary_model.pkl')
+    if os.path.exists(career_pkl):
+        print(f"Exported career model to {export_career_model(joblib.load(career_pkl), os.path.join(models_dir, 'career_model'))}")
+    if os.path.exists(salary_pkl):
+        print(f"Exported salary model to {export_salary_model(joblib.load(salary_pkl), os.path.join(models_dir, 'salary_model'))}")
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else None
+    if command == 'export':
+        export_from_pickles()
+    elif command == 'promote':
+        try:
+            print(f"Promoted {promote_candidate(os.path.join('models', 'career_model'))}; restart the workers to serve it")
+        except ValueError as e:
+            sys.exit(str(e))
+    elif command == 'discard':
+        discarded = discard_candidate(os.path.join('models', 'career_model'))
+        print(f"Discarded candidate {discarded}" if discarded else "No candidate registered")
+    else:
+        print(__doc__)
@@ -0,0 +1,95 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+from werkzeug.security import generate_password_hash, check_password_hash
+
+class HasherBusy(Exception):
+    """Raised when no hashing slot frees up within the configured timeout"""
+
+class PasswordHasher:
+    """
+    Runs password hashing on a fixed pool of threads. hashlib's scrypt and
+    pbkdf2 release the GIL, so the pool spreads hashes across cores while
+    capping how many run at once; callers beyond workers + max_pending wait up
+    to `timeout` for a slot and then get HasherBusy instead of piling up.
+    """
+    def __init__(self, method, workers=None, max_pending=64, timeout=5.0):
+        self.method = method
+        self.workers = workers or os.cpu_count() or 1
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(self.workers + max_pending)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='password-hash')
+        self._prefix = None
+        self.pid = os.getpid()
+
+    def _run(self, func, *args):
+        if not self._slots.acquire(timeout=self.timeout):
+            raise HasherBusy()
+        try:
+            future = self._executor.submit(func, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda f: self._slots.release())
+        return future.result()
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, stored, password):
+        return self._run(check_password_hash, stored, password)
+
+    @property
+    def prefix(self):
+        # Werkzeug fills in default parameters ('scrypt' -> 'scrypt:32768:8:1'), so
+        # read them back from a real hash rather than parsing self.method
+        if self._prefix is None:
+            self._prefix = generate_password_hash('', self.method).split('$', 1)[0]
+        return self._prefix
+
+    def needs_rehash(self, stored):
+        return stored.split('$', 1)[0] != self.prefix
+
+_hasher_lock = threading.Lock()
+
+def get_hasher():
+    app = current_app._get_current_object()
+    hasher = app.extensions.get('password_hasher')
+    # Pool threads do not survive fork, so a forked worker builds its own hasher
+    if hasher is None or hasher.pid != os.getpid():
+        hasher = PasswordHasher(
+            app.config.get('PASSWORD_HASH_METHOD', 'scrypt'),
+            app.config.get('PASSWORD_HASH_WORKERS'),
+            app.config.get('PASSWORD_HASH_MAX_PENDING', 64),
+            app.config.get('PASSWORD_HASH_TIMEOUT', 5.0)
+        )
+        with _hasher_lock:
+            current = app.extensions.get('password_hasher')
+            if current is None or current.pid != os.getpid():
+                app.extensions['password_hasher'] = current = hasher
+        hasher = current
+    return hasher
+
+def hash_password(password):
+    return get_hasher().hash(password)
+
+def verify_password(stored, password):
+    return get_hasher().verify(stored, password)
+
+def needs_rehash(stored):
+    return get_hasher().needs_rehash(stored)
+
+def authenticate(user, password):
+    """
+    Checks a login attempt and upgrades hashes made with older cost settings
+    while the plaintext is at hand. Raises HasherBusy when the pool is full.
+    """
+    from models.database import db
+
+    if user is None or not verify_password(user.password, password):
+        return False
+    if needs_rehash(user.password):
+        user.password = hash_password(password)
+        db.session.commit()
+    return True
@@ -0,0 +1,209 @@
+"""
+Columnar, read-only snapshot of the student_profile table for bulk work
+(analytics, simulations, rescoring, exports). Columns are NumPy arrays,
+strings are small-int codes into a per-column category list, and rows are
+loaded with a streamed Core query, so no ORM objects are built. A 1M-row
+snapshot is about 80MB.
+
+    snapshot = get_snapshot()
+    cgpa = snapshot.column('cgpa')                      # NaN for NULL
+    careers = snapshot.decode('predicted_career')       # labels, None for NULL
+    counts = snapshot.value_counts('interest_area')
+
+Snapshots are immutable; a refresh builds a new one from the id and
+updated_at watermarks and swaps it in, so a reader keeps a consistent view.
+"""
+import time
+import threading
+import numpy as np
+from flask import current_app
+from sqlalchemy import select, func, or_, type_coerce, String
+from models.database import StudentProfile
+from utils.db_routing import read_engine
+
+# Column name -> dtype; measures are floats so NULL can be NaN. cgpa keeps full
+# precision because it is a model input
+NUMERIC = {
+    'id': np.int64, 'user_id': np.int64,
+    'cgpa': np.float64, 'aptitude_score': np.float32, 'coding_skill': np.float32,
+    'communication_skill': np.float32, 'leadership_score': np.float32,
+    'predicted_salary': np.float32, 'intelligence_score': np.float32,
+    'career_readiness_score': np.float32, 'ats_score': np.float32,
+    'created_at': 'datetime64[us]', 'updated_at': 'datetime64[us]',
+}
+# Stored as int16 codes, -1 for NULL
+CATEGORICAL = ('interest_area', 'predicted_career', 'personality_type')
+COLUMNS = tuple(NUMERIC) + CATEGORICAL
+
+class ProfileSnapshot:
+    def __init__(self, columns, categories, max_id, updated_mark):
+        for array in columns.values():
+            array.flags.writeable = False
+        self._columns = columns
+        self.categories = {name: tuple(labels) for name, labels in categories.items()}
+        self.max_id = max_id
+        self.updated_mark = updated_mark
+        self.loaded_at = time.monotonic()
+
+    def __len__(self):
+        return len(self._columns['id'])
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in self._columns.values())
+
+    def column(self, name):
+        """
+        Numeric column, or the int16 codes of a categorical one
+        """
+        return self._columns[name]
+
+    def codes(self, name, labels):
+        """
+        Codes that `labels` have in categorical column `name` (-2 if absent)
+        """
+        index = {label: code for code, label in enumerate(self.categories[name])}
+        return np.array([index.get(label, -2) for label in labels], dtype=np.int16)
+
+    def decode(self, name):
+        lookup = np.array(self.categories[name] + (None,), dtype=object)
+        return lookup[self._columns[name]]
+
+    def value_counts(self, name):
+        codes = self._columns[name]
+        counts = np.bincount(codes[codes >= 0], minlength=len(self.categories[name]))
+        return {label: int(c) for label, c in zip(self.categories[name], counts) if c}
+
+def _decode_rows(rows, categories):
+    """
+    rows: tuples in COLUMNS order. Returns {column: array}, growing `categories` in place
+    """
+    raw = list(zip(*rows)) if rows else [()] * len(COLUMNS)
+    columns = {}
+    for name, values in zip(COLUMNS, raw):
+        if name in NUMERIC:
+            columns[name] = np.array(values, dtype=NUMERIC[name])
+        else:
+            index = categories[name]
+            columns[name] = np.fromiter(
+                (-1 if v is None else index.setdefault(v, len(index)) for v in values), dtype=np.int16, count=len(values)
+            )
+    return columns
+
+def _same(a, b):
+    if a.dtype.kind == 'M':
+        return np.array_equal(a.view(np.int64), b.view(np.int64))
+    return np.array_equal(a, b, equal_nan=a.dtype.kind == 'f')
+
+class SnapshotStore:
+    """
+    Holds the current snapshot for one app and refreshes it at most every
+    `refresh_interval` seconds. The first load blocks every caller; later
+    refreshes run on one thread while the others keep reading the old snapshot.
+    """
+    def __init__(self, refresh_interval=30, stream_rows=50000):
+        self.refresh_interval = refresh_interval
+        self.stream_rows = stream_rows
+        self._snapshot = None
+        self._lock = threading.Lock()
+        self._engine = None
+
+    @property
+    def engine(self):
+        # One engine for the store's lifetime: watermarks from one replica do
+        # not carry over to another that lags differently
+        if self._engine is None:
+            self._engine = read_engine()
+        return self._engine
+
+    def _read(self, *where):
+        table = StudentProfile.__table__
+        # Timestamps skip SQLAlchemy's per-value DateTime processing; NumPy parses
+        # the driver's value (an ISO string on SQLite) in bulk
+        columns = [type_coerce(table.c[name], String) if name.endswith('_at') else table.c[name] for name in COLUMNS]
+        stmt = select(*columns).where(*where).order_by(table.c.id)
+        with self.engine.connect() as conn:
+            result = conn.execution_options(stream_results=True, yield_per=self.stream_rows).execute(stmt)
+            for rows in result.partitions():
+                yield rows
+
+    def _load(self):
+        categories = {name: {} for name in CATEGORICAL}
+        parts = [_decode_rows(rows, categories) for rows in self._read()]
+        if not parts:
+            parts = [_decode_rows([], categories)]
+        columns = {name: np.concatenate([p[name] for p in parts]) for name in COLUMNS}
+        return self._build(columns, categories)
+
+    def _build(self, columns, categories):
+        ids = columns['id']
+        max_id = int(ids.max()) if len(ids) else 0
+        stamps = np.where(np.isnat(columns['updated_at']), columns['created_at'], columns['updated_at'])
+        stamps = stamps[~np.isnat(stamps)]
+        updated_mark = stamps.max().astype(object) if len(stamps) else None
+        return ProfileSnapshot(columns, {name: list(index) for name, index in categories.items()}, max_id, updated_mark)
+
+    def _refresh(self, snapshot):
+        """
+        Applies rows inserted after max_id or updated since updated_mark
+        """
+        table = StudentProfile.__table__
+        changed = table.c.id > snapshot.max_id
+        if snapshot.updated_mark is not None:
+            changed = or_(changed, func.coalesce(table.c.updated_at, table.c.created_at) >= snapshot.updated_mark)
+        categories = {name: {label: code for code, label in enumerate(snapshot.categories[name])} for name in CATEGORICAL}
+        parts = [_decode_rows(rows, categories) for rows in self._read(changed)]
+        with self.engine.connect() as conn:
+            total = conn.execute(select(func.count(StudentProfile.id))).scalar()
+        if not parts:
+            # Nothing changed unless rows were deleted
+            if total != len(snapshot):
+                return self._load()
+            snapshot.loaded_at = time.monotonic()
+            return snapshot
+        delta = {name: np.concatenate([p[name] for p in parts]) for name in COLUMNS}
+
+        ids = snapshot.column('id')
+        pos = np.searchsorted(ids, delta['id'])
+        present = (pos < len(ids)) & (ids[np.minimum(pos, len(ids) - 1)] == delta['id']) if len(ids) else np.zeros(len(pos), dtype=bool)
+        if present.all() and total == len(snapshot) and all(
+                _same(snapshot.column(name)[pos], delta[name]) for name in COLUMNS):
+            # Only the rows at the watermark itself came back
+            snapshot.loaded_at = time.monotonic()
+            return snapshot
+        columns = {}
+        for name in COLUMNS:
+            column = snapshot.column(name).copy()
+            column[pos[present]] = delta[name][present]
+            columns[name] = np.concatenate([column, delta[name][~present]])
+        if (~present).any() and len(ids) and delta['id'][~present].min() < snapshot.max_id:
+            # A late commit with a lower id; keep rows ordered by id
+            order = np.argsort(columns['id'], kind='stable')
+            columns = {name: column[order] for name, column in columns.items()}
+        if len(columns['id']) != total:
+            return self._load()
+        return self._build(columns, categories)
+
+    def get(self):
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() - snapshot.loaded_at < self.refresh_interval:
+            return snapshot
+        if not self._lock.acquire(blocking=snapshot is None):
+            return snapshot
+        try:
+            snapshot = self._snapshot
+            if snapshot is None:
+                self._snapshot = self._load()
+            elif time.monotonic() - snapshot.loaded_at >= self.refresh_interval:
+                self._snapshot = self._refresh(snapshot)
+            return self._snapshot
+        finally:
+            self._lock.release()
+
+def get_snapshot():
+    app = current_app._get_current_object()
+    store = app.extensions.get('profile_snapshot')
+    if store is None:
+        store = SnapshotStore(app.config.get('PROFILE_SNAPSHOT_REFRESH', 30))
+        store = app.extensions.setdefault('profile_snapshot', store)
+    return store.get()
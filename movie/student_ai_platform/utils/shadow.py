@@ -0,0 +1,296 @@
+"""
+Shadow evaluation of a candidate career model on live traffic. A candidate
+is a model version registered next to the active one:
+
+    python utils/train_models.py [dataset.csv] --candidate    # sets models/career_model/CANDIDATE
+
+Every process loads the candidate beside the active model. predict_career()
+passes a SHADOW_SAMPLE_RATE share of its calls (default 0.1) to a bounded
+queue, with one random() call and an append, so a request never waits on
+the candidate. A background thread runs the candidate on the queued inputs
+and records per sample:
+
+    agreement          whether the candidate predicts the same career
+    confidence delta   candidate minus active top-class confidence, in points
+    latency            each model's inference time, in log-spaced buckets
+
+Counts and buckets add up, so each process writes its totals to
+instance/shadow/<active>--<candidate>/<pid>-<start>.json and report()
+merges every worker's file. A full queue (SHADOW_QUEUE_SIZE, default 1000)
+drops samples and counts them. Settings come from the environment like
+utils/drift.py: SHADOW_SAMPLE_RATE, SHADOW_QUEUE_SIZE, SHADOW_FLUSH_INTERVAL
+(5s) and SHADOW_CHECK_INTERVAL (60s between report recomputations). Once
+the evidence is in:
+
+    python utils/model_artifacts.py promote    # or discard
+"""
+import os
+import json
+import time
+import random
+import threading
+from collections import deque
+from datetime import datetime
+import numpy as np
+from utils import model_artifacts
+
+MODELS = ('active', 'candidate')
+# Latency bucket upper bounds in ms, 20 per decade from 1us to 10s
+LATENCY_BUCKETS = np.logspace(-3, 4, 141)
+TOP_DISAGREEMENTS = 10
+
+class ShadowEvaluator:
+    def __init__(self, predict, active_data, active_version, candidate_data, state_dir=None,
+                 sample_rate=None, queue_size=None, flush_interval=None, check_interval=None):
+        """
+        predict(model_data, features_dict) -> (career, confidence), the same
+        code path the active model is served with
+        """
+        self.predict = predict
+        self.active_version = active_version
+        self.active_accuracy = active_data.get('accuracy')
+        self.candidate_data = candidate_data
+        self.candidate_version = candidate_data['version']
+        self.state_dir = state_dir or os.path.join('instance', 'shadow', f"{active_version}--{self.candidate_version}")
+        if sample_rate is None:
+            sample_rate = float(os.environ.get('SHADOW_SAMPLE_RATE', 0.1))
+        self.sample_rate = sample_rate
+        self.queue_size = queue_size or int(os.environ.get('SHADOW_QUEUE_SIZE', 1000))
+        self.flush_interval = flush_interval or float(os.environ.get('SHADOW_FLUSH_INTERVAL', 5))
+        self.check_interval = check_interval or float(os.environ.get('SHADOW_CHECK_INTERVAL', 60))
+        self._latest = None
+        self._queue = deque()
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._pid = None
+        self._file = None
+        self._reset()
+
+    def _reset(self):
+        self.state = {
+            'started': time.time(),
+            'samples': 0, 'agree': 0, 'errors': 0, 'dropped': 0,
+            # candidate - active confidence: sum, sum of absolute values, sum of squares
+            'delta': np.zeros(3),
+            'latency': {name: np.zeros(len(LATENCY_BUCKETS) + 1, dtype=np.int64) for name in MODELS},
+            'latency_sum': {name: 0.0 for name in MODELS},
+            'disagreements': {},
+        }
+        self._dirty = False
+        self._queue.clear()
+
+    # Request path
+
+    def submit(self, features_dict, career, confidence, latency):
+        """
+        Samples a served prediction for the candidate; latency in seconds
+        """
+        if random.random() >= self.sample_rate:
+            return
+        if self._pid != os.getpid():
+            self._start()
+        if len(self._queue) >= self.queue_size:
+            with self._lock:
+                self.state['dropped'] += 1
+                self._dirty = True
+            return
+        self._queue.append((dict(features_dict), career, confidence, latency))
+        self._wake.set()
+
+    def _start(self):
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            if self._pid is not None:
+                # Forked: the parent's totals are in the parent's file already
+                self._reset()
+                self._wake = threading.Event()
+            self._pid = os.getpid()
+            self._file = f"{self._pid}-{int(time.time() * 1000)}.json"
+            threading.Thread(target=self._run, name='shadow-evaluator', daemon=True).start()
+
+    def _run(self):
+        pid = os.getpid()
+        written = time.monotonic()
+        while self._pid == pid:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.evaluate_pending()
+                if time.monotonic() - written >= self.flush_interval:
+                    written = time.monotonic()
+                    self.flush()
+            except Exception as e:
+                print(f"Shadow evaluation failed: {e}")
+
+    # Background
+
+    def evaluate_pending(self):
+        """
+        Runs the candidate on every queued sample; returns how many were evaluated
+        """
+        done = 0
+        while self._queue:
+            features_dict, career, confidence, active_latency = self._queue.popleft()
+            started = time.perf_counter()
+            try:
+                candidate_career, candidate_confidence = self.predict(self.candidate_data, features_dict)
+            except Exception:
+                # e.g. an interest the candidate was not trained on
+                with self._lock:
+                    self.state['errors'] += 1
+                    self._dirty = True
+                continue
+            candidate_latency = time.perf_counter() - started
+            delta = candidate_confidence - confidence
+            with self._lock:
+                state = self.state
+                state['samples'] += 1
+                if candidate_career == career:
+                    state['agree'] += 1
+                else:
+                    key = f"{career} -> {candidate_career}"
+                    state['disagreements'][key] = state['disagreements'].get(key, 0) + 1
+                state['delta'] += (delta, abs(delta), delta * delta)
+                for name, seconds in (('active', active_latency), ('candidate', candidate_latency)):
+                    state['latency'][name][np.searchsorted(LATENCY_BUCKETS, seconds * 1000)] += 1
+                    state['latency_sum'][name] += seconds
+                self._dirty = True
+            done += 1
+        return done
+
+    def flush(self):
+        """
+        Writes this process's totals when they changed
+        """
+        with self._lock:
+            if not self._dirty or self._pid != os.getpid():
+                return
+            payload = dict(self.state, delta=self.state['delta'].tolist(),
+                           latency={name: counts.tolist() for name, counts in self.state['latency'].items()},
+                           latency_sum=dict(self.state['latency_sum']),
+                           disagreements=dict(self.state['disagreements']))
+            self._dirty = False
+        os.makedirs(self.state_dir, exist_ok=True)
+        path = os.path.join(self.state_dir, self._file)
+        with open(f"{path}.tmp", 'w', encoding='utf-8') as f:
+            json.dump(payload, f)
+        os.replace(f"{path}.tmp", path)
+
+    # Reporting
+
+    def _merged(self):
+        merged = None
+        names = os.listdir(self.state_dir) if os.path.isdir(self.state_dir) else []
+        for name in names:
+            if not name.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(self.state_dir, name), 'r', encoding='utf-8') as f:
+                    state = json.load(f)
+            except (OSError, ValueError):
+                continue
+            state['delta'] = np.asarray(state['delta'])
+            state['latency'] = {key: np.asarray(counts, dtype=np.int64) for key, counts in state['latency'].items()}
+            if merged is None:
+                merged = state
+                continue
+            for key in ('samples', 'agree', 'errors', 'dropped'):
+                merged[key] += state[key]
+            merged['started'] = min(merged['started'], state['started'])
+            merged['delta'] = merged['delta'] + state['delta']
+            for key in MODELS:
+                merged['latency'][key] = merged['latency'][key] + state['latency'][key]
+                merged['latency_sum'][key] += state['latency_sum'][key]
+            for key, count in state['disagreements'].items():
+                merged['disagreements'][key] = merged['disagreements'].get(key, 0) + count
+        return merged
+
+    def _latency(self, counts, total_seconds):
+        total = int(counts.sum())
+        if not total:
+            return None
+        cumulative = np.cumsum(counts)
+        summary = {'mean': round(total_seconds / total * 1000, 4)}
+        for q in (50, 95, 99):
+            # Upper bound of the bucket holding the quantile, so within 12% of the true value
+            i = min(int(np.searchsorted(cumulative, total * q / 100)), len(LATENCY_BUCKETS) - 1)
+            summary[f'p{q}'] = round(float(LATENCY_BUCKETS[i]), 4)
+        return summary
+
+    def report(self):
+        self.evaluate_pending()
+        self.flush()
+        state = self._merged()
+        report = {
+            'active_version': self.active_version,
+            'candidate_version': self.candidate_version,
+            'computed_at': datetime.utcnow().isoformat(timespec='seconds'),
+            'sample_rate': self.sample_rate,
+            'held_out_accuracy': {'active': self.active_accuracy, 'candidate': self.candidate_data.get('accuracy')},
+            'samples': 0, 'errors': 0, 'dropped': 0, 'since': None,
+            'agreement_rate': None, 'confidence_delta': None,
+            'latency_ms': {name: None for name in MODELS}, 'speedup': None, 'disagreements': [],
+        }
+        if state is None:
+            return report
+        samples = state['samples']
+        report.update(samples=samples, errors=state['errors'], dropped=state['dropped'],
+                      since=datetime.utcfromtimestamp(state['started']).isoformat(timespec='seconds'))
+        if not samples:
+            return report
+        mean = state['delta'][0] / samples
+        report['agreement_rate'] = round(state['agree'] / samples, 4)
+        report['confidence_delta'] = {
+            'mean': round(float(mean), 3),
+            'mean_abs': round(float(state['delta'][1] / samples), 3),
+            'std': round(float(np.sqrt(max(state['delta'][2] / samples - mean * mean, 0))), 3),
+        }
+        report['latency_ms'] = {name: self._latency(state['latency'][name], state['latency_sum'][name]) for name in MODELS}
+        if report['latency_ms']['candidate']['mean']:
+            report['speedup'] = round(report['latency_ms']['active']['mean'] / report['latency_ms']['candidate']['mean'], 2)
+        top = sorted(state['disagreements'].items(), key=lambda kv: -kv[1])[:TOP_DISAGREEMENTS]
+        report['disagreements'] = [{'change': key, 'count': count, 'share': round(count / samples, 4)} for key, count in top]
+        return report
+
+    def latest(self):
+        """
+        The last report, recomputed at most every check_interval seconds
+        """
+        latest = self._latest
+        if latest is None or time.monotonic() - latest[0] >= self.check_interval:
+            latest = self._latest = (time.monotonic(), self.report())
+        return latest[1]
+
+_evaluators = {}
+_evaluators_lock = threading.Lock()
+
+def get_evaluator(predict, model_data, model_version, model_dir):
+    """
+    The process-wide evaluator for the candidate registered in model_dir, or
+    None when there is no candidate (or it is the active version)
+    """
+    candidate_dir = model_artifacts.candidate_version_dir(model_dir)
+    if not model_data or candidate_dir is None or os.path.basename(candidate_dir) == str(model_version):
+        return None
+    key = (model_version, os.path.basename(candidate_dir))
+    evaluator = _evaluators.get(key)
+    if evaluator is None:
+        with _evaluators_lock:
+            evaluator = _evaluators.get(key)
+            if evaluator is None:
+                try:
+                    candidate_data = model_artifacts.load_career_model(candidate_dir)
+                except (OSError, ValueError) as e:
+                    print(f"Candidate model in {candidate_dir} not loaded: {e}")
+                    return None
+                evaluator = _evaluators[key] = ShadowEvaluator(predict, model_data, model_version, candidate_data)
+    return evaluator
+
+def flush_all():
+    """
+    Evaluates the queued samples and writes every evaluator's totals; for a worker about to exit
+    """
+    for evaluator in list(_evaluators.values()):
+        evaluator.evaluate_pending()
+        evaluator.flush()
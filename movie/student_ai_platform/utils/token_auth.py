@@ -0,0 +1,85 @@
+"""
+Stateless bearer-token auth for API clients. Access tokens carry the user id
+(sub) plus role and username claims, so protected API views never load the
+user row; the only shared state is the small revocation list below.
+"""
+import time
+import threading
+from datetime import datetime, timezone
+from functools import wraps
+from flask import current_app, jsonify
+from flask_jwt_extended import create_access_token, get_jwt, get_jwt_identity, jwt_required
+from models.database import db, RevokedToken
+
+class RevocationList:
+    """
+    Revoked token ids held in memory and reloaded from the revoked_token table
+    every `refresh_interval` seconds, so a revocation on one worker reaches the
+    others without a query per request. Rows are dropped once the token would
+    have expired anyway, which keeps the list short.
+    """
+    def __init__(self, refresh_interval=30):
+        self.refresh_interval = refresh_interval
+        self._revoked = frozenset()
+        self._loaded_at = None
+        self._lock = threading.Lock()
+
+    def _refresh(self):
+        if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.refresh_interval:
+            return
+        # Everyone waits for the first load; later reloads are done by one thread
+        if not self._lock.acquire(blocking=self._loaded_at is None):
+            return
+        try:
+            if self._loaded_at is None or time.monotonic() - self._loaded_at >= self.refresh_interval:
+                rows = db.session.query(RevokedToken.jti).filter(RevokedToken.expires_at > datetime.utcnow())
+                self._revoked = frozenset(jti for (jti,) in rows)
+                self._loaded_at = time.monotonic()
+        finally:
+            self._lock.release()
+
+    def is_revoked(self, jti):
+        self._refresh()
+        return jti in self._revoked
+
+    def revoke(self, jti, user_id, expires_at):
+        RevokedToken.query.filter(RevokedToken.expires_at <= datetime.utcnow()).delete()
+        db.session.merge(RevokedToken(jti=jti, user_id=user_id, expires_at=expires_at))
+        db.session.commit()
+        self._revoked = self._revoked | {jti}
+
+def init_token_auth(app, jwt):
+    revocations = RevocationList(app.config.get('JWT_REVOCATION_REFRESH', 30))
+    app.extensions['token_revocations'] = revocations
+
+    @jwt.token_in_blocklist_loader
+    def token_revoked(jwt_header, jwt_payload):
+        return revocations.is_revoked(jwt_payload['jti'])
+
+def issue_token(user):
+    return create_access_token(
+        identity=str(user.id),
+        additional_claims={'role': user.role, 'username': user.username}
+    )
+
+def revoke_current_token():
+    claims = get_jwt()
+    expires_at = datetime.fromtimestamp(claims['exp'], tz=timezone.utc).replace(tzinfo=None)
+    current_app.extensions['token_revocations'].revoke(claims['jti'], token_user_id(), expires_at)
+
+def token_user_id():
+    return int(get_jwt_identity())
+
+def token_required(*roles):
+    """
+    jwt_required() plus an optional check of the role claim
+    """
+    def decorator(view):
+        @wraps(view)
+        @jwt_required()
+        def wrapper(*args, **kwargs):
+            if roles and get_jwt().get('role') not in roles:
+                return jsonify({"error": "Forbidden for this role"}), 403
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
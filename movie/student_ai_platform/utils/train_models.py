@@ -7,6 +7,23 @@ from sklearn.linear_model import LogisticRegression
 from sklearn.metrics import accuracy_score, mean_absolute_error
 import joblib
 import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.model_artifacts import export_career_model, export_salary_model, CANDIDATE
+from utils.datasets import compact, load_dataset
+from utils.drift import reference_for_model
+
+# Salary logic based on career and skills
+BASE_SALARIES = {
+    'AI Engineer': 85000, 'Data Scientist': 80000, 'Cyber Security Analyst': 78000,
+    'Software Developer': 70000, 'Web Developer': 65000, 'UI/UX Designer': 62000,
+    'Business Analyst': 60000, 'General IT': 50000
+}
+
+def salaries(df):
+    base = df['CareerPath'].astype(str).map(BASE_SALARIES).astype(np.float64)
+    return (base * (1 + (df['CodingSkill'].astype(np.float64) - 5) * 0.05 + (df['CGPA'].astype(np.float64) - 3) * 0.1)).astype(np.float32)
 
 def generate_advanced_dataset(num_samples=2000):
     interests = ['AI/ML', 'Data Science', 'Web Development', 'UI/UX Design', 'Cyber Security', 'Business Analyst', 'Software Engineering']
@@ -32,19 +49,24 @@ def generate_advanced_dataset(num_samples=2000):
         return 'Software Developer' if row['CodingSkill'] > 5 else 'General IT'
 
     df['CareerPath'] = df.apply(determine_career, axis=1)
-    
-    # Salary logic based on career and skills
-    base_salaries = {
-        'AI Engineer': 85000, 'Data Scientist': 80000, 'Cyber Security Analyst': 78000,
-        'Software Developer': 70000, 'Web Developer': 65000, 'UI/UX Designer': 62000,
-        'Business Analyst': 60000, 'General IT': 50000
-    }
-    df['Salary'] = df.apply(lambda r: base_salaries[r['CareerPath']] * (1 + (r['CodingSkill']-5)*0.05 + (r['CGPA']-3)*0.1), axis=1)
-    
-    return df
+    df['Salary'] = salaries(df)
 
-def train_and_save():
-    df = generate_advanced_dataset()
+    return compact(df)
+
+def train_and_save(dataset_path=None, candidate=False):
+    """
+    Trains on a dataset CSV (through the typed, cached loader) or, without one,
+    on a freshly generated dataset. With candidate=True the career model is
+    exported as the shadow candidate only; the active models are left alone
+    """
+    if dataset_path:
+        df = load_dataset(dataset_path)
+        if 'CareerPath' not in df.columns:
+            raise ValueError(f"{dataset_path} has no CareerPath column to train on")
+        if 'Salary' not in df.columns:
+            df = df.assign(Salary=salaries(df))
+    else:
+        df = generate_advanced_dataset()
     os.makedirs('models', exist_ok=True)
     
     # 1. Career Model (Classifier)
@@ -69,11 +91,20 @@ def train_and_save():
     acc = accuracy_score(y_test, model.predict(X_test_scaled))
     print(f"Career Model Accuracy: {acc:.4f}")
     
-    joblib.dump({
+    model_data = {
         'model': model, 'scaler': scaler, 
         'le_interest': le_interest, 'le_career': le_career,
         'features': features, 'accuracy': acc
-    }, 'models/career_model.pkl')
+    }
+    # Training inputs the drift monitor compares live predictions against
+    model_data['drift_reference'] = reference_for_model(model_data, df.loc[X_train.index])
+    if candidate:
+        version_dir = export_career_model(model_data, 'models/career_model', pointer=CANDIDATE)
+        print(f"Candidate career model exported to {version_dir}; it shadows live predictions after a restart")
+        print("Compare it on /admin/shadow, then run: python utils/model_artifacts.py promote")
+        return
+    joblib.dump(model_data, 'models/career_model.pkl')
+    print(f"Career model arrays exported to {export_career_model(model_data, 'models/career_model')}")
     
     # 2. Salary Model (Regressor)
     # Binary encoding or similar for career in salary model
@@ -84,6 +115,9 @@ def train_and_save():
     sal_model.fit(X_sal, y_sal)
     print(f"Salary Model Trained (MAE: {mean_absolute_error(y_sal, sal_model.predict(X_sal)):.2f})")
     joblib.dump(sal_model, 'models/salary_model.pkl')
+    print(f"Salary model arrays exported to {export_salary_model(sal_model, 'models/salary_model')}")
 
 if __name__ == "__main__":
-    train_and_save()
+    # python utils/train_models.py [dataset.csv] [--candidate]
+    args = [a for a in sys.argv[1:] if a != '--candidate']
+    train_and_save(args[0] if args else None, candidate='--candidate' in sys.argv[1:])
@@ -1,3 +1,5 @@
+# Superseded by student_ai_platform, which serves these URLs from routes/legacy_routes.py.
+# Move this database over with: python utils/migrate_legacy.py (from student_ai_platform)
 from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, send_file
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager, UserMixin, login_user, login_required, logout_user, current_user